@@ -0,0 +1,132 @@
+import ctypes
+from os import environ
+from typing import Any
+from OpenGL.GL import (
+    GL_COLOR_ATTACHMENT0,
+    GL_DEPTH_ATTACHMENT,
+    GL_DEPTH_COMPONENT24,
+    GL_FRAMEBUFFER,
+    GL_FRAMEBUFFER_COMPLETE,
+    GL_RENDERBUFFER,
+    GL_RGBA8,
+    glBindFramebuffer,
+    glBindRenderbuffer,
+    glCheckFramebufferStatus,
+    glFinish,
+    glFramebufferRenderbuffer,
+    glGenFramebuffers,
+    glGenRenderbuffers,
+    glRenderbufferStorage,
+    glViewport,
+)
+
+
+class HeadlessWindow:
+    """
+    An OpenGL context with no window nor display, standing in for a GLFW window,
+    that renders into a framebuffer object instead.
+
+    The context is created through EGL, which Mesa provides without a display server
+    by rendering on the CPU with llvmpipe. OpenGL calls only reach it if PyOpenGL is
+    told to use EGL, by setting `PYOPENGL_PLATFORM=egl` before it is first imported.
+
+    Attributes:
+        width (int): Width of the rendered frames, in pixels.
+        height (int): Height of the rendered frames, in pixels.
+        frames (int): Number of frames rendered so far.
+    """
+
+    width: int
+    height: int
+    frames: int = 0
+    _display: Any
+    _context: Any
+
+    def __init__(self, width: int, height: int):
+        """
+        Creates the context, makes it current, and binds a framebuffer of the given
+        size for rendering.
+
+        Args:
+            width (int): Width of the rendered frames, in pixels.
+            height (int): Height of the rendered frames, in pixels.
+
+        Raises:
+            RuntimeError: If no EGL display or context could be created.
+        """
+        # EGL is only loaded when asked for, as not every platform has it
+        from OpenGL import EGL
+
+        self.width = width
+        self.height = height
+        # Let Mesa do without a display server
+        environ.setdefault("EGL_PLATFORM", "surfaceless")
+        self._display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(
+            self._display, ctypes.pointer(major), ctypes.pointer(minor)
+        ):
+            raise RuntimeError("EGL initialization failed")
+
+        config, count = EGL.EGLConfig(), EGL.EGLint()
+        attributes = [
+            EGL.EGL_SURFACE_TYPE,
+            EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RENDERABLE_TYPE,
+            EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE,
+        ]
+        _ = EGL.eglChooseConfig(
+            self._display,
+            (EGL.EGLint * len(attributes))(*attributes),
+            ctypes.pointer(config),
+            1,
+            ctypes.pointer(count),
+        )
+        if count.value == 0:
+            raise RuntimeError("No EGL configuration renders OpenGL")
+        _ = EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self._context = EGL.eglCreateContext(
+            self._display, config, EGL.EGL_NO_CONTEXT, None
+        )
+        # Render with no surface at all, into the framebuffer below
+        if not EGL.eglMakeCurrent(
+            self._display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, self._context
+        ):
+            raise RuntimeError("Failed to create an EGL OpenGL context")
+
+        color, depth = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, color)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, depth)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height)
+        glBindFramebuffer(GL_FRAMEBUFFER, glGenFramebuffers(1))
+        glFramebufferRenderbuffer(
+            GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, color
+        )
+        glFramebufferRenderbuffer(
+            GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, depth
+        )
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("Offscreen framebuffer is incomplete")
+        glViewport(0, 0, width, height)
+
+    def swap(self) -> None:
+        """
+        Ends a frame, waiting for it to be fully rendered, as a window's buffer swap
+        would eventually.
+        """
+        glFinish()
+        self.frames += 1
+
+    def close(self) -> None:
+        """
+        Releases the context and the EGL display.
+        """
+        from OpenGL import EGL
+
+        _ = EGL.eglMakeCurrent(
+            self._display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT
+        )
+        _ = EGL.eglDestroyContext(self._display, self._context)
+        _ = EGL.eglTerminate(self._display)
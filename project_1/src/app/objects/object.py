@@ -1,8 +1,10 @@
 from copy import copy, deepcopy
+from math import cos, sin
+from struct import Struct
 from typing import Any, Callable, final, override
 from collections.abc import Iterable, Mapping
 from glfw import ctypes
-from numpy import array, cos, float32, sin
+from numpy import array, eye, float32
 from numpy.typing import NDArray
 from OpenGL.GL import (
     GL_ARRAY_BUFFER,
@@ -15,6 +17,9 @@ from OpenGL.GL import (
     glVertexAttribPointer,
 )
 
+# The top three rows of a 4x4 float32 matrix
+_ROWS = Struct("12f")
+
 
 @final
 class TransformDict(dict[str, float]):
@@ -73,17 +78,23 @@ class TransformDict(dict[str, float]):
             raise TypeError(
                 f"update expected at most 1 argument, got {len(args)}"
             )
-        if args:
-            other = args[0]
-            if isinstance(other, Mapping):
-                for key in other:
-                    self[key] = other[key]
-            else:
-                for key, value in other:
-                    self[key] = value
-
-        for key, value in kwargs.items():
-            self[key] = value
+        # Keys are written without calling back, for the callback to be
+        # called once, after all of them
+        on_change, self._on_change = self._on_change, None
+        try:
+            if args:
+                other = args[0]
+                if isinstance(other, Mapping):
+                    for key in other:
+                        self[key] = other[key]
+                else:
+                    for key, value in other:
+                        self[key] = value
+
+            for key, value in kwargs.items():
+                self[key] = value
+        finally:
+            self._on_change = on_change
 
         if self._on_change:
             self._on_change()
@@ -137,6 +148,7 @@ class Object:
         self._rotation = deepcopy(self._initial_rotation)
         self._scale = self._initial_scale = scale
         self.program = program
+        self.transformation = eye(4, dtype=float32)
         self.update()
 
     # --- Properties ---
@@ -179,73 +191,38 @@ class Object:
         self._scale = self._initial_scale
         self.update()
 
-    def _rotationMatrix(self, axis: str):
-        c = cos(self.rotation[axis])
-        s = sin(self.rotation[axis])
-        matrix = []
-        match axis:
-            case "x":
-                matrix = [
-                    [1.0, 0.0, 0.0, 0.0],
-                    [0.0, c, -s, 0.0],
-                    [0.0, s, c, 0.0],
-                    [0.0, 0.0, 0.0, 1.0],
-                ]
-            case "y":
-                matrix = [
-                    [c, 0.0, s, 0.0],
-                    [0.0, 1.0, 0.0, 0.0],
-                    [-s, 0.0, c, 0.0],
-                    [0.0, 0.0, 0.0, 1.0],
-                ]
-            case _:
-                matrix = [
-                    [c, -s, 0.0, 0.0],
-                    [s, c, 0.0, 0.0],
-                    [0.0, 0.0, 1.0, 0.0],
-                    [0.0, 0.0, 0.0, 1.0],
-                ]
-        return array(matrix, dtype=float32)
-
     def update(self):
         """
         Updates the transformation matrix based on the current position, rotation, and scale.
 
-        This method calculates the transformation matrix by applying translation, rotation,
-        and scaling transformations in the correct order. The resulting transformation matrix
-        is stored in the `transformation` attribute, which can be used for rendering the object.
+        The matrix translates, then rotates around z, y and x, then scales. Rather than
+        multiplying one matrix per step, each entry is written out from the sines and cosines
+        of the angles, directly into the `transformation` attribute, which can be used for
+        rendering the object.
         """
-
         s = self.scale
-        scale = array(
-            [
-                [s, 0.0, 0.0, 0.0],
-                [0.0, s, 0.0, 0.0],
-                [0.0, 0.0, s, 0.0],
-                [0.0, 0.0, 0.0, 1.0],
-            ],
-            dtype=float32,
+        p, r = self.position, self.rotation
+        cx, sx = cos(r["x"]), sin(r["x"])
+        cy, sy = cos(r["y"]), sin(r["y"])
+        cz, sz = cos(r["z"]), sin(r["z"])
+        czsy, szsy = cz * sy, sz * sy
+        _ROWS.pack_into(
+            self.transformation,
+            0,
+            cz * cy * s,
+            (czsy * sx - sz * cx) * s,
+            (czsy * cx + sz * sx) * s,
+            p["x"],
+            sz * cy * s,
+            (szsy * sx + cz * cx) * s,
+            (szsy * cx - cz * sx) * s,
+            p["y"],
+            -sy * s,
+            cy * sx * s,
+            cy * cx * s,
+            p["z"],
         )
 
-        p = self.position
-        translation = array(
-            [
-                [1.0, 0.0, 0.0, p["x"]],
-                [0.0, 1.0, 0.0, p["y"]],
-                [0.0, 0.0, 1.0, p["z"]],
-                [0.0, 0.0, 0.0, 1.0],
-            ],
-            dtype=float32,
-        )
-
-        self.transformation = (
-            translation
-            @ self._rotationMatrix("z")
-            @ self._rotationMatrix("y")
-            @ self._rotationMatrix("x")
-            @ scale
-        ).astype(float32)
-
     def draw(self):
         """
         Prepares the object for rendering by setting up the necessary OpenGL state.
@@ -1,5 +1,6 @@
 from typing import Any
 import glfw
+from app.headless import HeadlessWindow
 
 
 def show_window(window: Any) -> None:
@@ -9,13 +10,31 @@ def show_window(window: Any) -> None:
     This function makes the window visible, but does not bring it to the front.
     If the window is already visible or is in full screen mode, this function does nothing.
 
+    A headless window has nothing to show, so this function does nothing for one.
+
     Args:
-        window (Any): The GLFW window handle to be shown.
+        window (Any): The GLFW window handle to be shown, or a headless stand-in for one.
 
     Note:
         This function must only be called from the main thread.
     """
-    glfw.show_window(window)
+    if not isinstance(window, HeadlessWindow):
+        glfw.show_window(window)
+
+
+def swap_buffers(window: Any) -> None:
+    """
+    Presents the frame just rendered to the specified window.
+
+    For a headless window, this waits for the frame to be fully rendered instead.
+
+    Args:
+        window (Any): The GLFW window handle, or a headless stand-in for one.
+    """
+    if isinstance(window, HeadlessWindow):
+        window.swap()
+    else:
+        glfw.swap_buffers(window)
 
 
 def terminate() -> None:
@@ -1,5 +1,14 @@
-from time import sleep
-from glfw import poll_events, swap_buffers, window_should_close
+import sys
+from argparse import ArgumentParser, Namespace
+from os import environ
+from time import perf_counter
+
+# PyOpenGL settles on how to reach the driver when first imported, so an
+# offscreen context must be asked for before anything imports OpenGL
+if "--headless" in sys.argv:
+    environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+from glfw import poll_events, window_should_close
 from OpenGL.GL import (
     GL_ARRAY_BUFFER,
     GL_COLOR_BUFFER_BIT,
@@ -13,13 +22,15 @@ from OpenGL.GL import (
 )
 
 from app.color_pallete import Palette
+from app.frame_scheduler import FrameScheduler
+from app.headless import HeadlessWindow
 from app.logger import Logger
 from app.object_controller import ObjectController
 from app.objects.board import Board
 from app.objects.object import Object
 from app.objects.piece import Piece
 from app.shader import create_shader_program
-from app.window import init_window, show_window, terminate
+from app.window import init_window, show_window, swap_buffers, terminate
 
 VERTEX_SHADER_SOURCE = """
     attribute vec3 position;
@@ -37,9 +48,31 @@ FRAGMENT_SHADER_SOURCE = """
 """
 
 
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(description="Draw chess pieces with OpenGL.")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="draw offscreen with EGL, with no window, and report timings",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=100,
+        help="number of frames to draw when headless",
+    )
+    return parser.parse_args()
+
+
 def main():
+    args = parse_arguments()
+
     # Object initialization
-    window = init_window(940, 1000, "Program")
+    window = (
+        HeadlessWindow(940, 1000)
+        if args.headless
+        else init_window(940, 1000, "Program")
+    )
     program = create_shader_program(
         VERTEX_SHADER_SOURCE, FRAGMENT_SHADER_SOURCE
     )
@@ -91,20 +124,42 @@ def main():
     show_window(window)
     glEnable(GL_DEPTH_TEST)
 
+    if args.headless:
+        start = perf_counter()
+        for _ in range(args.frames):
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            glClearColor(*palette.background, 1.0)
+            for obj in objects:
+                obj.draw()
+            swap_buffers(window)
+        elapsed = perf_counter() - start
+        print(
+            f"{args.frames} frames in {elapsed:.3f} s "
+            f"({args.frames / elapsed:.1f} FPS)"
+        )
+        window.close()
+        return
+
+    # Input moves objects by a fixed step, so it is handled at a fixed rate
+    # regardless of how fast frames are drawn
+    scheduler = FrameScheduler(fps=60.0, update_rate=30.0)
+
     # Main loop
     while not window_should_close(window):
+        poll_events()
+        for _ in range(scheduler.updates()):
+            controller.handle_input()
+        logger.log(controller.i)
+
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glClearColor(*palette.background, 1.0)
-
-        controller.handle_input()
-        logger.log(controller.i)
         for obj in objects:
             obj.draw()
-        sleep(1.0 / 30)  # 30 FPS target
         swap_buffers(window)
-        poll_events()
+        scheduler.wait()
 
     terminate()
+    print(f"Frame times: {scheduler.stats()}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,5 @@
+import sys
+from os import path
+
+# The tests import the application as it is run, from the sources directory
+sys.path.insert(0, path.join(path.dirname(__file__), "..", "src"))
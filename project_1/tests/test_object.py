@@ -0,0 +1,54 @@
+"""
+Check the closed-form transformation matrix of objects against the product
+of translation, rotation and scale matrices it stands for.
+"""
+
+from math import cos, pi, sin
+from hypothesis import given, strategies as st
+from numpy import array, diag, float64
+from numpy.testing import assert_allclose
+from numpy.typing import NDArray
+from app.objects.object import Object
+
+coordinates = st.floats(-100.0, 100.0)
+angles = st.floats(-2 * pi, 2 * pi)
+# Negative scales mirror the model and a zero scale flattens it to a point
+scales = st.one_of(st.just(0.0), st.floats(-10.0, 10.0))
+positions = st.tuples(coordinates, coordinates, coordinates)
+rotations = st.tuples(angles, angles, angles)
+
+
+def model_matrix(
+    position: tuple[float, float, float],
+    rotation: tuple[float, float, float],
+    scale: float,
+) -> NDArray[float64]:
+    """Multiply out T * Rz * Ry * Rx * S, one matrix per step."""
+    (cx, cy, cz), (sx, sy, sz) = map(cos, rotation), map(sin, rotation)
+    translation = diag([1.0, 1.0, 1.0, 1.0])
+    translation[:3, 3] = position
+    rz = array(
+        [[cz, -sz, 0, 0], [sz, cz, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]],
+        dtype=float64,
+    )
+    ry = array(
+        [[cy, 0, sy, 0], [0, 1, 0, 0], [-sy, 0, cy, 0], [0, 0, 0, 1]],
+        dtype=float64,
+    )
+    rx = array(
+        [[1, 0, 0, 0], [0, cx, -sx, 0], [0, sx, cx, 0], [0, 0, 0, 1]],
+        dtype=float64,
+    )
+    scaling = diag([scale, scale, scale, 1.0])
+    return translation @ rz @ ry @ rx @ scaling
+
+
+@given(positions, rotations, scales)
+def test_update_matches_matrix_product(position, rotation, scale):
+    obj = Object([], position, rotation, scale, None)
+    assert_allclose(
+        obj.transformation,
+        model_matrix(position, rotation, scale),
+        rtol=1e-5,
+        atol=1e-4,
+    )
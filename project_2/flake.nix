@@ -14,11 +14,13 @@
     pythonEnv = pkgs.python3.withPackages (ps:
       with ps; [
         glfw
+        hypothesis
         jupyter
         numpy
         mypy
         pyglm
         pyopengl
+        pytest
         tabulate
         pyyaml
       ]);
@@ -0,0 +1,110 @@
+from time import perf_counter, sleep
+from glfw import swap_interval
+
+
+class FrameScheduler:
+    """
+    Pace a render loop to a target frame rate, and run a fixed-timestep update
+    alongside it, independent of how long frames take to render.
+
+    Frames end on a regular schedule of deadlines. Waiting for each deadline
+    sleeps for most of the time left, short of how much sleeps have been
+    overshooting lately, and then spins for the remainder, so that frames end
+    on time without holding the CPU for the whole wait.
+
+    Attributes
+    ----------
+    frame_time : float
+        Target time between frames, in seconds.
+    timestep : float
+        Simulated time advanced by each update, in seconds.
+    max_updates : int
+        Most updates run per frame. Time beyond that is dropped, rather than
+        slowing frames further down to catch up with it.
+    """
+
+    frame_time: float
+    timestep: float
+    max_updates: int
+    _deadline: float
+    _last_update: float
+    _accumulator: float = 0.0
+    _slack: float = 0.001
+
+    def __init__(
+        self,
+        fps: float = 60.0,
+        update_rate: float = 60.0,
+        vsync: bool = False,
+        max_updates: int = 5,
+    ):
+        """
+        Start scheduling frames from now, which requires a current OpenGL
+        context.
+
+        Parameters
+        ----------
+        fps : float
+            Target number of frames per second.
+        update_rate : float
+            Number of updates per second of simulated time.
+        vsync : bool
+            Whether buffer swaps wait for the display's vertical retrace, in
+            which case the target frame rate only acts as a cap.
+        max_updates : int
+            Most updates run per frame.
+        """
+        swap_interval(1 if vsync else 0)
+        self.frame_time = 1.0 / fps
+        self.timestep = 1.0 / update_rate
+        self.max_updates = max_updates
+        now = perf_counter()
+        self._deadline = self._last_update = now
+
+    def updates(self) -> int:
+        """
+        Count the fixed-timestep updates due since the previous call.
+
+        Returns
+        -------
+        int
+            Number of times to run the update step this frame.
+        """
+        now = perf_counter()
+        self._accumulator += now - self._last_update
+        self._last_update = now
+        steps = int(self._accumulator // self.timestep)
+        if steps > self.max_updates:
+            steps = self.max_updates
+            self._accumulator = 0.0
+        else:
+            self._accumulator -= steps * self.timestep
+        return steps
+
+    def remaining(self) -> float:
+        """
+        Time left until the next frame is due, for waiting on something else
+        in the meantime.
+
+        Returns
+        -------
+        float
+            Seconds until the next deadline, or 0 if it has passed.
+        """
+        return max(self._deadline + self.frame_time - perf_counter(), 0.0)
+
+    def wait(self) -> None:
+        """Wait until the current frame's deadline, and move on to the next."""
+        self._deadline += self.frame_time
+        now = perf_counter()
+        if now > self._deadline + self.frame_time:
+            # Too far behind to catch up, so start the schedule over
+            self._deadline = now
+        elif now < self._deadline:
+            requested = self._deadline - now - 2 * self._slack
+            if requested > 0:
+                sleep(requested)
+                overshoot = perf_counter() - now - requested
+                self._slack += 0.1 * (max(overshoot, 0.0) - self._slack)
+            while perf_counter() < self._deadline:
+                pass
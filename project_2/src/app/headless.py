@@ -0,0 +1,189 @@
+import ctypes
+from os import environ
+from typing import Any
+from numpy import frombuffer, uint8
+from numpy.typing import NDArray
+from OpenGL.GL import (
+    GL_COLOR_ATTACHMENT0,
+    GL_DEPTH_ATTACHMENT,
+    GL_DEPTH_COMPONENT24,
+    GL_FRAMEBUFFER,
+    GL_FRAMEBUFFER_COMPLETE,
+    GL_PACK_ALIGNMENT,
+    GL_RENDERBUFFER,
+    GL_RGB,
+    GL_RGBA8,
+    GL_UNSIGNED_BYTE,
+    glBindFramebuffer,
+    glBindRenderbuffer,
+    glCheckFramebufferStatus,
+    glFinish,
+    glFramebufferRenderbuffer,
+    glGenFramebuffers,
+    glGenRenderbuffers,
+    glPixelStorei,
+    glReadPixels,
+    glRenderbufferStorage,
+    glViewport,
+)
+
+
+class HeadlessWindow:
+    """
+    An OpenGL context with no window nor display, standing in for a GLFW
+    window, that renders into a framebuffer object instead.
+
+    The context is created through EGL, which Mesa provides without a display
+    server by rendering on the CPU with llvmpipe. OpenGL calls only reach it
+    if PyOpenGL is told to use EGL, by setting ``PYOPENGL_PLATFORM=egl``
+    before it is first imported.
+
+    Attributes
+    ----------
+    width : int
+        Width of the rendered frames, in pixels.
+    height : int
+        Height of the rendered frames, in pixels.
+    frames : int
+        Number of frames rendered so far.
+    """
+
+    width: int
+    height: int
+    frames: int = 0
+    _display: Any
+    _context: Any
+
+    def __init__(self, width: int, height: int, core: bool = False):
+        """
+        Create the context, make it current, and bind a framebuffer of the
+        given size for rendering.
+
+        Parameters
+        ----------
+        width : int
+            Width of the rendered frames, in pixels.
+        height : int
+            Height of the rendered frames, in pixels.
+        core : bool
+            Whether to ask for an OpenGL 3.3 or later core profile, rather
+            than the driver's default compatibility profile.
+
+        Raises
+        ------
+        RuntimeError
+            If no EGL display or context could be created.
+        """
+        # EGL is only loaded when asked for, as not every platform has it
+        from OpenGL import EGL
+
+        self.width = width
+        self.height = height
+        # Let Mesa do without a display server
+        environ.setdefault("EGL_PLATFORM", "surfaceless")
+        self._display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        major, minor = EGL.EGLint(), EGL.EGLint()
+        if not EGL.eglInitialize(
+            self._display, ctypes.pointer(major), ctypes.pointer(minor)
+        ):
+            raise RuntimeError("EGL initialization failed")
+
+        config, count = EGL.EGLConfig(), EGL.EGLint()
+        attributes = [
+            EGL.EGL_SURFACE_TYPE,
+            EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RENDERABLE_TYPE,
+            EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE,
+        ]
+        _ = EGL.eglChooseConfig(
+            self._display,
+            (EGL.EGLint * len(attributes))(*attributes),
+            ctypes.pointer(config),
+            1,
+            ctypes.pointer(count),
+        )
+        if count.value == 0:
+            raise RuntimeError("No EGL configuration renders OpenGL")
+        _ = EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        attributes = [EGL.EGL_NONE]
+        if core:
+            attributes = [
+                EGL.EGL_CONTEXT_MAJOR_VERSION,
+                3,
+                EGL.EGL_CONTEXT_MINOR_VERSION,
+                3,
+                EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK,
+                EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+                EGL.EGL_NONE,
+            ]
+        self._context = EGL.eglCreateContext(
+            self._display,
+            config,
+            EGL.EGL_NO_CONTEXT,
+            (EGL.EGLint * len(attributes))(*attributes),
+        )
+        # Render with no surface at all, into the framebuffer below
+        if not EGL.eglMakeCurrent(
+            self._display,
+            EGL.EGL_NO_SURFACE,
+            EGL.EGL_NO_SURFACE,
+            self._context,
+        ):
+            raise RuntimeError("Failed to create an EGL OpenGL context")
+
+        color, depth = glGenRenderbuffers(2)
+        glBindRenderbuffer(GL_RENDERBUFFER, color)
+        glRenderbufferStorage(GL_RENDERBUFFER, GL_RGBA8, width, height)
+        glBindRenderbuffer(GL_RENDERBUFFER, depth)
+        glRenderbufferStorage(
+            GL_RENDERBUFFER, GL_DEPTH_COMPONENT24, width, height
+        )
+        glBindFramebuffer(GL_FRAMEBUFFER, glGenFramebuffers(1))
+        glFramebufferRenderbuffer(
+            GL_FRAMEBUFFER, GL_COLOR_ATTACHMENT0, GL_RENDERBUFFER, color
+        )
+        glFramebufferRenderbuffer(
+            GL_FRAMEBUFFER, GL_DEPTH_ATTACHMENT, GL_RENDERBUFFER, depth
+        )
+        if glCheckFramebufferStatus(GL_FRAMEBUFFER) != GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("Offscreen framebuffer is incomplete")
+        glViewport(0, 0, width, height)
+
+    def swap(self) -> None:
+        """
+        End a frame, waiting for it to be fully rendered, as a window's
+        buffer swap would eventually.
+        """
+        glFinish()
+        self.frames += 1
+
+    def read_pixels(self) -> NDArray[uint8]:
+        """
+        Read the last rendered frame back.
+
+        Returns
+        -------
+        NDArray[uint8]
+            The frame's RGB pixels, of shape (height, width, 3), top row
+            first.
+        """
+        glPixelStorei(GL_PACK_ALIGNMENT, 1)
+        pixels = glReadPixels(
+            0, 0, self.width, self.height, GL_RGB, GL_UNSIGNED_BYTE
+        )
+        image = frombuffer(pixels, dtype=uint8)
+        return image.reshape(self.height, self.width, 3)[::-1]
+
+    def close(self) -> None:
+        """Release the context and the EGL display."""
+        from OpenGL import EGL
+
+        _ = EGL.eglMakeCurrent(
+            self._display,
+            EGL.EGL_NO_SURFACE,
+            EGL.EGL_NO_SURFACE,
+            EGL.EGL_NO_CONTEXT,
+        )
+        _ = EGL.eglDestroyContext(self._display, self._context)
+        _ = EGL.eglTerminate(self._display)
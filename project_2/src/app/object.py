@@ -1,4 +1,6 @@
 from glob import glob
+from math import cos, sin
+from struct import Struct
 from app.transform_dict import TransformDict
 from copy import deepcopy
 from OpenGL.GL.images import glTexImage2D
@@ -17,9 +19,12 @@ from OpenGL.GL import (
     glTexParameteri,
     glBindTexture,
 )
-from numpy import array, cos, float32, sin
+from numpy import eye, float32
 from numpy.typing import NDArray
 
+# The top three rows of a 4x4 float32 matrix
+_ROWS = Struct("12f")
+
 
 @final
 class ObjDescriptor:
@@ -98,6 +103,14 @@ class Object:
         The current scale of the object.
     _transformation : NDArray[float32]
         The transformation matrix of the object.
+    _stale : bool
+        Whether the transformation matrix is out of date, to be rebuilt the
+        next time it is read.
+    changes : int
+        Number of changes to the position, rotation or scale since the
+        counters were last reset, each of which used to rebuild the matrix.
+    rebuilds : int
+        Number of times the matrix was rebuilt since then.
     """
 
     _name: str
@@ -111,6 +124,9 @@ class Object:
     _rotation: TransformDict
     _scale: float
     _transformation: NDArray[float32]
+    _stale: bool = True
+    changes: int = 0
+    rebuilds: int = 0
 
     def __init__(
         self,
@@ -128,18 +144,18 @@ class Object:
         pos = description.initial_position
         self._initial_position = TransformDict(
             {"x": pos[0], "y": pos[1], "z": pos[2]},
-            on_change=self.update,
+            on_change=self._invalidate,
         )
         self._position = deepcopy(self._initial_position)
 
         rot = description.initial_rotation
         self._initial_rotation = TransformDict(
             {"x": rot[0], "y": rot[1], "z": rot[2]},
-            on_change=self.update,
+            on_change=self._invalidate,
         )
         self._rotation = deepcopy(self._initial_rotation)
         self._scale = self._initial_scale = description.initial_scale
-        self.update()
+        self._transformation = eye(4, dtype=float32)
 
     @property
     def name(self) -> str:
@@ -159,6 +175,10 @@ class Object:
 
     @property
     def transformation(self) -> NDArray[float32]:
+        """The transformation matrix, rebuilt on the first read after the
+        object changed."""
+        if self._stale:
+            self.update()
         return self._transformation
 
     @property
@@ -184,7 +204,7 @@ class Object:
     @scale.setter
     def scale(self, value: float):
         self._scale = max(0.01, value)
-        self.update()
+        self._invalidate()
 
     def _load_model(self) -> Model:
         """
@@ -324,78 +344,47 @@ class Object:
         self._position = deepcopy(self._initial_position)
         self._rotation = deepcopy(self._initial_rotation)
         self._scale = self._initial_scale
-        self.update()
-
-    def _rotationMatrix(self, axis: str) -> NDArray[float32]:
-        """
-        Generate a rotation matrix for the specified axis.
-
-        Parameters
-        ----------
-        axis : str
-            The axis of rotation ('x', 'y', or 'z').
-
-        Returns
-        -------
-        NDArray[float32]
-            The 4x4 rotation matrix.
-        """
-        c = cos(self.rotation[axis])
-        s = sin(self.rotation[axis])
-        match axis:
-            case "x":
-                matrix = [
-                    [1.0, 0.0, 0.0, 0.0],
-                    [0.0, c, -s, 0.0],
-                    [0.0, s, c, 0.0],
-                    [0.0, 0.0, 0.0, 1.0],
-                ]
-            case "y":
-                matrix = [
-                    [c, 0.0, s, 0.0],
-                    [0.0, 1.0, 0.0, 0.0],
-                    [-s, 0.0, c, 0.0],
-                    [0.0, 0.0, 0.0, 1.0],
-                ]
-            case _:
-                matrix = [
-                    [c, -s, 0.0, 0.0],
-                    [s, c, 0.0, 0.0],
-                    [0.0, 0.0, 1.0, 0.0],
-                    [0.0, 0.0, 0.0, 1.0],
-                ]
-        return array(matrix, dtype=float32)
+        self._invalidate()
 
     def update(self):
         """
         Update the object's transformation matrix based on its current position, rotation, and scale.
+
+        The matrix translates, then rotates about z, y and x, then scales. It
+        is written out entry by entry from the sines and cosines of the
+        angles, rather than multiplied, into the object's own matrix.
         """
         s = self.scale
-        scale = array(
-            [
-                [s, 0.0, 0.0, 0.0],
-                [0.0, s, 0.0, 0.0],
-                [0.0, 0.0, s, 0.0],
-                [0.0, 0.0, 0.0, 1.0],
-            ],
-            dtype=float32,
-        )
-
-        p = self.position
-        translation = array(
-            [
-                [1.0, 0.0, 0.0, p["x"]],
-                [0.0, 1.0, 0.0, p["y"]],
-                [0.0, 0.0, 1.0, p["z"]],
-                [0.0, 0.0, 0.0, 1.0],
-            ],
-            dtype=float32,
+        p, r = self.position, self.rotation
+        cx, sx = cos(r["x"]), sin(r["x"])
+        cy, sy = cos(r["y"]), sin(r["y"])
+        cz, sz = cos(r["z"]), sin(r["z"])
+        czsy, szsy = cz * sy, sz * sy
+        _ROWS.pack_into(
+            self._transformation,
+            0,
+            cz * cy * s,
+            (czsy * sx - sz * cx) * s,
+            (czsy * cx + sz * sx) * s,
+            p["x"],
+            sz * cy * s,
+            (szsy * sx + cz * cx) * s,
+            (szsy * cx - cz * sx) * s,
+            p["y"],
+            -sy * s,
+            cy * sx * s,
+            cy * cx * s,
+            p["z"],
         )
-
-        self._transformation = (
-            translation
-            @ self._rotationMatrix("z")
-            @ self._rotationMatrix("y")
-            @ self._rotationMatrix("x")
-            @ scale
-        ).astype(float32)
+        self._stale = False
+        self.rebuilds += 1
+
+    def reset_counters(self) -> None:
+        """Reset the counters of changes and rebuilds."""
+        self.changes = 0
+        self.rebuilds = 0
+
+    def _invalidate(self) -> None:
+        """Mark the transformation matrix as out of date, after a change."""
+        self._stale = True
+        self.changes += 1
@@ -1,9 +1,15 @@
 # pyright: reportCallIssue=false
 from app.camera import Camera
+from app.console_display import ConsoleDisplay
 from app.object import Object, ObjDescriptor
 from app.shader import Shader
+from app.window import (
+    get_window_size,
+    set_window_user_pointer,
+    show_window,
+    swap_buffers,
+)
 import ctypes
-import os
 from typing import Any
 from OpenGL.GL import (
     GL_ARRAY_BUFFER,
@@ -20,7 +26,6 @@ from OpenGL.GL import (
     GL_STATIC_DRAW,
     GL_TEXTURE_2D,
     GL_TRIANGLES as TRIANGLES,
-    GL_TRUE as TRUE,
     glBindBuffer,
     glBindTexture,
     glBlendFunc,
@@ -31,18 +36,9 @@ from OpenGL.GL import (
     glEnable,
     glEnableVertexAttribArray,
     glGenBuffers,
-    glGetAttribLocation,
-    glGetUniformLocation,
     glHint,
-    glUniformMatrix4fv,
     glVertexAttribPointer,
 )
-from glfw import (
-    get_window_size,
-    set_window_user_pointer,
-    show_window,
-    swap_buffers,
-)
 from numpy import array, float32
 from tabulate import tabulate
 
@@ -57,16 +53,36 @@ class Scene:
         The camera viewing the scene.
     program : Any
         The OpenGL shader program ID.
+    shader : Shader
+        The shader program, caching its uniforms' locations.
     objects : list[Object]
         The list of 3D objects in the scene.
     index : int
         The index of the object currently under control.
+    display : ConsoleDisplay
+        Shows the scene's state in the console.
+    matrix_rebuilds : int
+        Number of transformation matrices rebuilt for the last frame.
+    rebuilds_avoided : int
+        Number of changes to objects before the last frame that did not cost
+        a matrix rebuild of their own.
+    uniform_uploads : int
+        Number of uniform values sent to the GPU for the last frame.
+    uniform_skipped : int
+        Number of uniform values not sent for the last frame, as the GPU
+        already held them.
     """
 
     camera: Camera
     program: Any
+    shader: Shader
     objects: list[Object] = []
     index: int = 0
+    display: ConsoleDisplay
+    matrix_rebuilds: int = 0
+    rebuilds_avoided: int = 0
+    uniform_uploads: int = 0
+    uniform_skipped: int = 0
 
     def __init__(
         self, window: Any, obj_descriptors: list[ObjDescriptor]
@@ -82,7 +98,9 @@ class Scene:
         vertices_list: list[tuple[float, float, float]] = []
         texture_coord: list[tuple[float, float]] = []
         self.camera = Camera(width, height)
+        self.shader = shader
         self.program = shader.getProgram()
+        self.display = ConsoleDisplay(self.state_text)
         for i in range(len(obj_descriptors)):
             self.objects.append(
                 Object(
@@ -117,7 +135,7 @@ class Scene:
         glBindBuffer(GL_ARRAY_BUFFER, buffer[0])
         glBufferData(GL_ARRAY_BUFFER, vertices.nbytes, vertices, GL_STATIC_DRAW)
         stride, offset = vertices.strides[0], ctypes.c_void_p(0)
-        loc_vertices = glGetAttribLocation(self.program, "position")
+        loc_vertices = self.shader.attribute("position")
         glEnableVertexAttribArray(loc_vertices)
         glVertexAttribPointer(loc_vertices, 3, GL_FLOAT, False, stride, offset)
 
@@ -138,7 +156,7 @@ class Scene:
         glBindBuffer(GL_ARRAY_BUFFER, buffer[1])
         glBufferData(GL_ARRAY_BUFFER, textures.nbytes, textures, GL_STATIC_DRAW)
         stride, offset = textures.strides[0], ctypes.c_void_p(0)
-        loc_textures = glGetAttribLocation(self.program, "texture_coord")
+        loc_textures = self.shader.attribute("texture_coord")
         glEnableVertexAttribArray(loc_textures)
         glVertexAttribPointer(loc_textures, 2, GL_FLOAT, False, stride, offset)
 
@@ -153,24 +171,22 @@ class Scene:
         """
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glClearColor(0x33 / 255, 0x3C / 255, 0x43 / 255, 1.0)
+        self.shader.reset_counters()
+        model = self.shader.location("model")
         for obj in self.objects:
-            mat = obj.transformation
-            loc = glGetUniformLocation(self.program, "model")
-            glUniformMatrix4fv(loc, 1, TRUE, mat)
+            self.shader.set_mat4(model, obj.transformation)
             glBindTexture(GL_TEXTURE_2D, obj.id)
             glDrawArrays(TRIANGLES, obj.initial_vertex, obj.vertices_count)
-        glUniformMatrix4fv(
-            glGetUniformLocation(self.program, "view"),
-            1,
-            TRUE,
-            self.camera.view(),
-        )
-        glUniformMatrix4fv(
-            glGetUniformLocation(self.program, "projection"),
-            1,
-            TRUE,
-            self.camera.projection(),
+        self.matrix_rebuilds = sum(obj.rebuilds for obj in self.objects)
+        self.rebuilds_avoided = sum(
+            max(0, obj.changes - obj.rebuilds) for obj in self.objects
         )
+        for obj in self.objects:
+            obj.reset_counters()
+        self.shader.set_mat4("view", self.camera.view())
+        self.shader.set_mat4("projection", self.camera.projection())
+        self.uniform_uploads = self.shader.uploads
+        self.uniform_skipped = self.shader.skipped
         swap_buffers(window)
 
     def objects_state(self) -> list[list[str]]:
@@ -213,22 +229,45 @@ class Scene:
 
     def log(self) -> None:
         """
-        Print the current state of objects and camera to the console.
+        Mark the state shown in the console out of date, for it to be shown
+        again soon, without waiting for it to be printed.
+        """
+        self.display.refresh()
+
+    def state_text(self) -> str:
+        """
+        Render the current state of objects and camera.
         Uses `tabulate` for pretty-printing.
+
+        Returns
+        -------
+        str
+            The state's tables, the matrix rebuilds and uniform uploads of
+            the last frame, and the object currently under control.
         """
         i = self.index
-        _ = os.system("clear")
-        print("Objects' state")
+        text: list[str] = ["Objects' state"]
         headers = [
             "Object",
             "Position (x, y, z)",
             "Rotation (x, y, z)",
             "Scale",
         ]
-        print(tabulate(self.objects_state(), headers=headers, tablefmt="grid"))
-        print("\nCamera's state:")
+        text.append(
+            tabulate(self.objects_state(), headers=headers, tablefmt="grid")
+        )
+        text.append("\nCamera's state:")
         headers = ["Position (x, y, z)", "Front (x, y, z)", "Up (x, y, z)"]
-        print(tabulate([self.camera_state()], headers=headers, tablefmt="grid"))
-        print(
+        text.append(
+            tabulate([self.camera_state()], headers=headers, tablefmt="grid")
+        )
+        text.append(
+            f"\nLast frame: {self.matrix_rebuilds} matrix rebuilds, "
+            f"{self.rebuilds_avoided} avoided, "
+            f"{self.uniform_uploads} uniform uploads, "
+            f"{self.uniform_skipped} skipped"
+        )
+        text.append(
             f"\nCurrently controlling Object {i + 1} '{self.objects[i].name}'\n"
         )
+        return "\n".join(text)
@@ -1,12 +1,18 @@
 # pyright: reportCallIssue=false
+from collections.abc import Hashable, Sequence
+from typing import Any
 from OpenGL.GL import (
+    GL_ACTIVE_UNIFORMS,
     GL_COMPILE_STATUS,
     GL_LINK_STATUS,
+    GL_TRUE as TRUE,
     GL_VERTEX_SHADER,
     GL_FRAGMENT_SHADER,
     glCreateShader,
     glCompileShader,
     glGetProgramInfoLog,
+    glGetActiveUniform,
+    glGetAttribLocation,
     glGetProgramiv,
     glGetShaderInfoLog,
     glGetShaderiv,
@@ -18,7 +24,11 @@ from OpenGL.GL import (
     glDeleteShader,
     glUseProgram,
     glUniform1f,
+    glUniform1fv,
     glUniform1i,
+    glUniform3f,
+    glUniform3fv,
+    glUniformMatrix4fv,
 )
 
 
@@ -26,13 +36,30 @@ class Shader:
     """
     A class to manage OpenGL shader programs, including compilation and linking.
 
+    The locations of all active uniforms are looked up once, right after
+    linking, so that setting a uniform never has to query the driver. Setters
+    accept either a uniform's name or a location obtained from `location`.
+
+    The last value sent to each location is remembered, and setting a uniform
+    to the value it already holds is skipped. Matrices and arrays are
+    compared by their bytes.
+
     Attributes
     ----------
     id : int
         The OpenGL shader program ID.
+    uploads : int
+        Number of uniform values sent since the counters were last reset.
+    skipped : int
+        Number of redundant uniform values skipped since then.
     """
 
     id: int
+    uploads: int = 0
+    skipped: int = 0
+    _uniforms: dict[str, int]
+    _attributes: dict[str, int]
+    _state: dict[int, Hashable]
 
     def __init__(self, vertexPath: str, fragmentPath: str):
         try:
@@ -57,6 +84,9 @@ class Shader:
             glAttachShader(self.id, fragment)
             glLinkProgram(self.id)
             self._checkCompileErrors(self.id, "PROGRAM")
+            self._uniforms = self._introspect_uniforms()
+            self._attributes = {}
+            self._state = {}
             # delete the shaders as they're linked into our program now and no longer necessary
             glDeleteShader(vertex)
             glDeleteShader(fragment)
@@ -81,7 +111,139 @@ class Shader:
         """
         glUseProgram(self.id)
 
+    # uniform and attribute locations
+    # ------------------------------------------------------------------------
+    def location(self, name: str) -> int:
+        """
+        Get the cached location of a uniform.
+
+        Parameters
+        ----------
+        name : str
+            The name of the uniform, such as "model" or "lights[0].color".
+
+        Returns
+        -------
+        int
+            The uniform's location, or -1 if the program has no such active
+            uniform, which OpenGL silently ignores when setting values.
+        """
+        return self._uniforms.get(name, -1)
+
+    def attribute(self, name: str) -> int:
+        """
+        Get the location of a vertex attribute, querying it only once.
+
+        Parameters
+        ----------
+        name : str
+            The name of the attribute.
+
+        Returns
+        -------
+        int
+            The attribute's location, or -1 if it is not active.
+        """
+        if name not in self._attributes:
+            self._attributes[name] = glGetAttribLocation(self.id, name)
+        return self._attributes[name]
+
+    def _loc(self, uniform: str | int) -> int:
+        return self.location(uniform) if isinstance(uniform, str) else uniform
+
+    def _changed(self, loc: int, token: Hashable) -> bool:
+        """
+        Record a value about to be set, telling whether it must be sent.
+
+        Parameters
+        ----------
+        loc : int
+            The uniform's location.
+        token : Hashable
+            The value itself, or its bytes.
+
+        Returns
+        -------
+        bool
+            False if the location already holds that value, or if it does
+            not belong to an active uniform. Only the former counts as
+            skipped.
+        """
+        if loc < 0:
+            return False
+        if self._state.get(loc) == token:
+            self.skipped += 1
+            return False
+        self._state[loc] = token
+        self.uploads += 1
+        return True
+
+    def reset_counters(self) -> None:
+        """Reset the counters of uploaded and skipped uniform values."""
+        self.uploads = 0
+        self.skipped = 0
+
+    def _introspect_uniforms(self) -> dict[str, int]:
+        """
+        List the locations of every active uniform in the linked program.
+
+        Returns
+        -------
+        dict[str, int]
+            The locations by name. Arrays of basic types are listed both by
+            their base name and by each of their elements' names.
+        """
+        uniforms: dict[str, int] = {}
+        count = int(glGetProgramiv(self.id, GL_ACTIVE_UNIFORMS))
+        for index in range(count):
+            name, size, _ = glGetActiveUniform(self.id, index)
+            name = name.decode()
+            uniforms[name] = glGetUniformLocation(self.id, name)
+            if name.endswith("[0]"):
+                base = name[:-3]
+                uniforms[base] = uniforms[name]
+                for i in range(1, size):
+                    element = f"{base}[{i}]"
+                    uniforms[element] = glGetUniformLocation(self.id, element)
+        return uniforms
+
     # utility functions
+    def set_int(self, uniform: str | int, value: int) -> None:
+        """Set an integer (or boolean) uniform."""
+        loc, value = self._loc(uniform), int(value)
+        if self._changed(loc, value):
+            glUniform1i(loc, value)
+
+    def set_float(self, uniform: str | int, value: float) -> None:
+        """Set a float uniform."""
+        loc, value = self._loc(uniform), float(value)
+        if self._changed(loc, value):
+            glUniform1f(loc, value)
+
+    def set_vec3(self, uniform: str | int, value: Sequence[float]) -> None:
+        """Set a vec3 uniform from any sequence of three floats."""
+        loc, value = self._loc(uniform), (value[0], value[1], value[2])
+        if self._changed(loc, value):
+            glUniform3f(loc, *value)
+
+    def set_mat4(self, uniform: str | int, value: Any) -> None:
+        """Set a mat4 uniform from a row-major 4x4 array."""
+        loc = self._loc(uniform)
+        if self._changed(loc, value.tobytes()):
+            glUniformMatrix4fv(loc, 1, TRUE, value)
+
+    def set_float_array(self, uniform: str | int, values: Any) -> None:
+        """Set a float array uniform, starting at its first element."""
+        loc = self._loc(uniform)
+        if self._changed(loc, values.tobytes()):
+            glUniform1fv(loc, len(values), values)
+
+    def set_vec3_array(self, uniform: str | int, values: Any) -> None:
+        """Set a vec3 array uniform from an Nx3 array."""
+        loc = self._loc(uniform)
+        if self._changed(loc, values.tobytes()):
+            glUniform3fv(loc, len(values), values)
+
     def setBool(self, name: str, value: bool) -> None:
         """
         Set a boolean uniform in the shader.
@@ -93,7 +255,7 @@ class Shader:
         value : bool
             The boolean value to set.
         """
-        glUniform1i(glGetUniformLocation(self.id, name), int(value))
+        self.set_int(name, value)
 
     def setInt(self, name: str, value: int) -> None:
         """
@@ -106,7 +268,7 @@ class Shader:
         value : int
             The integer value to set.
         """
-        glUniform1i(glGetUniformLocation(self.id, name), value)
+        self.set_int(name, value)
 
     def setFloat(self, name: str, value: float) -> None:
         """
@@ -119,7 +281,7 @@ class Shader:
         value : float
             The float value to set.
         """
-        glUniform1f(glGetUniformLocation(self.id, name), value)
+        self.set_float(name, value)
 
     def _checkCompileErrors(self, shader: int, type: str) -> None:
         """
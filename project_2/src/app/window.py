@@ -1,4 +1,6 @@
 from typing import Any
+import glfw
+from app.headless import HeadlessWindow
 from glfw import (
     FALSE,
     VISIBLE,
@@ -53,3 +55,66 @@ def init_window(width: int, height: int, title: str) -> Any:
 
     make_context_current(window)
     return window
+
+
+def get_window_size(window: Any) -> tuple[int, int]:
+    """
+    Get the size of a window's drawing area.
+
+    Parameters
+    ----------
+    window : Any
+        The GLFW window object, or a headless stand-in for one.
+
+    Returns
+    -------
+    tuple[int, int]
+        The width and height, in screen coordinates.
+    """
+    if isinstance(window, HeadlessWindow):
+        return window.width, window.height
+    return glfw.get_window_size(window)
+
+
+def show_window(window: Any) -> None:
+    """
+    Make a window visible, which does nothing for a headless one.
+
+    Parameters
+    ----------
+    window : Any
+        The GLFW window object, or a headless stand-in for one.
+    """
+    if not isinstance(window, HeadlessWindow):
+        glfw.show_window(window)
+
+
+def swap_buffers(window: Any) -> None:
+    """
+    Present the frame just rendered to a window.
+
+    Parameters
+    ----------
+    window : Any
+        The GLFW window object, or a headless stand-in for one.
+    """
+    if isinstance(window, HeadlessWindow):
+        window.swap()
+    else:
+        glfw.swap_buffers(window)
+
+
+def set_window_user_pointer(window: Any, pointer: Any) -> None:
+    """
+    Attach an object to a window, for its input callbacks to reach, which
+    does nothing for a headless one, as it has none.
+
+    Parameters
+    ----------
+    window : Any
+        The GLFW window object, or a headless stand-in for one.
+    pointer : Any
+        The object to attach.
+    """
+    if not isinstance(window, HeadlessWindow):
+        glfw.set_window_user_pointer(window, pointer)
@@ -1,91 +1,150 @@
+import sys
+from argparse import ArgumentParser, Namespace
+from os import environ
+from time import perf_counter
+
+# PyOpenGL settles on how to reach the driver when first imported, so an
+# offscreen context must be asked for before anything imports OpenGL
+if "--headless" in sys.argv:
+    environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
 from glfw import wait_events, terminate, window_should_close
+from PIL import Image
 from app.controller import init_controller
+from app.frame_scheduler import FrameScheduler
+from app.headless import HeadlessWindow
 from app.object import ObjDescriptor as desc
 from app.scene import Scene
 from app.window import init_window
 
+# INFO: List the models to use in the following format, and add the necessary
+# folders and files as described in the README:
+OBJECTS = [
+    desc(
+        "Sofa",
+        initial_position=(-4.9, -2.6, -15.3),
+        initial_rotation=(0.0, 3.0, 0.0),
+        initial_scale=3.8,
+    ),
+    desc(
+        "CoffeeTable",
+        initial_position=(4.5, -2.4, 2.1),
+        initial_scale=3.8,
+    ),
+    desc(
+        "Chessboard",
+        initial_position=(-0.5, -0.8, -6.5),
+        initial_rotation=(0.0, -0.7, 0.0),
+        initial_scale=0.01,
+    ),
+    desc(
+        "Bark",
+        initial_position=(-3.7, -1.1, -20.7),
+        initial_rotation=(0.0, 0.8, 0.0),
+    ),
+    desc(
+        "Leaves",
+        initial_position=(-3.7, -1.1, -20.7),
+        initial_rotation=(0.0, 0.8, 0.0),
+    ),
+    desc(
+        "Well",
+        initial_position=(3.5, -1.0, -28.6),
+        initial_rotation=(0.0, 1.1, 0.0),
+        initial_scale=1.5,
+    ),
+    desc(
+        "PicnicTable",
+        initial_position=(-3.1, -1.1, -27.9),
+        initial_rotation=(0.0, 0.6, 0.0),
+        initial_scale=0.03,
+    ),
+    desc(
+        "Terrain", initial_position=(0.0, -0.8, -20), initial_scale=21.0
+    ),
+    desc(
+        "Ceiling",
+        initial_position=(-5.1, 5.9, -11.5),
+        initial_rotation=(0.0, 3.0, 0.0),
+        initial_scale=3.5,
+    ),
+    desc(
+        "Floor",
+        initial_position=(-5.1, -2.4, -11.5),
+        initial_rotation=(0.0, 3.0, 0.0),
+        initial_scale=3.5,
+    ),
+    desc(
+        "Walls",
+        initial_position=(-5.1, -2.4, -11.5),
+        initial_rotation=(0.0, 3.0, 0.0),
+        initial_scale=3.5,
+    ),
+    desc(
+        "SkyDome",
+        initial_scale=3.0,
+    ),
+]
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(description="Render a 3D scene with OpenGL.")
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="render offscreen with EGL, with no window, and report timings",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=100,
+        help="number of frames to render when headless",
+    )
+    parser.add_argument(
+        "--output",
+        help="where to save the last frame rendered when headless, as PNG",
+    )
+    return parser.parse_args()
+
+
+def run_headless(args: Namespace) -> None:
+    window = HeadlessWindow(940, 1000)
+    scene = Scene(window, OBJECTS)
+    start = perf_counter()
+    for _ in range(args.frames):
+        scene.draw(window)
+    elapsed = perf_counter() - start
+
+    print(
+        f"{args.frames} frames in {elapsed:.3f} s "
+        f"({args.frames / elapsed:.1f} FPS)"
+    )
+    if args.output:
+        Image.fromarray(window.read_pixels()).save(args.output)
+    window.close()
+
 
 def main():
-    # INFO: Application initialization. List the models to use in the following
-    # format, and add the necessary folders and files as described in the README:
+    args = parse_arguments()
+    if args.headless:
+        run_headless(args)
+        return
+
+    # Application initialization
     window = init_window(940, 1000, "Program")
-    scene = Scene(
-        window,
-        [
-            desc(
-                "Sofa",
-                initial_position=(-4.9, -2.6, -15.3),
-                initial_rotation=(0.0, 3.0, 0.0),
-                initial_scale=3.8,
-            ),
-            desc(
-                "CoffeeTable",
-                initial_position=(4.5, -2.4, 2.1),
-                initial_scale=3.8,
-            ),
-            desc(
-                "Chessboard",
-                initial_position=(-0.5, -0.8, -6.5),
-                initial_rotation=(0.0, -0.7, 0.0),
-                initial_scale=0.01,
-            ),
-            desc(
-                "Bark",
-                initial_position=(-3.7, -1.1, -20.7),
-                initial_rotation=(0.0, 0.8, 0.0),
-            ),
-            desc(
-                "Leaves",
-                initial_position=(-3.7, -1.1, -20.7),
-                initial_rotation=(0.0, 0.8, 0.0),
-            ),
-            desc(
-                "Well",
-                initial_position=(3.5, -1.0, -28.6),
-                initial_rotation=(0.0, 1.1, 0.0),
-                initial_scale=1.5,
-            ),
-            desc(
-                "PicnicTable",
-                initial_position=(-3.1, -1.1, -27.9),
-                initial_rotation=(0.0, 0.6, 0.0),
-                initial_scale=0.03,
-            ),
-            desc(
-                "Terrain", initial_position=(0.0, -0.8, -20), initial_scale=21.0
-            ),
-            desc(
-                "Ceiling",
-                initial_position=(-5.1, 5.9, -11.5),
-                initial_rotation=(0.0, 3.0, 0.0),
-                initial_scale=3.5,
-            ),
-            desc(
-                "Floor",
-                initial_position=(-5.1, -2.4, -11.5),
-                initial_rotation=(0.0, 3.0, 0.0),
-                initial_scale=3.5,
-            ),
-            desc(
-                "Walls",
-                initial_position=(-5.1, -2.4, -11.5),
-                initial_rotation=(0.0, 3.0, 0.0),
-                initial_scale=3.5,
-            ),
-            desc(
-                "SkyDome",
-                initial_scale=3.0,
-            ),
-        ],
-    )
+    scene = Scene(window, OBJECTS)
     init_controller(window)
+    scheduler = FrameScheduler()
 
-    # Main loop
+    # Main loop. Bursts of events, such as mouse motion, are drawn at most
+    # once per frame
     while not window_should_close(window):
         scene.draw(window)
+        scheduler.wait()
         wait_events()
         scene.log()
 
+    scene.display.close()
     terminate()
 
 
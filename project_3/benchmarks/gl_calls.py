@@ -0,0 +1,94 @@
+"""
+Count and time the OpenGL calls made to draw a frame, as the scene grows.
+
+Synthetic scenes of increasing numbers of objects are drawn with every OpenGL
+call recorded. By default calls are answered by a mock, with no context, GPU
+nor driver, so the times measured are those of the Python code around them.
+With --real, they are forwarded to an offscreen context instead, measuring
+what each call costs through PyOpenGL.
+
+Run from the project's root directory, so that the shaders can be found:
+
+    python benchmarks/gl_calls.py --objects 10 100 1000
+"""
+
+from argparse import ArgumentParser
+from os import environ, path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import sys
+
+# Real calls reach an offscreen context, which PyOpenGL must know beforehand
+environ.setdefault("PYOPENGL_PLATFORM", "egl")
+sys.path.insert(0, path.join(path.dirname(__file__), "..", "src"))
+
+from tabulate import tabulate  # noqa: E402
+from app.headless import HeadlessWindow  # noqa: E402
+from app.scene import Scene  # noqa: E402
+from app.utils import GLRecorder  # noqa: E402
+from synthetic import write_config, write_model  # noqa: E402
+
+
+class MockWindow(HeadlessWindow):
+    """A headless window with no context behind it."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--objects", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--rings", type=int, default=16)
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument(
+        "--real",
+        action="store_true",
+        help="forward calls to an offscreen OpenGL context",
+    )
+    args = parser.parse_args()
+
+    window = (
+        HeadlessWindow(940, 1000, core=True)
+        if args.real
+        else MockWindow(940, 1000)
+    )
+    recorder = GLRecorder(mock=not args.real).install()
+    counts: dict[str, dict[int, int]] = {}
+    frame_times: list[str] = []
+    with TemporaryDirectory() as root:
+        write_model(root, "Sphere", args.rings)
+        for objects in args.objects:
+            scene = Scene(window, write_config(root, "Sphere", objects))
+            scene.draw()
+            start = perf_counter()
+            for _ in range(args.frames):
+                recorder.end_frame()
+                scene.draw()
+            elapsed = (perf_counter() - start) * 1000 / args.frames
+            recorder.end_frame()
+            frame_times.append(f"{elapsed:.3f}")
+            for name, stats in recorder.frame().items():
+                counts.setdefault(name, {})[objects] = stats.calls
+            print(f"{objects} objects, last frame:")
+            print(recorder.table(), end="\n\n")
+    recorder.uninstall()
+
+    headers = ["Entry point"] + [f"{n} objects" for n in args.objects]
+    rows = [
+        [name] + [by_size.get(n, 0) for n in args.objects]
+        for name, by_size in sorted(counts.items())
+    ]
+    totals = [
+        sum(by_size.get(n, 0) for by_size in counts.values())
+        for n in args.objects
+    ]
+    rows.append(["total calls", *totals])
+    rows.append(["frame time (ms)", *frame_times])
+    print("Calls per frame:")
+    print(tabulate(rows, headers=headers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+"""
+Benchmark the scene's hardware occlusion culling.
+
+A synthetic scene of high depth complexity is generated: a wall right in
+front of the camera hiding many layers of finely tessellated spheres. The
+same frames are then rendered with occlusion culling off and on.
+
+The frames are drawn offscreen, through EGL, so no display is needed, and
+Mesa's software rasterizer is used on machines without a GPU. Run from the
+project's root directory, so that the shaders can be found:
+
+    python benchmarks/occlusion.py --objects 200 --frames 100
+"""
+
+from argparse import ArgumentParser
+from os import environ, makedirs, path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import sys
+
+# The frames are drawn offscreen, which PyOpenGL must know before its import
+environ.setdefault("PYOPENGL_PLATFORM", "egl")
+sys.path.insert(0, path.join(path.dirname(__file__), "..", "src"))
+
+from OpenGL.GL import glFinish  # noqa: E402
+from PIL import Image  # noqa: E402
+from app.headless import HeadlessWindow  # noqa: E402
+from app.scene import Scene  # noqa: E402
+from synthetic import sphere_obj  # noqa: E402
+
+
+def write_scene(root: str, objects: int, rings: int) -> str:
+    """
+    Generate the models and configuration of the benchmark scene.
+
+    Parameters
+    ----------
+    root : str
+        Directory in which to write the scene.
+    objects : int
+        Number of spheres hidden behind the wall.
+    rings : int
+        Tessellation of each sphere.
+
+    Returns
+    -------
+    str
+        Path to the scene's configuration file.
+    """
+    makedirs(path.join(root, "Sphere"))
+    with open(path.join(root, "Sphere", "model.obj"), "w") as f:
+        f.write(sphere_obj(rings, 2 * rings))
+    texture = Image.new("RGB", (8, 8), (0x80, 0x80, 0x80))
+    texture.save(path.join(root, "Sphere", "texture.png"))
+
+    config = [
+        '[Wall]\nmodel = "Sphere"\nposition = [0.0, 0.0, -8.0]\nscale = 6.0'
+    ]
+    for i in range(objects):
+        # Spheres are laid out in layers, one behind the other
+        layer, cell = divmod(i, 25)
+        x, y = cell % 5 - 2.0, cell // 5 - 2.0
+        z = -16.0 - 2.0 * layer
+        config.append(
+            f'[Sphere{i}]\nmodel = "Sphere"\n'
+            f"position = [{x}, {y}, {z}]\nscale = 0.9"
+        )
+    config_path = path.join(root, "config.toml")
+    with open(config_path, "w") as f:
+        f.write("\n\n".join(config) + "\n")
+    return config_path
+
+
+def run(scene: Scene, frames: int) -> float:
+    """Render a number of frames, returning the mean frame time in ms."""
+    scene.draw()
+    glFinish()
+    start = perf_counter()
+    for _ in range(frames):
+        scene.draw()
+        glFinish()
+    return (perf_counter() - start) * 1000 / frames
+
+
+def main() -> None:
+    parser = ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--objects", type=int, default=200)
+    parser.add_argument("--rings", type=int, default=32)
+    parser.add_argument("--frames", type=int, default=100)
+    args = parser.parse_args()
+
+    window = HeadlessWindow(940, 1000, core=True)
+    with TemporaryDirectory() as root:
+        scene = Scene(window, write_scene(root, args.objects, args.rings))
+
+    results: list[tuple[str, float]] = []
+    for enabled in (False, True):
+        scene.occlusion_culling = enabled
+        results.append(("on" if enabled else "off", run(scene, args.frames)))
+    window.close()
+
+    print(f"{args.objects} objects, {args.frames} frames")
+    for mode, ms in results:
+        print(f"occlusion culling {mode:>3}: {ms:8.3f} ms/frame")
+    print(f"objects occluded: {scene.occlusion.occluded}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,492 @@
+"""
+Benchmark the costliest steps of loading and drawing a scene.
+
+Models and scenes of several sizes are generated deterministically, then each
+step is timed over repeated samples: parsing OBJ files, triangulating their
+faces, building vertex arrays, updating object transformations, computing the
+camera's matrices, loading TOML configurations and drawing whole scenes, as
+well as a scene of high depth complexity with occlusion culling off and on. The
+scenes are drawn offscreen, through EGL, so no display is needed, and the
+number of OpenGL calls each of their frames makes is recorded along.
+
+Run from the project's root directory, so that the shaders can be found, and
+save the results to compare later runs against:
+
+    python benchmarks/suite.py --output baseline.json
+
+A run compared against saved results fails if any step got slower by more than
+the threshold, 10% by default:
+
+    python benchmarks/suite.py --compare baseline.json --threshold 0.1
+
+Saved results can also be compared with one another, without running again:
+
+    python benchmarks/suite.py --input results.json --compare baseline.json
+"""
+
+from argparse import ArgumentParser, Namespace
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from os import environ, path
+from statistics import median
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Any, Callable, Iterator
+import json
+import platform
+import sys
+
+# The scenes are drawn offscreen, which PyOpenGL must know before its import
+environ.setdefault("PYOPENGL_PLATFORM", "egl")
+sys.path.insert(0, path.join(path.dirname(__file__), "..", "src"))
+
+import numpy  # noqa: E402
+from numpy import arange, array, float32  # noqa: E402
+from OpenGL.GL import GL_RENDERER, glGetString  # noqa: E402
+from tabulate import tabulate  # noqa: E402
+from app.animation import Animator  # noqa: E402
+from app.assets import AssetRegistry  # noqa: E402
+from app.camera import Camera  # noqa: E402
+from app.headless import HeadlessWindow  # noqa: E402
+from app.scene import Scene  # noqa: E402
+from app.transform_store import TransformStore  # noqa: E402
+from app.utils import BufferData, GLRecorder, KeyframeTrack  # noqa: E402
+from occlusion import write_scene  # noqa: E402
+from synthetic import SEED, write_config, write_model  # noqa: E402
+
+# Tessellations of the parsed models, each with 2 * rings ** 2 faces
+MODEL_RINGS = (16, 48, 96)
+# Numbers of objects in the loaded configurations and the drawn scenes
+CONFIG_OBJECTS = (100, 1000)
+SCENE_OBJECTS = (10, 100)
+# Numbers of objects animated in a transform store, with no scene around them
+STORE_OBJECTS = (10_000,)
+# Numbers of children moved along with their parent in a transform store
+STORE_CHILDREN = (500,)
+# Numbers of objects whose orientations are played from keyframe tracks
+ANIMATED_OBJECTS = (10_000,)
+# Numbers of spheres hidden behind a wall, drawn with occlusion culling off
+# and on, and their tessellation
+OCCLUDED_OBJECTS = (100,)
+OCCLUDED_RINGS = 16
+
+
+@dataclass
+class Benchmark:
+    """
+    A step to time, ready to be run repeatedly.
+
+    Attributes
+    ----------
+    name : str
+        Unique name of the step and the size it is run at.
+    run : Callable[[], Any]
+        Run the step once.
+    items : int
+        Number of items processed by each run, for throughput.
+    unit : str
+        What the items are.
+    count_calls : bool
+        Whether to also count the OpenGL calls made by a run.
+    """
+
+    name: str
+    run: Callable[[], Any]
+    items: int
+    unit: str
+    count_calls: bool = False
+
+
+def triangulate(faces: list[Any]) -> None:
+    """Triangulate every face of a model, as its loading does."""
+    for face in faces:
+        AssetRegistry._triangulate_face(face.vertices)
+        AssetRegistry._triangulate_face(face.texture)
+        AssetRegistry._triangulate_face(face.normals)
+
+
+def build_arrays(bd: BufferData) -> None:
+    """Convert the vertex data to arrays, as uploading it does."""
+    for coords in (bd.vertices, bd.texture_coord, bd.normals):
+        array(coords, dtype=float32)
+
+
+def update_objects(scene: Scene) -> None:
+    """Turn every object, then recompute their transformations."""
+    for obj in scene.objects:
+        obj.rotation["y"] += 0.01
+    scene.transforms.update()
+
+
+def animated_store(rows: int) -> TransformStore:
+    """Fill a transform store with objects placed at random."""
+    random = numpy.random.default_rng(SEED)
+    store = TransformStore(rows)
+    bounds = array([[-1.0, -1.0, -1.0], [1.0, 1.0, 1.0]], dtype=float32)
+    for _ in range(rows):
+        store.add(
+            random.uniform(-50.0, 50.0, 3),
+            random.uniform(-3.0, 3.0, 3),
+            random.uniform(0.5, 2.0),
+            bounds,
+        )
+    return store
+
+
+def update_transforms(store: TransformStore) -> None:
+    """Turn every row of a transform store, then recompute them at once."""
+    rows = arange(len(store))
+    store.rotations[rows, 1] += 0.01
+    store.mark(rows)
+    store.update()
+
+
+def animated_tracks(rows: int) -> Animator:
+    """Play a track of random keyframes on every row of a transform store."""
+    random = numpy.random.default_rng(SEED)
+    animator = Animator(animated_store(rows))
+    for row in range(rows):
+        animator.add(
+            row,
+            KeyframeTrack(
+                [0.0, 1.0, 2.0, 3.0],
+                [tuple(q) for q in random.normal(size=(4, 4)).tolist()],
+            ),
+        )
+    return animator
+
+
+def play_tracks(animator: Animator) -> None:
+    """Play every track a frame forward, then recompute the rows at once."""
+    animator.advance(1 / 60)
+    animator.store.update()
+
+
+def move_parent(store: TransformStore) -> None:
+    """Move the first row of a transform store, parent of every other one,
+    then recompute its subtree."""
+    store.positions[0, 0] += 0.01
+    store.mark(0)
+    store.update()
+
+
+def draw_occluded(scene: Scene, culling: bool) -> None:
+    """Draw a frame with occlusion culling either off or on."""
+    scene.occlusion_culling = culling
+    scene.draw()
+
+
+def collect(root: str, window: HeadlessWindow) -> Iterator[Benchmark]:
+    """
+    Generate the assets of each benchmark and prepare it.
+
+    Parameters
+    ----------
+    root : str
+        Directory in which to write the assets.
+    window : HeadlessWindow
+        The offscreen window scenes are drawn to.
+
+    Yields
+    ------
+    Benchmark
+        The benchmarks, in the order they are to be run.
+    """
+    for rings in MODEL_RINGS:
+        folder = write_model(root, f"Sphere{rings}", rings)
+        faces = 2 * rings**2
+        yield Benchmark(
+            f"obj_parse/faces={faces}",
+            lambda folder=folder: AssetRegistry._load_model(folder),
+            faces,
+            "faces",
+        )
+        model = AssetRegistry._load_model(folder)
+        yield Benchmark(
+            f"triangulation/faces={faces}",
+            lambda model=model: triangulate(model.faces),
+            faces,
+            "faces",
+        )
+        bd = BufferData()
+        AssetRegistry(bd).load(folder)
+        yield Benchmark(
+            f"buffer_build/vertices={len(bd.vertices)}",
+            lambda bd=bd: build_arrays(bd),
+            len(bd.vertices),
+            "vertices",
+        )
+
+    camera = Camera(window.width, window.height)
+    yield Benchmark(
+        "camera_matrices",
+        lambda: (camera.view(), camera.projection()),
+        1,
+        "frames",
+    )
+
+    for objects in CONFIG_OBJECTS:
+        config_path = write_config(root, "Sphere16", objects)
+        yield Benchmark(
+            f"config_load/objects={objects}",
+            lambda path=config_path: Scene._load_config(path),
+            objects,
+            "objects",
+        )
+
+    for objects in STORE_OBJECTS:
+        store = animated_store(objects)
+        yield Benchmark(
+            f"transform_update/objects={objects}",
+            lambda store=store: update_transforms(store),
+            objects,
+            "objects",
+        )
+
+    for children in STORE_CHILDREN:
+        store = animated_store(children + 1)
+        for row in range(1, children + 1):
+            store.set_parent(row, 0)
+        yield Benchmark(
+            f"hierarchy_update/children={children}",
+            lambda store=store: move_parent(store),
+            children,
+            "objects",
+        )
+
+    for objects in ANIMATED_OBJECTS:
+        animator = animated_tracks(objects)
+        yield Benchmark(
+            f"animation_update/objects={objects}",
+            lambda animator=animator: play_tracks(animator),
+            objects,
+            "objects",
+        )
+
+    for objects in SCENE_OBJECTS:
+        config_path = write_config(root, "Sphere16", objects)
+        scene = Scene(window, config_path)
+        yield Benchmark(
+            f"object_update/objects={objects}",
+            lambda scene=scene: update_objects(scene),
+            objects,
+            "objects",
+        )
+        yield Benchmark(
+            f"scene_draw/objects={objects}",
+            scene.draw,
+            1,
+            "frames",
+            count_calls=True,
+        )
+
+    for objects in OCCLUDED_OBJECTS:
+        folder = path.join(root, f"occlusion_{objects}")
+        scene = Scene(window, write_scene(folder, objects, OCCLUDED_RINGS))
+        for culling in (False, True):
+            yield Benchmark(
+                f"occlusion_draw/objects={objects},"
+                f"culling={'on' if culling else 'off'}",
+                lambda scene=scene, culling=culling: draw_occluded(
+                    scene, culling
+                ),
+                1,
+                "frames",
+                count_calls=True,
+            )
+
+
+def measure(
+    benchmark: Benchmark, repeat: int, min_time: float
+) -> dict[str, Any]:
+    """
+    Time a benchmark over repeated samples.
+
+    Each sample runs the step as many times as needed to last at least
+    `min_time`, so that quick steps are not lost in the timer's resolution.
+
+    Parameters
+    ----------
+    benchmark : Benchmark
+        The benchmark to time.
+    repeat : int
+        Number of samples.
+    min_time : float
+        Least duration of a sample, in seconds.
+
+    Returns
+    -------
+    dict[str, Any]
+        The times of a single run, in milliseconds, and its throughput.
+    """
+    # Warm up, and find how many runs a sample needs
+    number = 1
+    while True:
+        start = perf_counter()
+        for _ in range(number):
+            benchmark.run()
+        if perf_counter() - start >= min_time:
+            break
+        number *= 2
+
+    samples: list[float] = []
+    for _ in range(repeat):
+        start = perf_counter()
+        for _ in range(number):
+            benchmark.run()
+        samples.append((perf_counter() - start) * 1000 / number)
+    return {
+        "unit": benchmark.unit,
+        "items": benchmark.items,
+        "runs": number,
+        "samples": repeat,
+        "median_ms": median(samples),
+        "min_ms": min(samples),
+        "max_ms": max(samples),
+        "per_second": benchmark.items * 1000 / median(samples),
+    }
+
+
+def run_suite(args: Namespace) -> dict[str, Any]:
+    """
+    Run every benchmark whose name matches the filter.
+
+    Parameters
+    ----------
+    args : Namespace
+        The command line arguments.
+
+    Returns
+    -------
+    dict[str, Any]
+        The environment the benchmarks ran in, and their results by name.
+    """
+    window = HeadlessWindow(940, 1000, core=True)
+    results: dict[str, Any] = {
+        "meta": {
+            "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": numpy.__version__,
+            "platform": platform.platform(),
+            "renderer": glGetString(GL_RENDERER).decode(),
+            "seed": SEED,
+            "repeat": args.repeat,
+            "min_time": args.min_time,
+        },
+        "benchmarks": {},
+    }
+    with TemporaryDirectory() as root:
+        for benchmark in collect(root, window):
+            if args.filter and args.filter not in benchmark.name:
+                continue
+            result = measure(benchmark, args.repeat, args.min_time)
+            if benchmark.count_calls:
+                with GLRecorder().install() as recorder:
+                    benchmark.run()
+                    recorder.end_frame()
+                result["gl_calls"] = recorder.calls()
+            results["benchmarks"][benchmark.name] = result
+            print(
+                f"{benchmark.name:<36} {result['median_ms']:10.3f} ms "
+                f"{result['per_second']:14,.0f} {benchmark.unit}/s"
+            )
+    window.close()
+    return results
+
+
+def compare(
+    baseline: dict[str, Any], current: dict[str, Any], threshold: float
+) -> bool:
+    """
+    Print how the median times changed from one set of results to another.
+
+    Parameters
+    ----------
+    baseline : dict[str, Any]
+        The results compared against.
+    current : dict[str, Any]
+        The results being compared.
+    threshold : float
+        Largest relative slowdown that is not a regression.
+
+    Returns
+    -------
+    bool
+        Whether some benchmark regressed.
+    """
+    before, after = baseline["benchmarks"], current["benchmarks"]
+    rows: list[list[str]] = []
+    regressed = False
+    for name in [*before, *(n for n in after if n not in before)]:
+        if name not in after or name not in before:
+            status = "missing" if name not in after else "new"
+            rows.append([name, "-", "-", "-", status])
+            continue
+        old, new = before[name]["median_ms"], after[name]["median_ms"]
+        change = new / old - 1
+        status = ""
+        if change > threshold:
+            status = "REGRESSION"
+            regressed = True
+        elif change < -threshold:
+            status = "improvement"
+        rows.append(
+            [name, f"{old:.3f}", f"{new:.3f}", f"{change:+.1%}", status]
+        )
+    headers = ["Benchmark", "Baseline (ms)", "Current (ms)", "Change", ""]
+    print(tabulate(rows, headers=headers))
+    return regressed
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", help="where to save the results, as JSON")
+    parser.add_argument(
+        "--compare", help="results to compare against, failing on regressions"
+    )
+    parser.add_argument(
+        "--input", help="results to compare, instead of running the suite"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="largest relative slowdown that is not a regression",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=5, help="number of samples"
+    )
+    parser.add_argument(
+        "--min-time",
+        type=float,
+        default=0.1,
+        help="least duration of a sample, in seconds",
+    )
+    parser.add_argument(
+        "--filter", help="only run benchmarks whose name contains this"
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_arguments()
+    if args.input:
+        with open(args.input) as f:
+            results = json.load(f)
+    else:
+        results = run_suite(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+            f.write("\n")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        print()
+        if compare(baseline, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Generate synthetic models and scenes for the benchmarks.
+
+Everything is derived from the requested sizes and a fixed seed, so that the
+same assets, and so comparable timings, are produced on every run.
+"""
+
+from math import cos, pi, sin
+from os import makedirs, path
+from random import Random
+from PIL import Image
+
+SEED = 1234
+
+
+def sphere_obj(rings: int, segments: int, triangles: bool = False) -> str:
+    """
+    Write a UV sphere of unit radius in the OBJ format.
+
+    Parameters
+    ----------
+    rings : int
+        Number of subdivisions from pole to pole.
+    segments : int
+        Number of subdivisions around the equator.
+    triangles : bool
+        Whether to write triangular faces, rather than quads.
+
+    Returns
+    -------
+    str
+        The OBJ file contents.
+    """
+    lines: list[str] = []
+    for i in range(rings + 1):
+        theta = pi * i / rings
+        for j in range(segments + 1):
+            phi = 2 * pi * j / segments
+            x, y, z = sin(theta) * cos(phi), cos(theta), sin(theta) * sin(phi)
+            lines.append(f"v {x:.6f} {y:.6f} {z:.6f}")
+            lines.append(f"vt {j / segments:.6f} {i / rings:.6f}")
+            lines.append(f"vn {x:.6f} {y:.6f} {z:.6f}")
+    for i in range(rings):
+        for j in range(segments):
+            a = i * (segments + 1) + j + 1
+            b = a + segments + 1
+            faces = (
+                [(a, b, b + 1), (a, b + 1, a + 1)]
+                if triangles
+                else [(a, b, b + 1, a + 1)]
+            )
+            for face in faces:
+                lines.append("f " + " ".join(f"{v}/{v}/{v}" for v in face))
+    return "\n".join(lines) + "\n"
+
+
+def write_model(root: str, name: str, rings: int) -> str:
+    """
+    Write a model folder holding a sphere and a plain texture.
+
+    Parameters
+    ----------
+    root : str
+        Directory in which to create the model's folder.
+    name : str
+        Name of the model's folder.
+    rings : int
+        Tessellation of the sphere, which has ``2 * rings ** 2`` faces.
+
+    Returns
+    -------
+    str
+        Path to the model's folder.
+    """
+    folder = path.join(root, name)
+    makedirs(folder, exist_ok=True)
+    with open(path.join(folder, "model.obj"), "w") as f:
+        f.write(sphere_obj(rings, 2 * rings))
+    texture = Image.new("RGB", (8, 8), (0x80, 0x80, 0x80))
+    texture.save(path.join(folder, "texture.png"))
+    return folder
+
+
+def write_config(root: str, model: str, objects: int) -> str:
+    """
+    Write the configuration of a scene of objects scattered in front of the
+    camera, a few of them static and a light source among them.
+
+    Parameters
+    ----------
+    root : str
+        Directory holding the model's folder, where to write the file.
+    model : str
+        Name of the model every object uses.
+    objects : int
+        Number of objects in the scene.
+
+    Returns
+    -------
+    str
+        Path to the configuration file.
+    """
+    random = Random(SEED)
+    config: list[str] = []
+    for i in range(objects):
+        x, y = random.uniform(-6.0, 6.0), random.uniform(-4.0, 4.0)
+        z = random.uniform(-30.0, -8.0)
+        angle = random.uniform(0.0, 2 * pi)
+        entry = (
+            f'[Object{i}]\nmodel = "{model}"\n'
+            f"position = [{x:.3f}, {y:.3f}, {z:.3f}]\n"
+            f"rotation = [0.0, {angle:.3f}, 0.0]\n"
+            f"scale = {random.uniform(0.3, 1.0):.3f}"
+        )
+        if i == 0:
+            entry += "\nemission_intensity = 1.0"
+        elif i % 4 == 0:
+            entry += "\nstatic = true"
+        config.append(entry)
+    config_path = path.join(root, f"config_{objects}.toml")
+    with open(config_path, "w") as f:
+        f.write("\n\n".join(config) + "\n")
+    return config_path
@@ -0,0 +1,299 @@
+from app.transform_store import TransformStore, euler_angles
+from app.utils import Interpolation, KeyframeTrack
+from numpy import (
+    arange,
+    arccos,
+    array,
+    clip,
+    diff,
+    divide,
+    flatnonzero,
+    float64,
+    fmod,
+    full,
+    intp,
+    maximum,
+    sin,
+    sqrt,
+    where,
+    zeros,
+)
+from numpy.typing import NDArray
+
+
+def nlerp(
+    start: NDArray[float64], end: NDArray[float64], t: NDArray[float64]
+) -> NDArray[float64]:
+    """
+    Interpolate unit quaternions linearly and normalize the results, along
+    the shorter of the two arcs between each pair.
+
+    Parameters
+    ----------
+    start : NDArray[float64]
+        The quaternions at t = 0, as an (n, 4) array.
+    end : NDArray[float64]
+        The quaternions at t = 1, as an (n, 4) array.
+    t : NDArray[float64]
+        How far between each pair to interpolate, as an (n,) array.
+
+    Returns
+    -------
+    NDArray[float64]
+        The interpolated unit quaternions, as an (n, 4) array.
+    """
+    sign = where((start * end).sum(-1) < 0, -1.0, 1.0)
+    t = t[:, None]
+    result = (1 - t) * start + t * sign[:, None] * end
+    return result / sqrt((result * result).sum(-1))[:, None]
+
+
+def slerp(
+    start: NDArray[float64], end: NDArray[float64], t: NDArray[float64]
+) -> NDArray[float64]:
+    """
+    Interpolate unit quaternions at a constant angular speed, along the
+    shorter of the two arcs between each pair.
+
+    Pairs too close for the angle between them to be divided by are
+    interpolated with `nlerp`, which is then just as accurate.
+
+    Parameters
+    ----------
+    start : NDArray[float64]
+        The quaternions at t = 0, as an (n, 4) array.
+    end : NDArray[float64]
+        The quaternions at t = 1, as an (n, 4) array.
+    t : NDArray[float64]
+        How far between each pair to interpolate, as an (n,) array.
+
+    Returns
+    -------
+    NDArray[float64]
+        The interpolated unit quaternions, as an (n, 4) array.
+    """
+    dot = (start * end).sum(-1)
+    end = where(dot[:, None] < 0, -end, end)
+    angle = arccos(clip(abs(dot), 0.0, 1.0))
+    sine = sin(angle)
+    close = sine < 1e-6
+    safe = where(close, 1.0, sine)
+    weight_start = where(close, 1 - t, sin((1 - t) * angle) / safe)
+    weight_end = where(close, t, sin(t * angle) / safe)
+    result = weight_start[:, None] * start + weight_end[:, None] * end
+    return result / sqrt((result * result).sum(-1))[:, None]
+
+
+class Animator:
+    """
+    Play keyframe tracks on the orientations of rows of a `TransformStore`.
+
+    Every track is evaluated at once: the keyframes of all tracks are packed
+    into padded arrays, so that finding each track's current keyframes and
+    interpolating between them takes a handful of NumPy calls, however many
+    objects are animated. The results are written as the rows' quaternions,
+    which marks them as dirty for the store's next update.
+
+    Attributes
+    ----------
+    store : TransformStore
+        The store whose rows are animated.
+    time : float
+        Seconds played so far.
+
+    Once every track is done, that is, none loops and the time is past every
+    last keyframe, tracks are no longer evaluated nor written, until another
+    track is added.
+    """
+
+    store: TransformStore
+    time: float = 0.0
+    _tracks: dict[int, KeyframeTrack]
+    _packed: bool = False
+    _added: bool = False
+    _rows: NDArray[intp]
+    _times: NDArray[float64]
+    _keys: NDArray[float64]
+    _lasts: NDArray[intp]
+    _ends: NDArray[float64]
+    _loops: NDArray[float64]
+    _slerp: NDArray[intp]
+    _nlerp: NDArray[intp]
+
+    def __init__(self, store: TransformStore):
+        """
+        Parameters
+        ----------
+        store : TransformStore
+            The store whose rows are animated.
+        """
+        self.store = store
+        self._tracks = {}
+
+    def __len__(self) -> int:
+        return len(self._tracks)
+
+    def add(self, index: int, track: KeyframeTrack) -> None:
+        """
+        Animate a row's orientation with a track, in place of any it had.
+
+        Parameters
+        ----------
+        index : int
+            The index of the row.
+        track : KeyframeTrack
+            The keyframes to play, timed from when the animator started.
+
+        Raises
+        ------
+        ValueError
+            If the track has no keyframes, a different number of times and
+            orientations, times out of order, or a zero quaternion.
+        """
+        times = array(track.times, dtype=float64)
+        if not len(times) or len(times) != len(track.orientations):
+            raise ValueError(
+                "A track needs as many times as orientations, at least one."
+            )
+        if (diff(times) < 0).any():
+            raise ValueError("A track's times must be in increasing order.")
+        keys = array(track.orientations, dtype=float64)
+        if ((keys * keys).sum(-1) == 0.0).any():
+            raise ValueError("A zero quaternion is not a rotation.")
+        self._tracks[index] = track
+        self._packed = False
+        self._added = True
+
+    def remove(self, index: int) -> None:
+        """
+        Stop animating a row, which keeps its current orientation.
+
+        Parameters
+        ----------
+        index : int
+            The index of the row.
+        """
+        del self._tracks[index]
+        self._packed = False
+
+    def advance(self, seconds: float) -> NDArray[intp]:
+        """
+        Play every track forward and write the orientations reached.
+
+        Parameters
+        ----------
+        seconds : float
+            Time elapsed since the previous call.
+
+        Returns
+        -------
+        NDArray[intp]
+            The indices of the rows animated, none once every track is done.
+        """
+        # The step reaching past the last keyframes still writes them
+        playing = self.running or self._added
+        self.time += seconds
+        if not playing:
+            return zeros(0, dtype=intp)
+        self._added = False
+        orientations = self.evaluate(self.time)
+        store, rows = self.store, self._rows
+        store.quaternions[rows] = orientations
+        store.has_quaternion[rows] = True
+        store.rotations[rows] = euler_angles(orientations)
+        store.mark(rows)
+        return rows
+
+    def evaluate(self, time: float) -> NDArray[float64]:
+        """
+        Find the orientation of every track at a given time.
+
+        Parameters
+        ----------
+        time : float
+            Seconds since the tracks started.
+
+        Returns
+        -------
+        NDArray[float64]
+            A unit quaternion per track, in the order of `rows`.
+        """
+        self._pack()
+        times, lasts = self._times, self._lasts
+        tracks = arange(len(times))
+        first, last = times[:, 0], self._ends
+        # Looping tracks wrap around to their first keyframe's time
+        period = self._loops * (last - first)
+        looping = period > 0
+        elapsed = fmod(maximum(time - first, 0.0), where(looping, period, 1.0))
+        local = where(looping, first + elapsed, time)
+        # The keyframe each track is past, short of its last one
+        key = (times <= local[:, None]).sum(-1) - 1
+        key = clip(key, 0, maximum(lasts - 1, 0))
+        following = key + (lasts > 0)
+        start, end = times[tracks, key], times[tracks, following]
+        span = end - start
+        t = clip(
+            divide(local - start, span, out=zeros(len(span)), where=span > 0),
+            0.0,
+            1.0,
+        )
+        keys = self._keys
+        before, after = keys[tracks, key], keys[tracks, following]
+        orientations = zeros((len(times), 4))
+        slerped, nlerped = self._slerp, self._nlerp
+        orientations[slerped] = slerp(
+            before[slerped], after[slerped], t[slerped]
+        )
+        orientations[nlerped] = nlerp(
+            before[nlerped], after[nlerped], t[nlerped]
+        )
+        return orientations
+
+    @property
+    def running(self) -> bool:
+        """Whether any track is still playing, as it loops or its last
+        keyframe is yet to be reached."""
+        if not self._tracks:
+            return False
+        self._pack()
+        times = self._times
+        looping = (self._loops > 0) & (self._ends > times[:, 0])
+        return bool((looping | (self.time <= self._ends)).any())
+
+    @property
+    def rows(self) -> NDArray[intp]:
+        """The indices of the animated rows, in the order of the tracks."""
+        self._pack()
+        return self._rows
+
+    def _pack(self) -> None:
+        """
+        Pack the tracks' keyframes into arrays with a row per track, padded
+        past each track's last keyframe with infinite times, after tracks
+        were added or removed.
+        """
+        if self._packed:
+            return
+        tracks = self._tracks
+        length = max((len(t.times) for t in tracks.values()), default=1)
+        self._rows = array(list(tracks), dtype=intp)
+        self._times = full((len(tracks), length), float("inf"))
+        self._keys = zeros((len(tracks), length, 4))
+        self._lasts = zeros(len(tracks), dtype=intp)
+        self._ends = zeros(len(tracks))
+        self._loops = zeros(len(tracks))
+        for i, track in enumerate(tracks.values()):
+            count = len(track.times)
+            keys = array(track.orientations, dtype=float64)
+            self._times[i, :count] = track.times
+            self._keys[i, :count] = keys / sqrt((keys * keys).sum(-1))[:, None]
+            self._lasts[i] = count - 1
+            self._ends[i] = track.times[-1]
+            self._loops[i] = track.loop
+        interpolations = array(
+            [t.interpolation for t in tracks.values()], dtype=intp
+        )
+        self._slerp = flatnonzero(interpolations == Interpolation.slerp)
+        self._nlerp = flatnonzero(interpolations == Interpolation.nlerp)
+        self._packed = True
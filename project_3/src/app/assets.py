@@ -0,0 +1,175 @@
+from glob import glob
+from os.path import realpath
+from typing import cast
+from app.utils import BufferData, Face, Mesh, Model
+from OpenGL.GL.images import glTexImage2D
+from OpenGL.constants import GL_UNSIGNED_BYTE
+from PIL import Image
+from OpenGL.GL import (
+    GL_LINEAR,
+    GL_REPEAT,
+    GL_RGB,
+    GL_RGBA,
+    GL_TEXTURE_2D,
+    GL_TEXTURE_MAG_FILTER,
+    GL_TEXTURE_MIN_FILTER,
+    GL_TEXTURE_WRAP_S,
+    GL_TEXTURE_WRAP_T,
+    glBindTexture,
+    glGenTextures,
+    glTexParameteri,
+)
+from numpy import array, float32
+
+
+class AssetRegistry:
+    """
+    Load each model folder only once, sharing its geometry and texture among
+    every object that references it.
+
+    Attributes
+    ----------
+    buffer_data : BufferData
+        The vertex data of every loaded model, to be uploaded to the GPU.
+    texture_memory : int
+        Bytes taken by the loaded textures on the GPU.
+    """
+
+    buffer_data: BufferData
+    texture_memory: int = 0
+    _meshes: dict[str, Mesh]
+
+    def __init__(self, bd: BufferData) -> None:
+        self.buffer_data = bd
+        self._meshes = {}
+
+    def __len__(self) -> int:
+        return len(self._meshes)
+
+    def load(self, path: str) -> Mesh:
+        """
+        Get the mesh of a model folder, loading it on first use.
+
+        Parameters
+        ----------
+        path : str
+            Path to a folder holding a `model.obj` and a `texture.*` file.
+
+        Returns
+        -------
+        Mesh
+            The range of the model's vertices in the buffer data and its
+            texture, shared with every other object using the same folder.
+        """
+        key = realpath(path)
+        if key not in self._meshes:
+            self._meshes[key] = self._load_object(path)
+        return self._meshes[key]
+
+    @staticmethod
+    def _load_model(path: str) -> Model:
+        model = Model()
+        material: str | None = None
+
+        for line in open(f"{path}/model.obj", "r"):
+            if line.startswith("#"):
+                continue
+            values = line.split()
+            if not values:
+                continue
+            match values[0]:
+                case "v":
+                    model.vertices.append(
+                        (float(values[1]), float(values[2]), float(values[3]))
+                    )
+                case "vt":
+                    model.texture_coord.append(
+                        (float(values[1]), float(values[2]))
+                    )
+                case "vn":
+                    model.normals.append(
+                        (float(values[1]), float(values[2]), float(values[3]))
+                    )
+                case "f":
+                    face = Face(material=material)
+                    for v in values[1:]:
+                        w: list[str] = v.split("/")
+                        face.vertices.append(int(w[0]))
+                        if len(w) >= 2 and len(w[1]) > 0:
+                            face.texture.append(int(w[1]))
+                        else:
+                            face.texture.append(0)
+                        face.normals.append(int(w[2]))
+                    model.faces.append(face)
+                case "usemtl" | "usemat":
+                    material = values[1]
+                case _:
+                    pass
+        return model
+
+    @staticmethod
+    def _load_texture(path: str) -> tuple[int, bool, int]:
+        texture = int(glGenTextures(1))
+        glBindTexture(GL_TEXTURE_2D, texture)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
+        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
+        img: Image.Image = Image.open(glob(f"{path}/texture.*")[0])
+        width = img.size[0]
+        height = img.size[1]
+        # Keep the alpha channel only if some texel is see-through
+        translucent = False
+        if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+            img = img.convert("RGBA")
+            # The lowest and highest value of each of the four channels
+            extrema = cast(
+                tuple[
+                    tuple[int, int],
+                    tuple[int, int],
+                    tuple[int, int],
+                    tuple[int, int],
+                ],
+                img.getextrema(),
+            )
+            translucent = extrema[3][0] < 255
+        mode, format = ("RGBA", GL_RGBA) if translucent else ("RGB", GL_RGB)
+        img_data = img.tobytes("raw", mode, 0, -1)
+        glTexImage2D(
+            GL_TEXTURE_2D,
+            0,
+            format,
+            width,
+            height,
+            0,
+            format,
+            GL_UNSIGNED_BYTE,
+            img_data,
+        )
+        return texture, translucent, len(img_data)
+
+    @staticmethod
+    def _triangulate_face(face: list[int]) -> list[int]:
+        triangulated_face: list[int] = []
+        for i in range(1, len(face) - 1):
+            triangulated_face.extend([face[0], face[i], face[i + 1]])
+        return triangulated_face
+
+    def _load_object(self, path: str) -> Mesh:
+        bd = self.buffer_data
+        model = self._load_model(path)
+        start = len(bd.vertices)
+        for face in model.faces:
+            for vertex_id in self._triangulate_face(face.vertices):
+                bd.vertices.append(model.vertices[vertex_id - 1])
+            for texture_id in self._triangulate_face(face.texture):
+                bd.texture_coord.append(model.texture_coord[texture_id - 1])
+            for normal_id in self._triangulate_face(face.normals):
+                bd.normals.append(model.normals[normal_id - 1])
+        texture, translucent, size = self._load_texture(path)
+        self.texture_memory += size
+
+        coords = array(bd.vertices[start:] or [(0.0, 0.0, 0.0)], dtype=float32)
+        bounds = array([coords.min(axis=0), coords.max(axis=0)])
+        count = len(bd.vertices) - start
+        return Mesh(start, count, texture, bounds, translucent)
@@ -1,3 +1,4 @@
+from typing import Callable
 from glm import (
     cross,
     lookAt,
@@ -33,6 +34,7 @@ class Camera:
     first_mouse: bool = True
     last_x: float = 0.0
     last_y: float = 0.0
+    on_change: Callable[[], None] | None = None
 
     def __init__(self, window_width: int, window_height: int) -> None:
         self._window_width = window_width
@@ -96,6 +98,7 @@ class Camera:
         # Ensure the camera does not travel beyond the sky dome.
         if (self._pos.x**2 + self._pos.y**2 + self._pos.z**2) ** 0.5 > 40.0:
             self._pos = normalize(self._pos) * 40.0
+        self._changed()
 
     def process_mouse_movement(self, x_offset: float, y_offset: float) -> None:
         """
@@ -121,6 +124,7 @@ class Camera:
             self._pitch = -89.0
 
         self.update_orientation()
+        self._changed()
 
     def process_scroll_movement(self, y_offset: float):
         """
@@ -140,6 +144,11 @@ class Camera:
             self._fov = 1.0
         elif self._fov > 45.0:
             self._fov = 45.0
+        self._changed()
+
+    def _changed(self) -> None:
+        if self.on_change is not None:
+            self.on_change()
 
     def update_orientation(self):
         """
@@ -1,6 +1,5 @@
-import os
 from app.scene import Scene
-from app.utils import Mode
+from app.utils import ConsoleDisplay, FrameScheduler, Mode
 from typing import Any
 from OpenGL.GL import (
     GL_FILL,
@@ -23,6 +22,8 @@ from glfw import (
     KEY_D as D,
     KEY_E as E,
     KEY_ESCAPE as ESC,
+    KEY_O as O,
+    KEY_P as P,
     KEY_Q as Q,
     KEY_R as R,
     KEY_S as S,
@@ -30,6 +31,7 @@ from glfw import (
     KEY_W as W,
     KEY_X as X,
     KEY_Z as Z,
+    MOD_SHIFT,
     PRESS,
     RAW_MOUSE_MOTION,
     REPEAT,
@@ -41,11 +43,15 @@ from glfw import (
     set_input_mode,
     set_key_callback,
     set_scroll_callback,
+    set_window_refresh_callback,
     set_window_should_close,
     set_window_user_pointer,
 )
 from tabulate import tabulate
 
+# Where frame times are dumped to as JSON lines
+PROFILE_PATH = "frame_profile.jsonl"
+
 
 class Controller:
     """Handles user input and controls the scene's objects, camera, and lights.
@@ -58,21 +64,31 @@ class Controller:
         Current interaction mode (e.g., camera, translating, rotating, scaling, light).
     scene : Scene
         The scene being controlled.
+    scheduler : FrameScheduler
+        Paces the frames, whose times are shown in the console.
+    display : ConsoleDisplay
+        Shows the scene's state in the console.
     """
 
     current_object: int = 0
     mode: Mode = Mode.camera
     scene: Scene
+    scheduler: FrameScheduler
+    display: ConsoleDisplay
 
-    def __init__(self, scene: Scene) -> None:
+    def __init__(self, scene: Scene, scheduler: FrameScheduler) -> None:
         """Initialize the Controller with a scene and set up input callbacks.
 
         Parameters
         ----------
         scene : Scene
             The scene to be controlled.
+        scheduler : FrameScheduler
+            Paces the frames, whose times are shown in the console.
         """
         self.scene = scene
+        self.scheduler = scheduler
+        self.display = ConsoleDisplay(self._state_text)
         win = scene.window
         set_window_user_pointer(win, self)
         set_input_mode(win, CURSOR, CURSOR_DISABLED)
@@ -81,12 +97,13 @@ class Controller:
 
         set_key_callback(win, self._keyboard_callback)
         set_framebuffer_size_callback(win, self._framebuffer_callback)
+        set_window_refresh_callback(win, self._refresh_callback)
         set_cursor_pos_callback(win, self._mouse_callback)
         set_scroll_callback(win, self._scroll_callback)
 
     @staticmethod
     def _keyboard_callback(
-        window: Any, key: int, _scancode: int, action: int, _mods: int
+        window: Any, key: int, _scancode: int, action: int, mods: int
     ):
         ctrl: Controller = get_window_user_pointer(window)
         i = ctrl.current_object
@@ -108,6 +125,7 @@ class Controller:
                     o.scale += step
                 case _:
                     scene.ambient_light_on = not scene.ambient_light_on
+                    scene.invalidate()
 
         if key == S and action in (PRESS, REPEAT):
             match ctrl.mode:
@@ -172,18 +190,23 @@ class Controller:
 
         if key == KEY_1 and action == PRESS:
             ctrl.mode = Mode.camera
+            scene.invalidate()
 
         if key == KEY_2 and action == PRESS:
             ctrl.mode = Mode.translating
+            scene.invalidate()
 
         if key == KEY_3 and action == PRESS:
             ctrl.mode = Mode.rotating
+            scene.invalidate()
 
         if key == KEY_4 and action == PRESS:
             ctrl.mode = Mode.scaling
+            scene.invalidate()
 
         if key == KEY_5 and action == PRESS:
             ctrl.mode = Mode.light
+            scene.invalidate()
 
         if key == T and action == PRESS:
             current_mode = glGetInteger(GL_POLYGON_MODE)[0]
@@ -191,22 +214,48 @@ class Controller:
                 glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
             else:
                 glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+            scene.invalidate()
+
+        if key == O and action == PRESS:
+            scene.occlusion_culling = not scene.occlusion_culling
+            scene.invalidate()
 
         if key == R and action == PRESS:
             _ = o.reset()
 
+        if key == P and action == PRESS:
+            profiler = scene.profiler
+            if mods & MOD_SHIFT:
+                with open(PROFILE_PATH, "a") as file:
+                    _ = file.write(profiler.json_lines())
+                print(f"Frame times appended to '{PROFILE_PATH}'")
+            else:
+                print("\nFrame times:")
+                print(profiler.table())
+            ctrl.display.reset()
+
         if key == ESC and action == PRESS:
             set_window_should_close(window, True)
 
         if key == Z and action in (PRESS, REPEAT):
             ctrl.current_object = (i - 1) % len(scene.objects)
+            scene.invalidate()
 
         if key == X and action in (PRESS, REPEAT):
             ctrl.current_object = (i + 1) % len(scene.objects)
+            scene.invalidate()
 
     @staticmethod
-    def _framebuffer_callback(_window: Any, width: int, height: int) -> None:
+    def _framebuffer_callback(window: Any, width: int, height: int) -> None:
+        ctrl: Controller = get_window_user_pointer(window)
         glViewport(0, 0, width, height)
+        ctrl.scene.invalidate()
+
+    @staticmethod
+    def _refresh_callback(window: Any) -> None:
+        # The window's contents were damaged, such as by being uncovered
+        ctrl: Controller = get_window_user_pointer(window)
+        ctrl.scene.invalidate()
 
     @staticmethod
     def _mouse_callback(window: Any, x_pos: float, y_pos: float) -> None:
@@ -260,51 +309,82 @@ class Controller:
             state.append("On" if light.on else "Off")
         return state
 
+    def _render_state(self) -> list[str]:
+        scene = self.scene
+        queue = scene.queue
+        return [
+            str(scene.draw_calls),
+            str(scene.visibility.culled),
+            str(scene.occlusion.occluded) if scene.occlusion_culling else "-",
+            f"{queue.changes_before} -> {queue.changes_after}",
+            f"{scene.matrix_rebuilds} ({scene.rebuilds_avoided} avoided)",
+        ]
+
     def log(self) -> None:
-        """Print the current state of objects, camera, and lights to the console.
+        """Mark the state shown in the console out of date, for it to be shown
+        again soon, without waiting for it to be printed.
+        """
+        self.display.refresh()
 
-        Notes
-        -----
-        - Uses `tabulate` with `tablefmt="simple"` for aligned output without borders.
-        - Clears the console before printing for better readability.
-        - Displays:
+    def _state_text(self) -> str:
+        """Render the current state of objects, camera, and lights.
+
+        Returns
+        -------
+        str
+            The state, in tables formatted by `tabulate`, showing:
             - Objects' positions, rotations, and scales.
             - Camera's position, front, and up vectors.
             - Lights' on/off states.
+            - Draw calls, culled objects, state changes and matrix rebuilds
+              in the last frame.
+            - Frame times over the recent frames.
             - Currently controlled object and interaction mode.
         """
         i = self.current_object
         scene = self.scene
         o = scene.objects
         light = scene.light_sources
-        _ = os.system("clear")
+        text: list[str] = []
 
-        print("Objects' state:")
+        text.append("Objects' state:")
         headers = [
             "Object",
             "Position (x, y, z)",
             "Rotation (x, y, z)",
             "Scale",
         ]
-        print(tabulate(self._objects_state(), headers=headers))
+        text.append(tabulate(self._objects_state(), headers=headers))
 
-        print("\nCamera's state:")
+        text.append("\nCamera's state:")
         headers = ["Position (x, y, z)", "Front (x, y, z)", "Up (x, y, z)"]
-        print(tabulate([self._camera_state()], headers=headers))
+        text.append(tabulate([self._camera_state()], headers=headers))
 
-        print("\nLights' state:")
+        text.append("\nLights' state:")
         headers = ["Ambient"] + [f"Light {i}" for i in range(len(light))]
-        print(tabulate([self._lights_state()], headers=headers))
+        text.append(tabulate([self._lights_state()], headers=headers))
+
+        text.append("\nLast frame:")
+        headers = [
+            "Draw calls",
+            "Culled",
+            "Occluded",
+            "State changes",
+            "Matrix rebuilds",
+        ]
+        text.append(tabulate([self._render_state()], headers=headers))
+        text.append(f"\nFrame times: {self.scheduler.stats()}")
 
         title = f"\nCurrently controlling Object {i + 1} '{o[i].name}'. Mode: "
         match self.mode:
             case Mode.camera:
-                print(title + "CAMERA\n")
+                text.append(title + "CAMERA\n")
             case Mode.rotating:
-                print(title + "ROTATE\n")
+                text.append(title + "ROTATE\n")
             case Mode.translating:
-                print(title + "MOVE\n")
+                text.append(title + "MOVE\n")
             case Mode.scaling:
-                print(title + "SCALE\n")
+                text.append(title + "SCALE\n")
             case _:
-                print(title + "LIGHT\n")
+                text.append(title + "LIGHT\n")
+        return "\n".join(text)
@@ -0,0 +1,169 @@
+import ctypes
+from app.instanced_object import InstancedObject
+from app.static_batch import Drawable, StaticBatch
+from app.uniform_blocks import MAX_DRAWS, FrameUniforms
+from app.utils import Shader, VertexArray, gl_supports
+from numpy import arange, array, float32, uint32
+from OpenGL.GL import (
+    GL_ARRAY_BUFFER,
+    GL_DRAW_INDIRECT_BUFFER,
+    GL_STATIC_DRAW,
+    GL_STREAM_DRAW,
+    GL_TEXTURE_2D,
+    GL_TRIANGLES as TRIANGLES,
+    glBindBuffer,
+    glBindTexture,
+    glBufferData,
+    glGenBuffers,
+    glMultiDrawArraysIndirect,
+    glVertexAttrib1f,
+)
+
+
+class DrawBatcher:
+    """
+    Draw the opaque objects sharing a texture with a single indirect
+    multi-draw call, instead of one call per object.
+
+    Each object's record is copied to the ``DrawData`` block, and the draw
+    commands drawing the object carry its index there as their base
+    instance. A per-instance attribute holding consecutive numbers then
+    hands that index to the shaders, which read their record from it. Static
+    batches issue one command per run of baked vertices.
+
+    Objects with translucent textures, which must be drawn in depth order,
+    and instanced objects are left to be drawn one by one, as is everything
+    when the OpenGL version lacks indirect draws.
+
+    Attributes
+    ----------
+    supported : bool
+        Whether indirect multi-draw calls are available.
+    """
+
+    supported: bool
+    _uniforms: FrameUniforms
+    _vertex_array: VertexArray
+    _indirect: int
+    _calls: list[list[int]]
+
+    def __init__(
+        self, shader: Shader, uniforms: FrameUniforms, base: VertexArray
+    ):
+        """
+        Set up the draw index attribute and the indirect command buffer.
+
+        Parameters
+        ----------
+        shader : Shader
+            The scene's shader program.
+        uniforms : FrameUniforms
+            The scene's uniform records, holding the batched draw records.
+        base : VertexArray
+            The vertex array feeding the scene's vertices.
+        """
+        # Indirect draws with a base instance are core since OpenGL 4.3
+        self.supported = gl_supports((4, 3)) and bool(
+            glMultiDrawArraysIndirect
+        )
+        self._uniforms = uniforms
+        self._calls = []
+
+        # Draws not batched read -1, the attribute's value when disabled
+        index = shader.attribute("draw_index")
+        glVertexAttrib1f(index, -1.0)
+        indices = arange(MAX_DRAWS, dtype=float32)
+        buffer = int(glGenBuffers(1))
+        glBindBuffer(GL_ARRAY_BUFFER, buffer)
+        glBufferData(GL_ARRAY_BUFFER, indices.nbytes, indices, GL_STATIC_DRAW)
+        self._vertex_array = base.derive()
+        self._vertex_array.add(index, buffer, 1, divisor=1)
+        self._indirect = int(glGenBuffers(1))
+
+    def plan(self, objects: list[Drawable]) -> list[Drawable]:
+        """
+        Prepare the frame's batched draws, writing their records to the
+        frame's uniform buffer.
+
+        Parameters
+        ----------
+        objects : list[Drawable]
+            The objects to draw, in drawing order.
+
+        Returns
+        -------
+        list[Drawable]
+            The objects that must still be drawn one by one, in order.
+        """
+        self._calls = []
+        if not self.supported:
+            return objects
+
+        single: list[Drawable] = []
+        groups: dict[int, list[Drawable]] = {}
+        for obj in objects:
+            if obj.translucent or isinstance(obj, InstancedObject):
+                single.append(obj)
+            else:
+                groups.setdefault(obj.texture, []).append(obj)
+
+        # Commands are gathered as plain integers and converted at once, as
+        # most objects contribute a single one
+        firsts: list[int] = []
+        counts: list[int] = []
+        bases: list[int] = []
+        slots: list[int] = []
+        for texture, members in groups.items():
+            for i, obj in enumerate(members):
+                # Start a new call with each texture and each DrawData range
+                draw = len(slots)
+                if i == 0 or draw % MAX_DRAWS == 0:
+                    range_first = draw - draw % MAX_DRAWS
+                    self._calls.append([texture, range_first, len(counts), 0])
+                if isinstance(obj, StaticBatch):
+                    firsts.extend(obj.firsts.tolist())
+                    counts.extend(obj.counts.tolist())
+                    runs = len(obj.counts)
+                else:
+                    firsts.append(obj.initial_vertex)
+                    counts.append(obj.vertices_count)
+                    runs = 1
+                bases.extend([draw % MAX_DRAWS] * runs)
+                slots.append(obj.id)
+                self._calls[-1][3] += runs
+
+        if slots:
+            self._uniforms.draws[: len(slots)] = self._uniforms.records[slots]
+            # DrawArraysIndirectCommand: count, instances, first, base instance
+            buffer = array(
+                [counts, [1] * len(counts), firsts, bases], dtype=uint32
+            ).T.copy()
+            glBindBuffer(GL_DRAW_INDIRECT_BUFFER, self._indirect)
+            glBufferData(
+                GL_DRAW_INDIRECT_BUFFER, buffer.nbytes, buffer, GL_STREAM_DRAW
+            )
+        return single
+
+    def draw(self) -> int:
+        """
+        Issue the frame's batched draws.
+
+        Returns
+        -------
+        int
+            The number of draw calls issued.
+        """
+        if not self._calls:
+            return 0
+        self._vertex_array.bind()
+        glBindBuffer(GL_DRAW_INDIRECT_BUFFER, self._indirect)
+        bound = -1
+        for texture, range_first, offset, count in self._calls:
+            if range_first != bound:
+                self._uniforms.bind_draws(range_first)
+                bound = range_first
+            glBindTexture(GL_TEXTURE_2D, texture)
+            # Each command is four 32-bit integers
+            indirect = ctypes.c_void_p(offset * 16)
+            glMultiDrawArraysIndirect(TRIANGLES, indirect, count, 0)
+        return len(self._calls)
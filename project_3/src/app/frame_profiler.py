@@ -0,0 +1,209 @@
+import json
+from collections import deque
+from time import perf_counter_ns
+from numpy import percentile
+from OpenGL.GL import (
+    GL_QUERY_RESULT,
+    GL_QUERY_RESULT_AVAILABLE,
+    GL_TIME_ELAPSED,
+    glBeginQuery,
+    glEndQuery,
+    glGenQueries,
+    glGetQueryObjectuiv,
+)
+from tabulate import tabulate
+
+PERCENTILES = (50, 95, 99)
+# Elapsed times are read as 32-bit nanoseconds; a saturated result is invalid
+_OVERFLOW = 0xFFFFFFFF
+
+
+class FrameProfiler:
+    """
+    Time consecutive sections of each frame on both the CPU and the GPU, and
+    keep rolling percentiles of each section's times.
+
+    CPU times are measured with `perf_counter_ns`. GPU times are measured by
+    ``GL_TIME_ELAPSED`` queries, whose results are only read once available,
+    a few frames later, so that the CPU never waits for the GPU. Sections
+    cannot be nested, as only one such query may be active at once.
+
+    Attributes
+    ----------
+    history : int
+        Number of recent frames percentiles are computed over.
+    """
+
+    history: int
+    _cpu: dict[str, deque[int]]
+    _gpu: dict[str, deque[int]]
+    _current: tuple[str, int, int] | None = None
+    _frame_start: int = 0
+    _frame: list[tuple[str, int]]
+    _pending: deque[list[tuple[str, int]]]
+    _free: list[int]
+
+    def __init__(self, history: int = 240):
+        """
+        Parameters
+        ----------
+        history : int
+            Number of recent frames percentiles are computed over.
+        """
+        self.history = history
+        self._cpu = {}
+        self._gpu = {}
+        self._frame = []
+        self._pending = deque()
+        self._free = []
+
+    def section(self, name: str) -> None:
+        """
+        End the current section, if any, and start timing the next one.
+
+        Parameters
+        ----------
+        name : str
+            The section's name, the same every frame.
+        """
+        self._close()
+        now = perf_counter_ns()
+        if not self._frame:
+            self._frame_start = now
+        if not self._free:
+            self._free.extend(int(q) for q in glGenQueries(16))
+        query = self._free.pop()
+        glBeginQuery(GL_TIME_ELAPSED, query)
+        self._current = (name, now, query)
+
+    def end_frame(self) -> None:
+        """End the current section and the frame it belongs to."""
+        self._close()
+        if self._frame:
+            total = perf_counter_ns() - self._frame_start
+            self._record(self._cpu, "frame", total)
+            self._pending.append(self._frame)
+            self._frame = []
+        self._collect()
+
+    def latest(self, name: str = "frame") -> tuple[float | None, float | None]:
+        """
+        Get the most recent times of a section.
+
+        Parameters
+        ----------
+        name : str
+            The section's name, or ``"frame"`` for the whole frame.
+
+        Returns
+        -------
+        tuple[float | None, float | None]
+            The section's latest CPU and GPU times in milliseconds, or None
+            where not timed yet. GPU times lag a few frames behind.
+        """
+        cpu, gpu = self._cpu.get(name), self._gpu.get(name)
+        return (
+            cpu[-1] / 1e6 if cpu else None,
+            gpu[-1] / 1e6 if gpu else None,
+        )
+
+    def percentiles(self) -> dict[str, dict[str, list[float]]]:
+        """
+        Compute the percentiles of each section's recent times.
+
+        Returns
+        -------
+        dict[str, dict[str, list[float]]]
+            For each section, in the order first timed, and for the whole
+            frame last, its ``"cpu"`` and ``"gpu"`` times in milliseconds at
+            each of `PERCENTILES`. Sections not timed yet have no times.
+        """
+        names = [n for n in self._cpu if n != "frame"] + ["frame"]
+        result: dict[str, dict[str, list[float]]] = {}
+        for name in names:
+            result[name] = {}
+            for unit, samples in (("cpu", self._cpu), ("gpu", self._gpu)):
+                times = samples.get(name)
+                result[name][unit] = (
+                    [float(t) / 1e6 for t in percentile(times, PERCENTILES)]
+                    if times
+                    else []
+                )
+        return result
+
+    def table(self) -> str:
+        """
+        Format the percentiles as a table.
+
+        Returns
+        -------
+        str
+            A row per section, with CPU and GPU times in milliseconds.
+        """
+        headers = ["Section"] + [
+            f"{unit} p{p} (ms)" for unit in ("CPU", "GPU") for p in PERCENTILES
+        ]
+        rows = []
+        for name, times in self.percentiles().items():
+            row = [name]
+            for unit in ("cpu", "gpu"):
+                cells = [f"{t:.3f}" for t in times[unit]]
+                row += cells or ["-"] * len(PERCENTILES)
+            rows.append(row)
+        return tabulate(rows, headers=headers)
+
+    def json_lines(self) -> str:
+        """
+        Format the percentiles as JSON lines.
+
+        Returns
+        -------
+        str
+            A JSON object per section, one per line.
+        """
+        lines = []
+        for name, times in self.percentiles().items():
+            record: dict[str, object] = {"section": name}
+            for unit in ("cpu", "gpu"):
+                record[f"{unit}_ms"] = dict(
+                    zip((f"p{p}" for p in PERCENTILES), times[unit])
+                )
+            lines.append(json.dumps(record))
+        return "\n".join(lines) + "\n"
+
+    def _close(self) -> None:
+        if self._current is None:
+            return
+        name, start, query = self._current
+        glEndQuery(GL_TIME_ELAPSED)
+        self._record(self._cpu, name, perf_counter_ns() - start)
+        self._frame.append((name, query))
+        self._current = None
+
+    def _collect(self) -> None:
+        """Read the results of past frames' queries that are available."""
+        while self._pending:
+            queries = self._pending[0]
+            # Queries complete in order, so the last one tells for all
+            last = queries[-1][1]
+            if not glGetQueryObjectuiv(last, GL_QUERY_RESULT_AVAILABLE):
+                break
+            self._pending.popleft()
+            total, valid = 0, True
+            for name, query in queries:
+                elapsed = int(glGetQueryObjectuiv(query, GL_QUERY_RESULT))
+                self._free.append(query)
+                if elapsed == _OVERFLOW:
+                    valid = False
+                    continue
+                self._record(self._gpu, name, elapsed)
+                total += elapsed
+            if valid:
+                self._record(self._gpu, "frame", total)
+
+    def _record(
+        self, samples: dict[str, deque[int]], name: str, ns: int
+    ) -> None:
+        if name not in samples:
+            samples[name] = deque(maxlen=self.history)
+        samples[name].append(ns)
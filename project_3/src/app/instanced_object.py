@@ -0,0 +1,112 @@
+from typing import Any
+from app.object import Object
+from app.assets import AssetRegistry
+from app.transform_store import TransformStore, compose, transform_boxes
+from app.utils import ObjectConfig as Config, Shader, VertexArray
+from numpy import array, ascontiguousarray, float32, float64
+from numpy.typing import NDArray
+from OpenGL.GL import (
+    GL_ARRAY_BUFFER,
+    GL_STATIC_DRAW,
+    GL_TRIANGLES as TRIANGLES,
+    glBindBuffer,
+    glBufferData,
+    glDrawArraysInstanced,
+    glGenBuffers,
+)
+
+
+class InstancedObject(Object):
+    """
+    An object whose model is drawn many times in a single draw call.
+
+    The object's own position, rotation and scale place the whole group,
+    while each instance's placement is sent to the shader as a per-instance
+    attribute holding its model matrix.
+    """
+
+    _instances: NDArray[float32]
+    _buffer: Any
+    _revision: int = -1
+    _world_bounds: NDArray[float32]
+    _vertex_array: VertexArray
+
+    def __init__(
+        self,
+        id: int,
+        config: Config,
+        assets: AssetRegistry,
+        transforms: TransformStore,
+    ):
+        """Initialize the object and upload its instances' matrices.
+
+        Parameters
+        ----------
+        id : int
+            Unique identifier for the object.
+        config : Config
+            Configuration listing the placement of every instance.
+        assets : AssetRegistry
+            The registry loading the object's model.
+        transforms : TransformStore
+            The store in which the object takes a row.
+        """
+        instances = config.instances
+        self._instances = compose(
+            array([t.position for t in instances], dtype=float64),
+            array([t.rotation for t in instances], dtype=float64),
+            array([t.scale for t in instances], dtype=float64),
+        )
+        super().__init__(id, config, assets, transforms)
+
+        # GLSL reads a mat4 attribute column by column
+        matrices = ascontiguousarray(self._instances.transpose(0, 2, 1))
+        self._buffer = glGenBuffers(1)
+        glBindBuffer(GL_ARRAY_BUFFER, self._buffer)
+        glBufferData(GL_ARRAY_BUFFER, matrices.nbytes, matrices, GL_STATIC_DRAW)
+
+    @property
+    def instance_count(self) -> int:
+        return len(self._instances)
+
+    @property
+    def world_bounds(self) -> NDArray[float32]:
+        """The axis-aligned bounding box enclosing every instance in world
+        space, recomputed after each update of the object's matrix."""
+        matrix = self.transformation
+        revision = int(self._transforms.revisions[self._slot])
+        if revision != self._revision:
+            low, high = self._bounds
+            bounds = transform_boxes(
+                matrix @ self._instances,
+                (low + high) / 2,
+                (high - low) / 2,
+            )
+            self._world_bounds = array(
+                [bounds[:, 0].min(0), bounds[:, 1].max(0)]
+            )
+            self._revision = revision
+        return self._world_bounds
+
+    def init_vertex_array(self, base: VertexArray, shader: Shader) -> None:
+        """
+        Create the vertex array feeding the model's vertices along with the
+        instances' matrices.
+
+        Parameters
+        ----------
+        base : VertexArray
+            The vertex array feeding the scene's vertices.
+        shader : Shader
+            The scene's shader program.
+        """
+        self._vertex_array = base.derive()
+        loc = shader.attribute("instance_model")
+        self._vertex_array.add_matrix(loc, self._buffer, divisor=1)
+
+    def draw(self) -> None:
+        """Draw every instance with a single instanced draw call."""
+        self._vertex_array.bind()
+        glDrawArraysInstanced(
+            TRIANGLES, self.initial_vertex, self.vertices_count, self.instance_count
+        )
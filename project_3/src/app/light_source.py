@@ -1,5 +1,7 @@
 from app.object import Object
-from app.utils import ObjectConfig as Config, BufferData
+from app.assets import AssetRegistry
+from app.transform_store import TransformStore
+from app.utils import ObjectConfig as Config
 from app.utils.dataclasses import ReflectionCoefficients
 
 
@@ -11,7 +13,13 @@ class Light(Object):
     _on: bool = False
     _default: ReflectionCoefficients
 
-    def __init__(self, id: int, config: Config, bd: BufferData):
+    def __init__(
+        self,
+        id: int,
+        config: Config,
+        assets: AssetRegistry,
+        transforms: TransformStore,
+    ):
         """Initialize the Light object.
 
         Parameters
@@ -20,10 +28,12 @@ class Light(Object):
             Unique identifier for the object.
         config : Config
             Configuration containing illumination properties.
-        bd : BufferData
-            Buffer data for the object.
+        assets : AssetRegistry
+            The registry loading the object's model.
+        transforms : TransformStore
+            The store in which the object takes a row.
         """
-        super().__init__(id, config, bd)
+        super().__init__(id, config, assets, transforms)
         self._default = config.illumination_properties.reflection_coefficients
         self.toggle()
 
@@ -42,6 +52,8 @@ class Light(Object):
                 1.0, 1.0, 1.0, 1000.0
             )
         self._on = not self._on
+        if self.on_change is not None:
+            self.on_change()
 
     @property
     def intensity(self) -> float:
@@ -0,0 +1,305 @@
+import json
+import os
+import sys
+from collections import deque
+from datetime import datetime, timezone
+from threading import Event, Thread
+from typing import TYPE_CHECKING
+from numpy import mean, percentile
+from app.frame_profiler import PERCENTILES
+
+if TYPE_CHECKING:
+    from app.scene import Scene
+
+# Counts sampled every frame, averaged over each export interval
+COUNTERS = (
+    "draw_calls",
+    "triangles",
+    "culled",
+    "occluded",
+    "matrix_rebuilds",
+    "rebuilds_avoided",
+)
+
+# A frame's CPU and GPU times, if measured, and its counts
+_Sample = tuple[float | None, float | None, *tuple[int, ...]]
+
+# The Prometheus metric each count is exported as, and its description
+_PROMETHEUS = {
+    "draw_calls": ("render_draw_calls", "Draw calls issued per frame"),
+    "triangles": ("render_triangles", "Triangles submitted per frame"),
+    "culled": (
+        "render_culled_objects",
+        "Objects culled per frame by zone visibility",
+    ),
+    "occluded": (
+        "render_occluded_objects",
+        "Objects found occluded per frame",
+    ),
+    "matrix_rebuilds": (
+        "render_matrix_rebuilds",
+        "Model matrices rebuilt per frame",
+    ),
+    "rebuilds_avoided": (
+        "render_matrix_rebuilds_avoided",
+        "Writes to object placements per frame not costing a rebuild",
+    ),
+}
+
+
+class MetricsExporter:
+    """
+    Export the scene's rendering health from a background thread: frame time
+    percentiles, draw calls, triangles, culled objects, matrix rebuilds,
+    texture memory and the size of the Python heap.
+
+    Every `interval` seconds, a JSON object summarizing the frames drawn since
+    the previous export is appended to a JSON lines file, rotated once it
+    grows too large, and the same figures are written to a text file for the
+    Prometheus node exporter's textfile collector.
+
+    The render loop only hands each frame's counts over through `frame`,
+    which appends them to a queue; everything else is done by the thread.
+
+    Attributes
+    ----------
+    scene : Scene
+        The scene whose rendering is watched.
+    path : str | None
+        The JSON lines file, if any.
+    textfile : str | None
+        The Prometheus text file, if any, named ``*.prom``.
+    interval : float
+        Seconds between exports.
+    max_bytes : int
+        Size past which the JSON lines file is rotated.
+    backups : int
+        Number of rotated files kept, as ``path.1`` (the most recent) to
+        ``path.<backups>``.
+    frames : int
+        Number of frames exported so far.
+    """
+
+    scene: "Scene"
+    path: str | None
+    textfile: str | None
+    interval: float
+    max_bytes: int
+    backups: int
+    frames: int = 0
+    _samples: deque[_Sample]
+    _counts: dict[str, float]
+    _stopped: Event
+    _thread: Thread
+
+    def __init__(
+        self,
+        scene: "Scene",
+        path: str | None = None,
+        textfile: str | None = None,
+        interval: float = 10.0,
+        max_bytes: int = 10 * 1024 * 1024,
+        backups: int = 5,
+    ):
+        """
+        Start the background thread.
+
+        Parameters
+        ----------
+        scene : Scene
+            The scene whose rendering is watched.
+        path : str | None
+            The JSON lines file to append to, if any.
+        textfile : str | None
+            The Prometheus text file to write, if any.
+        interval : float
+            Seconds between exports.
+        max_bytes : int
+            Size past which the JSON lines file is rotated.
+        backups : int
+            Number of rotated files kept.
+        """
+        self.scene = scene
+        self.path = path
+        self.textfile = textfile
+        self.interval = interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._samples = deque()
+        self._counts = {name: 0.0 for name in COUNTERS}
+        self._stopped = Event()
+        self._thread = Thread(
+            target=self._run, name="metrics-exporter", daemon=True
+        )
+        self._thread.start()
+
+    def frame(self) -> None:
+        """Record the counts of the frame just drawn, from the render loop."""
+        scene = self.scene
+        cpu, gpu = scene.profiler.latest()
+        self._samples.append(
+            (
+                cpu,
+                gpu,
+                scene.draw_calls,
+                scene.triangles,
+                scene.visibility.culled,
+                scene.occlusion.occluded if scene.occlusion_culling else 0,
+                scene.matrix_rebuilds,
+                scene.rebuilds_avoided,
+            )
+        )
+
+    def close(self) -> None:
+        """Stop the thread, after exporting the frames not exported yet."""
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._export()
+        self._export()
+
+    def _export(self) -> None:
+        samples: list[_Sample] = []
+        while self._samples:
+            samples.append(self._samples.popleft())
+        self.frames += len(samples)
+        metrics = self._summarize(samples)
+        if self.path:
+            self._append(json.dumps(metrics) + "\n")
+        if self.textfile:
+            self._write_textfile(metrics)
+
+    def _summarize(self, samples: list[_Sample]) -> dict[str, object]:
+        """
+        Summarize the frames drawn since the previous export.
+
+        Parameters
+        ----------
+        samples : list[_Sample]
+            The frames' times and counts.
+
+        Returns
+        -------
+        dict[str, object]
+            The frames' time percentiles in milliseconds and mean counts,
+            along with the current memory figures.
+        """
+        metrics: dict[str, object] = {
+            "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "frames": len(samples),
+            "frames_total": self.frames,
+        }
+        for index, clock in enumerate(("cpu", "gpu")):
+            times: list[float] = [
+                t for s in samples if (t := s[index]) is not None
+            ]
+            metrics[f"frame_{clock}_ms"] = (
+                dict(
+                    zip(
+                        (f"p{p}" for p in PERCENTILES),
+                        (float(t) for t in percentile(times, PERCENTILES)),
+                    )
+                )
+                if times
+                else {}
+            )
+        # With no frame drawn, as the scene is only drawn when it changes,
+        # the last frame's counts still hold
+        if samples:
+            for index, name in enumerate(COUNTERS, start=2):
+                self._counts[name] = float(mean([s[index] for s in samples]))
+        metrics.update(self._counts)
+        metrics["texture_memory_bytes"] = self.scene.texture_memory
+        metrics["python_allocated_blocks"] = sys.getallocatedblocks()
+        metrics["resident_memory_bytes"] = _resident_memory()
+        return metrics
+
+    def _append(self, line: str) -> None:
+        """Append a line to the JSON lines file, rotating it if full."""
+        path = self.path
+        assert path is not None
+        if (
+            os.path.exists(path)
+            and os.path.getsize(path) + len(line) > self.max_bytes
+        ):
+            for i in range(self.backups - 1, 0, -1):
+                if os.path.exists(f"{path}.{i}"):
+                    os.replace(f"{path}.{i}", f"{path}.{i + 1}")
+            if self.backups > 0:
+                os.replace(path, f"{path}.1")
+            else:
+                os.remove(path)
+        with open(path, "a") as file:
+            _ = file.write(line)
+
+    def _write_textfile(self, metrics: dict[str, object]) -> None:
+        """
+        Write the metrics in the Prometheus text format, replacing the file
+        at once so that it is never collected half written.
+        """
+        lines = [
+            "# HELP render_frame_time_seconds Frame time percentiles over "
+            "the last export interval.",
+            "# TYPE render_frame_time_seconds gauge",
+        ]
+        for clock in ("cpu", "gpu"):
+            times = metrics[f"frame_{clock}_ms"]
+            assert isinstance(times, dict)
+            for p in PERCENTILES:
+                if f"p{p}" in times:
+                    lines.append(
+                        "render_frame_time_seconds"
+                        f'{{clock="{clock}",quantile="{p / 100}"}} '
+                        f"{times[f'p{p}'] / 1000:.9f}"
+                    )
+        gauges = [
+            (metric, description, metrics[name])
+            for name, (metric, description) in _PROMETHEUS.items()
+        ] + [
+            (
+                "render_texture_memory_bytes",
+                "Bytes taken by textures on the GPU",
+                metrics["texture_memory_bytes"],
+            ),
+            (
+                "python_allocated_blocks",
+                "Memory blocks allocated by the Python interpreter",
+                metrics["python_allocated_blocks"],
+            ),
+            (
+                "render_resident_memory_bytes",
+                "Resident memory of the process",
+                metrics["resident_memory_bytes"],
+            ),
+        ]
+        for name, description, value in gauges:
+            if value is None:
+                continue
+            lines += [
+                f"# HELP {name} {description}.",
+                f"# TYPE {name} gauge",
+                f"{name} {value}",
+            ]
+        lines += [
+            "# HELP render_frames_total Frames drawn.",
+            "# TYPE render_frames_total counter",
+            f"render_frames_total {self.frames}",
+        ]
+
+        textfile = self.textfile
+        assert textfile is not None
+        with open(f"{textfile}.tmp", "w") as file:
+            _ = file.write("\n".join(lines) + "\n")
+        os.replace(f"{textfile}.tmp", textfile)
+
+
+def _resident_memory() -> int | None:
+    """Resident memory of the process in bytes, where it can be read."""
+    try:
+        with open("/proc/self/statm") as file:
+            pages = int(file.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE")
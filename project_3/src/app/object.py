@@ -1,48 +1,58 @@
-from glob import glob
+from typing import TYPE_CHECKING, Callable
+from app.assets import AssetRegistry
+from app.transform_store import TransformStore, TransformView, euler_angles
 from app.utils import (
-    BufferData,
-    Face,
     Location,
-    Model,
     ObjectConfig as Config,
     ObjectState as State,
     IlluminationProperties,
 )
-from OpenGL.GL.images import glTexImage2D
-from OpenGL.constants import GL_UNSIGNED_BYTE
-from PIL import Image
-from OpenGL.GL import (
-    GL_LINEAR,
-    GL_REPEAT,
-    GL_RGB,
-    GL_TEXTURE_2D,
-    GL_TEXTURE_MAG_FILTER,
-    GL_TEXTURE_MIN_FILTER,
-    GL_TEXTURE_WRAP_S,
-    GL_TEXTURE_WRAP_T,
-    glTexParameteri,
-    glBindTexture,
-)
-from numpy import array, cos, float32, sin
+from numpy import array, float32, float64
 from numpy.typing import NDArray
 
+if TYPE_CHECKING:
+    from app.static_batch import StaticBatch
+
 
 class Object:
     """
     A class representing a 3D object in the scene.
+
+    Its rotation is given by Euler angles, or by a quaternion once one is
+    set as its `orientation`, until its Euler angles are written to again.
+
+    An object may be the child of another, in which case its position,
+    rotation and scale are relative to its parent's, and it moves along with
+    it.
     """
     name: str
     location: Location
     illumination: IlluminationProperties
+    static: bool
+    translucent: bool
+    batch: "StaticBatch | None" = None
+    on_change: Callable[[], None] | None = None
     _id: int
     _initial_vertex: int
     _vertices_count: int
+    _texture: int
     _initial: State
-    _current: State
-    _transformation: NDArray[float32]
+    _bounds: NDArray[float32]
+    _transforms: TransformStore
+    _slot: int
+    _position: TransformView
+    _rotation: TransformView
+    _parent: "Object | None" = None
+    _children: list["Object"]
 
-    def __init__(self, id: int, config: Config, bd: BufferData):
-        """Initialize the object with a unique ID, configuration, and buffer data.
+    def __init__(
+        self,
+        id: int,
+        config: Config,
+        assets: AssetRegistry,
+        transforms: TransformStore,
+    ):
+        """Initialize the object with a unique ID, configuration, and assets.
 
         Parameters
         ----------
@@ -50,31 +60,51 @@ class Object:
             The unique identifier for the object.
         config : Config
             The configuration for the object (e.g., model name, path, illumination).
-        bd : BufferData
-            The buffer data for storing vertices, texture coordinates, and normals.
+        assets : AssetRegistry
+            The registry loading the object's model, shared among objects.
+        transforms : TransformStore
+            The store holding the placement of every object in the scene, in
+            which the object takes a row.
         """
         self._id = id
-        self.name = config.model_name
+        self.name = config.name
         self.location = config.location
         self.illumination = config.illumination_properties
-        self._initial_vertex, self._vertices_count = self._load_object(
-            f"{config.path}/{config.model_name}", bd
+        self.static = config.static
+        mesh = assets.load(f"{config.path}/{config.model_name}")
+        self._initial_vertex = mesh.first_vertex
+        self._vertices_count = mesh.vertices_count
+        self._texture = mesh.texture
+        self._bounds = mesh.bounds
+        self.translucent = mesh.translucent
+        self._initial = State(
+            config.position,
+            config.rotation,
+            config.scale,
+            orientation=config.orientation,
         )
-        parameters = {
-            "position": config.position,
-            "rotation": config.rotation,
-            "scale": config.scale,
-            "callback": self._update
-        }
-        self._initial = State(**parameters)  # pyright: ignore [reportArgumentType]
-        self._current = State(**parameters)  # pyright: ignore [reportArgumentType]
-        self._update()
-
+        self._transforms = transforms
+        self._slot = transforms.add(
+            config.position, config.rotation, config.scale, mesh.bounds
+        )
+        self._position = TransformView(
+            transforms, "positions", self._slot, self._moved
+        )
+        self._rotation = TransformView(
+            transforms, "rotations", self._slot, self._turned
+        )
+        self._children = []
+        if config.orientation is not None:
+            self._orient(config.orientation)
 
     @property
     def id(self) -> int:
         return self._id
 
+    @property
+    def texture(self) -> int:
+        return self._texture
+
     @property
     def initial_vertex(self) -> int:
         return self._initial_vertex
@@ -85,176 +115,145 @@ class Object:
 
     @property
     def transformation(self) -> NDArray[float32]:
-        return self._transformation
+        """The object's model matrix in world space, rebuilt along with every
+        other stale one on the first read after the object or one of its
+        ancestors moved."""
+        transforms = self._transforms
+        if transforms.stale(self._slot):
+            transforms.update()
+        return transforms.matrices[self._slot]
+
+    @property
+    def local_transformation(self) -> NDArray[float32]:
+        """The object's model matrix relative to its parent's, the same as
+        its world one for objects without a parent."""
+        transforms = self._transforms
+        if transforms.stale(self._slot):
+            transforms.update()
+        return transforms.local_matrices[self._slot]
 
     @property
-    def position(self) -> dict[str, float]:
-        return self._current.position
+    def parent(self) -> "Object | None":
+        """The object this one is placed relative to, if any. Setting it
+        keeps the object's own position, rotation and scale, which are then
+        relative to the new parent, and raises a ValueError if the object
+        would become its own ancestor."""
+        return self._parent
+
+    @parent.setter
+    def parent(self, value: "Object | None"):
+        slot = -1 if value is None else value._slot
+        self._transforms.set_parent(self._slot, slot)
+        if self._parent is not None:
+            self._parent._children.remove(self)
+        if value is not None:
+            value._children.append(self)
+        self._parent = value
+        self._moved()
+
+    @property
+    def children(self) -> tuple["Object", ...]:
+        return tuple(self._children)
+
+    @property
+    def world_bounds(self) -> NDArray[float32]:
+        """The axis-aligned bounding box of the object in world space, as a
+        2x3 array holding its minimum and maximum corners."""
+        transforms = self._transforms
+        if transforms.stale(self._slot):
+            transforms.update()
+        return transforms.bounds[self._slot]
+
+    @property
+    def position(self) -> TransformView:
+        return self._position
 
     @position.setter
     def position(self, value: dict[str, float]):
-        self._current.position = value
+        self._position.update(value)
 
     @property
-    def rotation(self) -> dict[str, float]:
-        return self._current.rotation
+    def rotation(self) -> TransformView:
+        return self._rotation
 
     @rotation.setter
     def rotation(self, value: dict[str, float]):
-        self._current.rotation = value
+        self._rotation.update(value)
+
+    @property
+    def orientation(self) -> tuple[float, float, float, float] | None:
+        """The object's rotation as a unit quaternion (x, y, z, w), if given
+        as one rather than by its Euler angles, which then follow it.
+        Setting it to None goes back to the Euler angles, and setting a zero
+        quaternion raises a ValueError."""
+        slot = self._slot
+        if not self._transforms.has_quaternion[slot]:
+            return None
+        x, y, z, w = self._transforms.quaternions[slot].tolist()
+        return (x, y, z, w)
+
+    @orientation.setter
+    def orientation(self, value: tuple[float, float, float, float] | None):
+        if value is None:
+            self._transforms.has_quaternion[self._slot] = False
+        else:
+            self._orient(value)
+        self._moved()
 
     @property
     def scale(self) -> float:
-        return self._current.scale
+        return float(self._transforms.scales[self._slot])
 
     @scale.setter
     def scale(self, value: float):
-        self._current.scale = max(0.01, value)
-        self._update()
-
-    def _load_model(self, path: str) -> Model:
-        model = Model()
-        material: str | None = None
-
-        for line in open(f"{path}/model.obj", "r"):
-            if line.startswith("#"):
-                continue
-            values = line.split()
-            if not values:
-                continue
-            match values[0]:
-                case "v":
-                    model.vertices.append(
-                        (float(values[1]), float(values[2]), float(values[3]))
-                    )
-                case "vt":
-                    model.texture_coord.append(
-                        (float(values[1]), float(values[2]))
-                    )
-                case "vn":
-                    model.normals.append(
-                        (float(values[1]), float(values[2]), float(values[3]))
-                    )
-                case "f":
-                    face = Face(material=material)
-                    for v in values[1:]:
-                        w: list[str] = v.split("/")
-                        face.vertices.append(int(w[0]))
-                        if len(w) >= 2 and len(w[1]) > 0:
-                            face.texture.append(int(w[1]))
-                        else:
-                            face.texture.append(0)
-                        face.normals.append(int(w[2]))
-                    model.faces.append(face)
-                case "usemtl" | "usemat":
-                    material = values[1]
-                case _:
-                    pass
-        return model
-
-    def _load_texture(self, path: str):
-        glBindTexture(GL_TEXTURE_2D, self._id)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_S, GL_REPEAT)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_WRAP_T, GL_REPEAT)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MIN_FILTER, GL_LINEAR)
-        glTexParameteri(GL_TEXTURE_2D, GL_TEXTURE_MAG_FILTER, GL_LINEAR)
-        img = Image.open(glob(f"{path}/texture.*")[0])
-        width = img.size[0]
-        height = img.size[1]
-        img_data = img.tobytes("raw", "RGB", 0, -1)
-        glTexImage2D(
-            GL_TEXTURE_2D,
-            0,
-            GL_RGB,
-            width,
-            height,
-            0,
-            GL_RGB,
-            GL_UNSIGNED_BYTE,
-            img_data,
-        )
-
-    @staticmethod
-    def _triangulate_face(face: list[int]) -> list[int]:
-        triangulated_face: list[int] = []
-        for i in range(1, len(face) - 1):
-            triangulated_face.extend([face[0], face[i], face[i + 1]])
-        return triangulated_face
-
-    def _load_object(self, path: str, bd: BufferData) -> tuple[int, int]:
-        model = self._load_model(path)
-        start = len(bd.vertices)
-        for face in model.faces:
-            for vertex_id in Object._triangulate_face(face.vertices):
-                bd.vertices.append(model.vertices[vertex_id - 1])
-            for texture_id in Object._triangulate_face(face.texture):
-                bd.texture_coord.append(model.texture_coord[texture_id - 1])
-            for normal_id in Object._triangulate_face(face.normals):
-                bd.normals.append(model.normals[normal_id - 1])
-        self._load_texture(path)
-
-        return start, len(bd.vertices) - start
+        self._transforms.scales[self._slot] = max(0.01, value)
+        self._moved()
 
     def reset(self) -> None:
         """
         Reset the object to its initial position, rotation, and scale.
         """
-        self._current.copy(self._initial)
+        initial, slot = self._initial, self._slot
+        self._transforms.positions[slot] = list(initial.position.values())
+        self._transforms.rotations[slot] = list(initial.rotation.values())
+        self._transforms.scales[slot] = initial.scale
+        self._transforms.has_quaternion[slot] = False
+        if initial.orientation is not None:
+            self._orient(initial.orientation)
+        self._moved()
 
-    def _rotationMatrix(self, axis: str) -> NDArray[float32]:
-        c = cos(self.rotation[axis])
-        s = sin(self.rotation[axis])
-        match axis:
-            case "x":
-                matrix = [
-                    [1.0, 0.0, 0.0, 0.0],
-                    [0.0, c, -s, 0.0],
-                    [0.0, s, c, 0.0],
-                    [0.0, 0.0, 0.0, 1.0],
-                ]
-            case "y":
-                matrix = [
-                    [c, 0.0, s, 0.0],
-                    [0.0, 1.0, 0.0, 0.0],
-                    [-s, 0.0, c, 0.0],
-                    [0.0, 0.0, 0.0, 1.0],
-                ]
-            case _:
-                matrix = [
-                    [c, -s, 0.0, 0.0],
-                    [s, c, 0.0, 0.0],
-                    [0.0, 0.0, 1.0, 0.0],
-                    [0.0, 0.0, 0.0, 1.0],
-                ]
-        return array(matrix, dtype=float32)
+    def _orient(self, quaternion: tuple[float, float, float, float]) -> None:
+        """Write a quaternion to the object's row, normalized, along with
+        the Euler angles it stands for."""
+        transforms, slot = self._transforms, self._slot
+        value = array([quaternion], dtype=float64)
+        length = float((value * value).sum()) ** 0.5
+        if length == 0.0:
+            raise ValueError("A zero quaternion is not a rotation.")
+        value /= length
+        transforms.quaternions[slot] = value[0]
+        transforms.has_quaternion[slot] = True
+        transforms.rotations[slot] = euler_angles(value)[0]
 
-    def _update(self):
-        s = self.scale
-        scale = array(
-            [
-                [s, 0.0, 0.0, 0.0],
-                [0.0, s, 0.0, 0.0],
-                [0.0, 0.0, s, 0.0],
-                [0.0, 0.0, 0.0, 1.0],
-            ],
-            dtype=float32,
-        )
+    def _turned(self) -> None:
+        """Go back to the Euler angles, after they were written to."""
+        self._transforms.has_quaternion[self._slot] = False
+        self._moved()
 
-        p = self.position
-        translation = array(
-            [
-                [1.0, 0.0, 0.0, p["x"]],
-                [0.0, 1.0, 0.0, p["y"]],
-                [0.0, 0.0, 1.0, p["z"]],
-                [0.0, 0.0, 0.0, 1.0],
-            ],
-            dtype=float32,
-        )
+    def _moved(self) -> None:
+        """Mark the object's row as dirty, after its placement changed."""
+        # Batches left behind read their members' bounds, which would be
+        # stale if the row was marked first
+        self._unbatch()
+        self._transforms.mark(self._slot)
+        if self.on_change is not None:
+            self.on_change()
 
-        self._transformation = (
-            translation
-            @ self._rotationMatrix("z")
-            @ self._rotationMatrix("y")
-            @ self._rotationMatrix("x")
-            @ scale
-        ).astype(float32)
+    def _unbatch(self) -> None:
+        """Take the object and its descendants, which move along with it,
+        out of their batches."""
+        # A static object being moved is no longer drawn with its batch
+        if self.batch is not None:
+            self.batch.remove(self)
+        for child in self._children:
+            child._unbatch()
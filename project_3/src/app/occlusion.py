@@ -0,0 +1,228 @@
+from contextlib import contextmanager
+from typing import Iterator
+from app.static_batch import Drawable
+from app.uniform_blocks import FrameUniforms
+from app.utils import BufferData, VertexArray
+from numpy import array, float32, zeros
+from numpy.typing import NDArray
+from OpenGL.GL import (
+    GL_ANY_SAMPLES_PASSED,
+    GL_FALSE as FALSE,
+    GL_QUERY_RESULT,
+    GL_QUERY_RESULT_AVAILABLE,
+    GL_QUERY_WAIT,
+    GL_TRIANGLES as TRIANGLES,
+    GL_TRUE as TRUE,
+    glBeginConditionalRender,
+    glBeginQuery,
+    glColorMask,
+    glDepthMask,
+    glDrawArrays,
+    glEndConditionalRender,
+    glEndQuery,
+    glGenQueries,
+    glGetQueryObjectuiv,
+)
+
+# Corners of the unit cube's faces, as quads later split into triangles
+_CUBE_FACES = (
+    ((-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1)),
+    ((-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)),
+    ((-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1)),
+    ((-1, 1, -1), (1, 1, -1), (1, 1, 1), (-1, 1, 1)),
+    ((-1, -1, -1), (-1, 1, -1), (-1, 1, 1), (-1, -1, 1)),
+    ((1, -1, -1), (1, 1, -1), (1, 1, 1), (1, -1, 1)),
+)
+
+
+class OcclusionCuller:
+    """
+    Skip objects hidden behind others using hardware occlusion queries.
+
+    Every frame, each object's bounding box is rasterized against the depth
+    buffer inside a `GL_ANY_SAMPLES_PASSED` query. Query results are only
+    read once the driver reports them available, so the CPU never waits on
+    the GPU: objects seen in the last available result are drawn as usual,
+    while objects found occluded are drawn under conditional rendering on
+    their latest query, letting the GPU discard them if they remain hidden.
+
+    Attributes
+    ----------
+    occluded : int
+        Number of objects found occluded by the latest available results.
+    """
+
+    _uniforms: FrameUniforms
+    _first_slot: int
+    _vertex_array: VertexArray
+    _box_first: int
+    _box_count: int
+    _queries: dict[int, int]
+    _pending: set[int]
+    _occluded: set[int]
+    _margin: float
+    occluded: int = 0
+
+    def __init__(
+        self,
+        uniforms: FrameUniforms,
+        first_slot: int,
+        bd: BufferData,
+        vertex_array: VertexArray,
+        margin: float = 0.1,
+    ):
+        """
+        Append the bounding box geometry to the scene's buffer data.
+
+        Parameters
+        ----------
+        uniforms : FrameUniforms
+            The scene's uniform records.
+        first_slot : int
+            The first of the object records reserved for bounding boxes,
+            followed by one record per object ID.
+        bd : BufferData
+            The buffer data shared by the scene's objects.
+        vertex_array : VertexArray
+            The vertex array feeding the buffer data to the shaders.
+        margin : float
+            How far around a box the camera is still considered inside it,
+            which should be at least the camera's near plane distance.
+        """
+        self._uniforms = uniforms
+        self._first_slot = first_slot
+        self._vertex_array = vertex_array
+        self._box_first = len(bd.vertices)
+        for a, b, c, d in _CUBE_FACES:
+            for corner in (a, b, c, a, c, d):
+                bd.vertices.append(corner)
+                bd.texture_coord.append((0.0, 0.0))
+                bd.normals.append((0.0, 0.0, 0.0))
+        self._box_count = len(bd.vertices) - self._box_first
+        self._queries = {}
+        self._pending = set()
+        self._occluded = set()
+        self._margin = margin
+
+    def collect(self) -> None:
+        """
+        Read back the query results that are already available, without
+        blocking on those still in flight.
+        """
+        for obj_id in list(self._pending):
+            query = self._queries[obj_id]
+            if not glGetQueryObjectuiv(query, GL_QUERY_RESULT_AVAILABLE):
+                continue
+            self._pending.discard(obj_id)
+            if glGetQueryObjectuiv(query, GL_QUERY_RESULT):
+                self._occluded.discard(obj_id)
+            else:
+                self._occluded.add(obj_id)
+        self.occluded = len(self._occluded)
+
+    def split(
+        self, objects: list[Drawable], eye: NDArray[float32]
+    ) -> tuple[list[Drawable], list[Drawable]]:
+        """
+        Separate the objects last seen as visible from the occluded ones.
+
+        Parameters
+        ----------
+        objects : list[Drawable]
+            The objects to be drawn this frame.
+        eye : NDArray[float32]
+            The camera position. Boxes enclosing it are always visible, as
+            their faces may be clipped away by the near plane.
+
+        Returns
+        -------
+        tuple[list[Drawable], list[Drawable]]
+            The objects to draw unconditionally, to be drawn first so they
+            fill the depth buffer, and those to draw conditionally.
+        """
+        visible: list[Drawable] = []
+        hidden: list[Drawable] = []
+        for obj in objects:
+            if obj.id in self._occluded and not self._encloses(obj, eye):
+                hidden.append(obj)
+            else:
+                self._occluded.discard(obj.id)
+                visible.append(obj)
+        return visible, hidden
+
+    def prepare(self, objects: list[Drawable]) -> None:
+        """
+        Write the objects' bounding boxes into their reserved records, which
+        must be done before the records are uploaded for the frame.
+
+        Parameters
+        ----------
+        objects : list[Drawable]
+            The objects to be tested this frame.
+        """
+        if not objects:
+            return
+        bounds = array([o.world_bounds for o in objects])
+        center = (bounds[:, 0] + bounds[:, 1]) / 2
+        extent = (bounds[:, 1] - bounds[:, 0]) / 2 + 1e-3
+        boxes = zeros((len(objects), 4, 4), dtype=float32)
+        boxes[:, [0, 1, 2], [0, 1, 2]] = extent
+        boxes[:, :3, 3] = center
+        boxes[:, 3, 3] = 1.0
+        slots = [self._first_slot + o.id for o in objects]
+        self._uniforms.objects["model"][slots] = boxes
+
+    def query(self, objects: list[Drawable], eye: NDArray[float32]) -> None:
+        """
+        Issue occlusion queries for the objects' bounding boxes against the
+        current depth buffer, leaving color and depth untouched. The boxes
+        must have been written with `prepare`.
+
+        Parameters
+        ----------
+        objects : list[Drawable]
+            The objects to be tested.
+        eye : NDArray[float32]
+            The camera position.
+        """
+        missing = [o.id for o in objects if o.id not in self._queries]
+        if missing:
+            ids = glGenQueries(len(missing))
+            self._queries.update(zip(missing, (int(q) for q in ids)))
+
+        self._vertex_array.bind()
+        glColorMask(FALSE, FALSE, FALSE, FALSE)
+        glDepthMask(FALSE)
+        for obj in objects:
+            # A query still in flight keeps its last result for next frame
+            if obj.id in self._pending or self._encloses(obj, eye):
+                continue
+            self._uniforms.bind_object(self._first_slot + obj.id)
+            glBeginQuery(GL_ANY_SAMPLES_PASSED, self._queries[obj.id])
+            glDrawArrays(TRIANGLES, self._box_first, self._box_count)
+            glEndQuery(GL_ANY_SAMPLES_PASSED)
+            self._pending.add(obj.id)
+        glDepthMask(TRUE)
+        glColorMask(TRUE, TRUE, TRUE, TRUE)
+
+    @contextmanager
+    def conditional(self, obj: Drawable) -> Iterator[None]:
+        """
+        Render the enclosed draw calls only if the object's latest query
+        found any of its bounding box visible, as decided by the GPU.
+
+        Parameters
+        ----------
+        obj : Drawable
+            An object whose bounding box has already been queried.
+        """
+        glBeginConditionalRender(self._queries[obj.id], GL_QUERY_WAIT)
+        try:
+            yield
+        finally:
+            glEndConditionalRender()
+
+    def _encloses(self, obj: Drawable, eye: NDArray[float32]) -> bool:
+        low, high = obj.world_bounds
+        m = self._margin
+        return bool(((low - m <= eye) & (eye <= high + m)).all())
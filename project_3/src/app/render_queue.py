@@ -0,0 +1,143 @@
+from dataclasses import astuple
+from app.static_batch import Drawable
+from numpy import (
+    arange,
+    argsort,
+    array,
+    count_nonzero,
+    float32,
+    intp,
+    uint16,
+    uint64,
+)
+from numpy.typing import NDArray
+
+# Sort keys are 64 bits wide. An object's state packs its shader program,
+# texture and material into 39 bits, below which opaque objects have their
+# depth, front to back. Blended objects have the top bit set, and must be
+# drawn back to front regardless of state, so their depth comes first.
+#
+#   opaque:  0 | program:7 | texture:16 | material:16 | depth:24
+#   blended: 1 | inverted depth:24 | program:7 | texture:16 | material:16
+_DEPTH_BITS = 24
+_STATE_BITS = 39
+_BLENDED = uint64(1 << 63)
+
+
+def radix_sort(keys: NDArray[uint64]) -> NDArray[intp]:
+    """
+    Sort 64-bit keys with a least significant digit radix sort.
+
+    Parameters
+    ----------
+    keys : NDArray[uint64]
+        The keys to sort.
+
+    Returns
+    -------
+    NDArray[intp]
+        The indices that sort the keys in ascending order.
+    """
+    order = arange(len(keys))
+    for shift in range(0, 64, 16):
+        digits = (keys[order] >> uint64(shift)).astype(uint16)
+        if len(digits) and digits.min() == digits.max():
+            continue
+        # NumPy's stable sort of 16-bit integers is itself a radix sort
+        order = order[argsort(digits, kind="stable")]
+    return order
+
+
+class RenderQueue:
+    """
+    Order the objects drawn each frame to reduce state changes between
+    consecutive draw calls.
+
+    Every object gets a 64-bit key packing its blending mode, shader program,
+    texture, material and view depth. Opaque objects come first, grouped by
+    state and drawn front to back within each group, so that early depth
+    testing discards hidden fragments. Objects with see-through textures are
+    drawn last, back to front, for blending to be correct.
+
+    Attributes
+    ----------
+    changes_before : int
+        State changes between consecutive objects in the order given to the
+        last `sort`.
+    changes_after : int
+        State changes between consecutive objects in the sorted order.
+    """
+
+    changes_before: int = 0
+    changes_after: int = 0
+    _materials: dict[tuple[object, ...], int]
+
+    def __init__(self) -> None:
+        self._materials = {}
+
+    def sort(
+        self, objects: list[Drawable], view: NDArray[float32], program: int
+    ) -> list[Drawable]:
+        """
+        Sort the objects to be drawn this frame.
+
+        Parameters
+        ----------
+        objects : list[Drawable]
+            The objects to draw.
+        view : NDArray[float32]
+            The camera's view matrix.
+        program : int
+            The shader program the objects are drawn with.
+
+        Returns
+        -------
+        list[Drawable]
+            The same objects, in drawing order.
+        """
+        if not objects:
+            self.changes_before = self.changes_after = 0
+            return objects
+
+        blended = array([o.translucent for o in objects])
+        fields = array(
+            [(program, o.texture, self._material(o)) for o in objects],
+            dtype=uint64,
+        ) & array([0x7F, 0xFFFF, 0xFFFF], dtype=uint64)
+        states: NDArray[uint64] = (
+            fields[:, 0] << uint64(32)
+            | fields[:, 1] << uint64(16)
+            | fields[:, 2]
+        )
+
+        # Quantize each object's view depth, relative to the farthest one
+        bounds = array([o.world_bounds for o in objects], dtype=float32)
+        centers = bounds.mean(axis=1)
+        depth = -(centers @ view[2, :3] + view[2, 3])
+        depth = depth.clip(0.0) / max(float(depth.max()), 1e-6)
+        steps = (1 << _DEPTH_BITS) - 1
+        near_first = (depth * steps).astype(uint64)
+
+        keys = states << uint64(_DEPTH_BITS) | near_first
+        far_first = (uint64(steps) - near_first) << uint64(_STATE_BITS)
+        keys[blended] = (_BLENDED | far_first | states)[blended]
+        order = radix_sort(keys)
+
+        states[blended] |= uint64(1 << _STATE_BITS)
+        self.changes_before = self._changes(states)
+        self.changes_after = self._changes(states[order])
+        return [objects[i] for i in order]
+
+    def _material(self, obj: Drawable) -> int:
+        """Number each distinct material in the order they are first seen."""
+        illumination = obj.illumination
+        material = (
+            astuple(illumination.reflection_coefficients),
+            illumination.ambient_color,
+            illumination.emission_color,
+        )
+        return self._materials.setdefault(material, len(self._materials))
+
+    @staticmethod
+    def _changes(states: NDArray[uint64]) -> int:
+        return int(count_nonzero(states[1:] != states[:-1]))
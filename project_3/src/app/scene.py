@@ -1,19 +1,35 @@
-import ctypes
 from numpy import array, float32
+from app.animation import Animator
+from app.assets import AssetRegistry
 from app.camera import Camera
+from app.draw_batcher import DrawBatcher
+from app.frame_profiler import FrameProfiler
 from app.object import Object
+from app.instanced_object import InstancedObject
 from app.light_source import Light
+from app.occlusion import OcclusionCuller
+from app.render_queue import RenderQueue
+from app.static_batch import Drawable, StaticBatch, build_static_batches
+from app.transform_store import TransformStore
+from app.uniform_blocks import FrameUniforms
 from app.utils import (
     BufferData,
     IlluminationProperties,
+    InstanceTransform,
+    Interpolation,
+    KeyframeTrack,
     Location,
     ObjectConfig,
+    Portal,
     ReflectionCoefficients,
     Shader,
+    VertexArray,
 )
-from dataclasses import asdict
+from app.visibility import ZoneVisibility
+from app.window import get_window_size, show_window, swap_buffers
 import toml
 import os
+from functools import partial
 from typing import Any
 from OpenGL.GL import (
     GL_ARRAY_BUFFER,
@@ -22,7 +38,6 @@ from OpenGL.GL import (
     GL_DEPTH_BUFFER_BIT,
     GL_DEPTH_TEST,
     GL_DONT_CARE,
-    GL_FLOAT as FLOAT,
     GL_LINE_SMOOTH,
     GL_LINE_SMOOTH_HINT,
     GL_ONE_MINUS_SRC_ALPHA,
@@ -30,7 +45,6 @@ from OpenGL.GL import (
     GL_STATIC_DRAW,
     GL_TEXTURE_2D,
     GL_TRIANGLES as TRIANGLES,
-    GL_TRUE as TRUE,
     glBindBuffer,
     glBindTexture,
     glBlendFunc,
@@ -39,21 +53,8 @@ from OpenGL.GL import (
     glClearColor,
     glDrawArrays,
     glEnable,
-    glEnableVertexAttribArray,
     glGenBuffers,
-    glGetAttribLocation,
-    glGetUniformLocation,
     glHint,
-    glUniform1i,
-    glUniform1f,
-    glUniform3f,
-    glUniformMatrix4fv,
-    glVertexAttribPointer,
-)
-from glfw import (
-    get_window_size,
-    show_window,
-    swap_buffers,
 )
 
 
@@ -67,6 +68,8 @@ class Scene:
         The camera viewing the scene.
     program : Any
         The OpenGL shader program ID.
+    shader : Shader
+        The shader program, caching its uniforms' locations.
     window : Any
         The GLFW window object.
     objects : list[Object]
@@ -77,6 +80,40 @@ class Scene:
         The number of light sources in the scene (default: 3).
     ambient_light_on : bool
         Flag to toggle ambient lighting (default: True).
+    visibility : ZoneVisibility
+        Decides which objects are seen through the portals between zones.
+    occlusion : OcclusionCuller
+        Skips objects hidden behind others when occlusion culling is on.
+    uniforms : FrameUniforms
+        The camera, light and per-object records read by the shaders.
+    queue : RenderQueue
+        Orders each frame's draw calls by state and depth.
+    batcher : DrawBatcher
+        Draws opaque objects sharing a texture with a single call.
+    vertex_array : VertexArray
+        Feeds the vertices of every object's model to the shaders.
+    occlusion_culling : bool
+        Flag to toggle hardware occlusion queries (default: False).
+    draw_calls : int
+        Number of draw calls issued for objects in the last frame.
+    triangles : int
+        Number of triangles submitted for objects in the last frame.
+    texture_memory : int
+        Bytes taken by the objects' textures on the GPU.
+    profiler : FrameProfiler
+        Times each section of a frame on the CPU and the GPU.
+    transforms : TransformStore
+        The placement and model matrix of every object, updated together
+        once per frame.
+    animator : Animator
+        Plays the keyframe tracks of animated objects, all at once.
+    matrix_rebuilds : int
+        Number of model matrices rebuilt for the last frame.
+    rebuilds_avoided : int
+        Number of writes to objects' placements before the last frame that
+        did not cost a matrix rebuild of their own.
+    dirty : bool
+        Whether anything drawn changed since the last frame.
 
     Methods
     -------
@@ -84,14 +121,37 @@ class Scene:
         Initialize the scene with objects loaded from a TOML configuration file.
     draw() -> None
         Render the scene.
+    animate(seconds: float) -> None
+        Play the objects' animations forward.
+    invalidate() -> None
+        Mark the scene as needing to be drawn again.
     """
 
     camera: Camera
     program: Any
+    shader: Shader
     window: Any
     _objects: list[Object] = []
     _light_sources: list[Light] = []
     ambient_light_on: bool = True
+    visibility: ZoneVisibility
+    occlusion: OcclusionCuller
+    occlusion_culling: bool = False
+    draw_calls: int = 0
+    triangles: int = 0
+    texture_memory: int = 0
+    profiler: FrameProfiler
+    transforms: TransformStore
+    animator: Animator
+    matrix_rebuilds: int = 0
+    rebuilds_avoided: int = 0
+    dirty: bool = True
+    uniforms: FrameUniforms
+    queue: RenderQueue
+    batcher: DrawBatcher
+    vertex_array: VertexArray
+    _batches: list[StaticBatch] = []
+    _bound_texture: int = 0
 
     def __init__(self, window: Any, config_path: str) -> None:
         """
@@ -108,22 +168,51 @@ class Scene:
         shader = Shader("src/shaders/vertex.vs", "src/shaders/fragments.fs")
         width, height = get_window_size(window)
         bd = BufferData()
+        assets = AssetRegistry(bd)
         self.camera = Camera(width, height)
+        self.shader = shader
         self.program = shader.getProgram()
         self.window = window
-        descriptors = self._load_config(config_path)
+        self._objects, self._light_sources = [], []
+        descriptors, portals = self._load_config(config_path)
+        self.transforms = transforms = TransformStore(len(descriptors))
         for i, desc in enumerate(descriptors):
             if desc.illumination_properties.emission_intensity > 0.01:
-                light = Light(i, desc, bd)
+                light = Light(i, desc, assets, transforms)
                 self._objects.append(light)
                 self._light_sources.append(light)
+            elif desc.instances:
+                instanced = InstancedObject(i, desc, assets, transforms)
+                self._objects.append(instanced)
             else:
-                self._objects.append(Object(i, desc, bd))
-
+                self._objects.append(Object(i, desc, assets, transforms))
+        self._link_parents(descriptors)
+        self._init_animations(descriptors)
+        transforms.update()
+        transforms.reset_counters()
+        self._batches = build_static_batches(self._objects, bd)
+        self.texture_memory = assets.texture_memory
+        self.visibility = ZoneVisibility(self._objects, portals)
+        self.queue = RenderQueue()
+        self.profiler = FrameProfiler()
+
+        # One record per object and batch, then one per occlusion query box
+        slots = len(self._objects) + len(self._batches)
         shader.use()
+        self.vertex_array = VertexArray()
+        self.uniforms = FrameUniforms(shader, 2 * slots, slots)
+        self.occlusion = OcclusionCuller(
+            self.uniforms, slots, bd, self.vertex_array
+        )
         self._init_buffers(bd)
-        self._init_light_sources()
-        glEnable(GL_TEXTURE_2D)
+        self.batcher = DrawBatcher(shader, self.uniforms, self.vertex_array)
+        for obj in self._objects:
+            if isinstance(obj, InstancedObject):
+                obj.init_vertex_array(self.vertex_array, shader)
+        for obj in [*self._objects, *self._batches]:
+            self._write_material(obj)
+        for batch in self._batches:
+            self.uniforms.records[batch.id]["model"] = batch.transformation
         glHint(GL_LINE_SMOOTH_HINT, GL_DONT_CARE)
         glEnable(GL_BLEND)
         glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
@@ -131,6 +220,13 @@ class Scene:
         show_window(window)
         glEnable(GL_DEPTH_TEST)
 
+        # Whatever the controls change marks the scene to be drawn again
+        self.camera.on_change = self.invalidate
+        for obj in self._objects:
+            obj.on_change = self.invalidate
+        for light in self._light_sources:
+            light.on_change = partial(self._light_changed, light)
+
     @property
     def objects(self) -> list[Object]:
         return self._objects
@@ -139,6 +235,51 @@ class Scene:
     def light_sources(self) -> list[Light]:
         return self._light_sources
 
+    @property
+    def animated(self) -> bool:
+        """Whether any object's animation is still playing, so that the
+        scene keeps changing on its own."""
+        return self.animator.running
+
+    def invalidate(self) -> None:
+        """Mark the scene as needing to be drawn again."""
+        self.dirty = True
+
+    def _light_changed(self, light: Light) -> None:
+        """Rewrite a light source's material, which toggling it changes, and
+        mark the scene as needing to be drawn again."""
+        self._write_material(light)
+        self.invalidate()
+
+    def animate(self, seconds: float) -> None:
+        """
+        Play the objects' animations forward, marking the scene to be drawn
+        again if any object is animated.
+
+        Parameters
+        ----------
+        seconds : float
+            Time elapsed since the previous call.
+        """
+        if len(self.animator.advance(seconds)):
+            self.invalidate()
+
+    def _drawables(self) -> list[Drawable]:
+        """
+        List what is to be drawn: every object, except for static objects
+        still batched, which are replaced by their batch.
+        """
+        drawables: list[Drawable] = []
+        batches: set[int] = set()
+        for obj in self._objects:
+            batch = obj.batch
+            if batch is None:
+                drawables.append(obj)
+            elif batch.id not in batches:
+                batches.add(batch.id)
+                drawables.append(batch)
+        return drawables
+
     def _init_buffers(self, bd: BufferData):
         buffers = glGenBuffers(3)
         self._upload_data(buffers[0], bd.vertices, 3, "position")
@@ -165,19 +306,36 @@ class Scene:
         coords = array(coord_list, dtype=float32)
         glBindBuffer(GL_ARRAY_BUFFER, buffer)
         glBufferData(GL_ARRAY_BUFFER, coords.nbytes, coords, GL_STATIC_DRAW)
-        stride, offset = coords.strides[0], ctypes.c_void_p(0)
-        loc = glGetAttribLocation(self.program, attr_name)
-        glEnableVertexAttribArray(loc)
-        glVertexAttribPointer(loc, coord_size, FLOAT, False, stride, offset)
-
-    def _init_light_sources(self) -> None:
-        for i, light in enumerate(self._light_sources):
-            loc = glGetUniformLocation(self.program, f"lights[{i}].color")
-            glUniform3f(loc, *light.illumination.emission_color)
-            loc = glGetUniformLocation(self.program, f"lights[{i}].location")
-            glUniform1i(loc, light.location)
-
-    def _load_config(self, config_path: str) -> list[ObjectConfig]:
+        loc = self.shader.attribute(attr_name)
+        self.vertex_array.add(loc, int(buffer), coord_size)
+
+    def _write_material(self, obj: Drawable) -> None:
+        """
+        Fill an object's record with its material and behavior parameters,
+        kept for every frame it is drawn in.
+
+        Parameters
+        ----------
+        obj : Drawable
+            The object, or batch of static objects, whose record to fill.
+        """
+        record = self.uniforms.records[obj.id]
+        illumination = obj.illumination
+        coefficients = illumination.reflection_coefficients
+        record["ambient_color"] = illumination.ambient_color
+        record["ambient_intensity"] = coefficients.ambient_intensity
+        record["diffuse_intensity"] = coefficients.diffuse_intensity
+        record["specular_intensity"] = coefficients.specular_intensity
+        record["specular_exponent"] = coefficients.specular_exponent
+        record["emission_color"] = illumination.emission_color
+        record["is_emitter"] = isinstance(obj, Light) and obj.on
+        record["object_location"] = obj.location
+        record["instanced"] = isinstance(obj, InstancedObject)
+
+    @staticmethod
+    def _load_config(
+        config_path: str
+    ) -> tuple[list[ObjectConfig], list[Portal]]:
         """
         Load the scene configuration from a TOML file.
 
@@ -188,17 +346,23 @@ class Scene:
 
         Returns
         -------
-        list[ObjectConfig]
-            A list of ObjectConfig objects.
+        tuple[list[ObjectConfig], list[Portal]]
+            The objects' configurations, and the portals listed under the
+            reserved `portals` table.
         """
         with open(config_path, "r") as f:
             config = toml.load(f)
 
+        portals = [
+            Portal(name, [tuple(v) for v in props["vertices"]])
+            for name, props in config.pop("portals", {}).items()
+        ]
         path = os.path.dirname(config_path)
-        return [
+        objects = [
             ObjectConfig(
                 path,
                 name,
+                props.get("model", name),
                 tuple(props.get("position", (0.0, 0.0, -20.0))),
                 tuple(props.get("rotation", (0.0, 0.0, 0.0))),
                 props.get("scale", 1.0),
@@ -214,9 +378,100 @@ class Scene:
                     tuple(props.get("emission_color", (1.0, 1.0, 1.0))),
                 ),
                 Location[props.get("location", "both")],
+                [
+                    InstanceTransform(
+                        tuple(instance.get("position", (0.0, 0.0, 0.0))),
+                        tuple(instance.get("rotation", (0.0, 0.0, 0.0))),
+                        instance.get("scale", 1.0),
+                    )
+                    for instance in props.get("instances", [])
+                ],
+                props.get("static", False),
+                props.get("parent"),
+                (
+                    tuple(props["orientation"])
+                    if "orientation" in props
+                    else None
+                ),
+                (
+                    Scene._load_track(props["animation"])
+                    if "animation" in props
+                    else None
+                ),
             )
             for name, props in config.items()
         ]
+        return objects, portals
+
+    @staticmethod
+    def _load_track(animation: dict[str, Any]) -> KeyframeTrack:
+        """
+        Read an object's keyframe track from its `animation` table.
+
+        Parameters
+        ----------
+        animation : dict[str, Any]
+            The table, listing the keyframes' `times` and `orientations`.
+
+        Returns
+        -------
+        KeyframeTrack
+            The track, looping and interpolated with slerp by default.
+        """
+        return KeyframeTrack(
+            animation["times"],
+            [tuple(q) for q in animation["orientations"]],
+            animation.get("loop", True),
+            Interpolation[animation.get("interpolation", "slerp")],
+        )
+
+    def _link_parents(self, descriptors: list[ObjectConfig]) -> None:
+        """
+        Place each object relative to the parent named in its configuration.
+
+        Parameters
+        ----------
+        descriptors : list[ObjectConfig]
+            The objects' configurations, in the order of the objects.
+
+        Raises
+        ------
+        KeyError
+            If a parent is not an object of the scene.
+        ValueError
+            If an object would descend from itself.
+        """
+        by_name = {obj.name: obj for obj in self._objects}
+        for obj, desc in zip(self._objects, descriptors):
+            if desc.parent is None:
+                continue
+            if desc.parent not in by_name:
+                raise KeyError(
+                    f"Unknown parent '{desc.parent}' of object '{obj.name}'."
+                )
+            obj.parent = by_name[desc.parent]
+
+    def _init_animations(self, descriptors: list[ObjectConfig]) -> None:
+        """
+        Hand the objects' keyframe tracks to the animator. Animated objects
+        and their descendants keep moving, so they are not batched even if
+        flagged as static.
+
+        Parameters
+        ----------
+        descriptors : list[ObjectConfig]
+            The objects' configurations, in the order of the objects.
+        """
+        self.animator = Animator(self.transforms)
+        moving: list[Object] = []
+        for obj, desc in zip(self._objects, descriptors):
+            if desc.animation is not None:
+                self.animator.add(obj.id, desc.animation)
+                moving.append(obj)
+        while moving:
+            obj = moving.pop()
+            obj.static = False
+            moving.extend(obj.children)
 
     def draw(self) -> None:
         """
@@ -227,58 +482,103 @@ class Scene:
         None
         """
 
+        self.dirty = False
+        profiler = self.profiler
+        profiler.section("setup")
         glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
         glClearColor(0x33 / 255, 0x3C / 255, 0x43 / 255, 1.0)
+        # Recompute the matrices of every object moved since the last frame
+        transforms = self.transforms
+        transforms.update()
+        self.matrix_rebuilds = transforms.rebuilds
+        self.rebuilds_avoided = transforms.avoided
+        transforms.reset_counters()
+
+        # Fill the camera and light sources records
+        self.uniforms.begin_frame()
+        view, projection = self.camera.view(), self.camera.projection()
+        camera = self.uniforms.camera
+        camera["view"] = view
+        camera["projection"] = projection
+        camera["view_pos"] = self.camera.pos
+
+        lights = self.uniforms.lights
+        lights["ambient_on"] = self.ambient_light_on
+        for record, light in zip(lights["lights"], self._light_sources):
+            record["intensity"] = light.intensity
+            record["position"] = light.transformation[:3, 3]
+            record["color"] = light.illumination.emission_color
+            record["location"] = light.location
+
+        # Fill the records of objects seen from the camera's zone
+        profiler.section("visibility")
+        eye = array(self.camera.pos, dtype=float32)
+        objects = self.visibility.visible(
+            self._drawables(), eye, projection @ view
+        )
+        objects = self.queue.sort(objects, view, self.program)
+        vertices = sum(
+            o.vertices_count * o.instance_count
+            if isinstance(o, InstancedObject)
+            else o.vertices_count
+            for o in objects
+        )
+        self.triangles = vertices // 3
+        profiler.section("uniforms")
+        # Objects take the store's rows in the order of their identifiers,
+        # so that their world matrices are copied over in one go
+        count = len(transforms)
+        self.uniforms.records["model"][:count] = transforms.matrices[:count]
+
+        occlusion = self.occlusion
+        if self.occlusion_culling:
+            occlusion.prepare(objects)
+            occlusion.collect()
+            visible, hidden = occlusion.split(objects, eye)
+        else:
+            visible, hidden = objects, []
+        single = self.batcher.plan(visible)
+        # Batched objects read their records from the DrawData block instead
+        drawn = [o.id for o in [*single, *hidden]]
+        if drawn:
+            self.uniforms.objects[drawn] = self.uniforms.records[drawn]
+        self.uniforms.upload()
+
+        profiler.section("draws")
+        self.draw_calls = self.batcher.draw()
+        self._bound_texture = 0
+        self.vertex_array.bind()
+        for obj in single:
+            self._draw_object(obj)
+        if self.occlusion_culling:
+            occlusion.query(objects, eye)
+            for obj in hidden:
+                with occlusion.conditional(obj):
+                    self._draw_object(obj)
+        self.uniforms.end_frame()
+
+        profiler.section("swap")
+        swap_buffers(self.window)
+        profiler.end_frame()
 
-        # Send camera position
-        loc = glGetUniformLocation(self.program, "viewPos")
-        glUniform3f(loc, *self.camera.pos)
-
-        # Set point light sources
-        for i, light in enumerate(self._light_sources):
-            loc = glGetUniformLocation(self.program, f"lights[{i}].intensity")
-            glUniform1f(loc, light.intensity)
-            loc = glGetUniformLocation(self.program, f"lights[{i}].position")
-            pos = light.position
-            glUniform3f(loc, pos["x"], pos["y"], pos["z"])
-
-        # Set objects
-        for obj in self._objects:
-            # Set illumination parameters
-            for coefficient, value in asdict(
-                obj.illumination.reflection_coefficients
-            ).items():
-                loc = glGetUniformLocation(self.program, coefficient)
-                glUniform1f(loc, value)
-
-            if not self.ambient_light_on:
-                loc = glGetUniformLocation(self.program, "ambient_intensity")
-                glUniform1f(loc, 0.0)
-
-            loc = glGetUniformLocation(self.program, "ambient_color")
-            glUniform3f(loc, *obj.illumination.ambient_color)
-
-            loc = glGetUniformLocation(self.program, "is_emitter")
-            if isinstance(obj, Light):
-                glUniform1i(loc, obj.on)
-                loc = glGetUniformLocation(self.program, "emission_color")
-                glUniform3f(loc, *obj.illumination.emission_color)
-            else:
-                glUniform1i(loc, False)
-
-            # Set model parameters
-            loc = glGetUniformLocation(self.program, "object_location")
-            glUniform1i(loc, obj.location)
-
-            loc = glGetUniformLocation(self.program, "model")
-            glUniformMatrix4fv(loc, 1, TRUE, obj.transformation)
+    def _draw_object(self, obj: Drawable) -> None:
+        """
+        Bind an object's uniform record and issue its draw call.
 
-            glBindTexture(GL_TEXTURE_2D, obj.id)
+        Parameters
+        ----------
+        obj : Drawable
+            The object, or batch of static objects, to be drawn.
+        """
+        self.uniforms.bind_object(obj.id)
+        if obj.texture != self._bound_texture:
+            glBindTexture(GL_TEXTURE_2D, obj.texture)
+            self._bound_texture = obj.texture
+        if isinstance(obj, InstancedObject):
+            obj.draw()
+            self.vertex_array.bind()
+        elif isinstance(obj, StaticBatch):
+            obj.draw()
+        else:
             glDrawArrays(TRIANGLES, obj.initial_vertex, obj.vertices_count)
-
-        # Apply view and porjection matrix multiplications and render
-        loc = glGetUniformLocation(self.program, "view")
-        glUniformMatrix4fv(loc, 1, TRUE, self.camera.view())
-        loc = glGetUniformLocation(self.program, "projection")
-        glUniformMatrix4fv(loc, 1, TRUE, self.camera.projection())
-        swap_buffers(self.window)
+        self.draw_calls += 1
@@ -0,0 +1,178 @@
+from dataclasses import astuple
+from app.object import Object
+from app.utils import BufferData, IlluminationProperties, Location
+from numpy import array, concatenate, eye, float32, int32
+from numpy.typing import NDArray
+from OpenGL.GL import GL_TRIANGLES as TRIANGLES, glMultiDrawArrays
+
+
+class StaticBatch:
+    """
+    Static objects sharing a texture and material, whose transformations are
+    baked into a single range of the buffer data so they can be drawn in one
+    call.
+
+    A member that gets moved leaves the batch and is drawn on its own again,
+    while the remaining members keep being drawn from their baked vertices.
+    """
+
+    illumination: IlluminationProperties
+    location: Location
+    translucent: bool
+    _id: int
+    _texture: int
+    _members: dict[int, Object]
+    _ranges: dict[int, tuple[int, int]]
+    _firsts: NDArray[int32]
+    _counts: NDArray[int32]
+    _transformation: NDArray[float32]
+    _world_bounds: NDArray[float32]
+
+    def __init__(self, id: int, members: list[Object], bd: BufferData):
+        """
+        Bake the members' transformations into a copy of their vertices.
+
+        Parameters
+        ----------
+        id : int
+            A unique identifier, distinct from every object's.
+        members : list[Object]
+            Static objects sharing the same texture and material.
+        bd : BufferData
+            The scene's buffer data, to which the baked vertices are appended.
+        """
+        self._id = id
+        self._texture = members[0].texture
+        self.illumination = members[0].illumination
+        self.location = members[0].location
+        self.translucent = members[0].translucent
+        self._transformation = eye(4, dtype=float32)
+        self._members = {}
+        self._ranges = {}
+        for obj in members:
+            first, count = obj.initial_vertex, obj.vertices_count
+            matrix = obj.transformation
+            vertices = array(bd.vertices[first : first + count], dtype=float32)
+            normals = array(bd.normals[first : first + count], dtype=float32)
+            ones = [[1.0]] * count
+            # Reproduce what the vertex shader would do with the model matrix
+            vertices = concatenate([vertices, ones], axis=1) @ matrix.T
+            normals = concatenate([normals, ones], axis=1) @ matrix.T
+
+            self._ranges[obj.id] = (len(bd.vertices), count)
+            bd.vertices.extend(map(tuple, vertices[:, :3].tolist()))
+            bd.normals.extend(map(tuple, normals[:, :3].tolist()))
+            bd.texture_coord.extend(bd.texture_coord[first : first + count])
+            self._members[obj.id] = obj
+            obj.batch = self
+        self._merge()
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    @property
+    def id(self) -> int:
+        return self._id
+
+    @property
+    def texture(self) -> int:
+        return self._texture
+
+    @property
+    def transformation(self) -> NDArray[float32]:
+        return self._transformation
+
+    @property
+    def world_bounds(self) -> NDArray[float32]:
+        return self._world_bounds
+
+    @property
+    def firsts(self) -> NDArray[int32]:
+        return self._firsts
+
+    @property
+    def counts(self) -> NDArray[int32]:
+        return self._counts
+
+    @property
+    def vertices_count(self) -> int:
+        return int(self._counts.sum())
+
+    def remove(self, obj: Object) -> None:
+        """
+        Take an object out of the batch, so that it is drawn on its own.
+
+        Parameters
+        ----------
+        obj : Object
+            A member of this batch.
+        """
+        del self._members[obj.id]
+        del self._ranges[obj.id]
+        obj.batch = None
+        self._merge()
+
+    def draw(self) -> None:
+        """Draw every remaining member with a single draw call."""
+        runs = len(self._firsts)
+        glMultiDrawArrays(TRIANGLES, self._firsts, self._counts, runs)
+
+    def _merge(self) -> None:
+        """Join the ranges of the remaining members into contiguous runs."""
+        runs: list[list[int]] = []
+        for first, count in sorted(self._ranges.values()):
+            if runs and runs[-1][0] + runs[-1][1] == first:
+                runs[-1][1] += count
+            else:
+                runs.append([first, count])
+        self._firsts = array([r[0] for r in runs], dtype=int32)
+        self._counts = array([r[1] for r in runs], dtype=int32)
+        if self._members:
+            bounds = array([o.world_bounds for o in self._members.values()])
+            self._world_bounds = array(
+                [bounds[:, 0].min(axis=0), bounds[:, 1].max(axis=0)]
+            )
+
+
+Drawable = Object | StaticBatch
+
+
+def build_static_batches(
+    objects: list[Object], bd: BufferData
+) -> list[StaticBatch]:
+    """
+    Group the static objects sharing a texture and material into batches.
+
+    Parameters
+    ----------
+    objects : list[Object]
+        Every object in the scene. Only plain objects flagged as static are
+        batched; light sources and instanced objects never are.
+    bd : BufferData
+        The scene's buffer data, before it is uploaded to the GPU.
+
+    Returns
+    -------
+    list[StaticBatch]
+        The batches made of at least two objects, identified after the
+        objects' own identifiers.
+    """
+    groups: dict[tuple[object, ...], list[Object]] = {}
+    for obj in objects:
+        if not obj.static or type(obj) is not Object:
+            continue
+        illumination = obj.illumination
+        key = (
+            obj.texture,
+            obj.location,
+            astuple(illumination.reflection_coefficients),
+            illumination.ambient_color,
+        )
+        groups.setdefault(key, []).append(obj)
+
+    batches: list[StaticBatch] = []
+    for members in groups.values():
+        if len(members) > 1:
+            id = len(objects) + len(batches)
+            batches.append(StaticBatch(id, members, bd))
+    return batches
@@ -0,0 +1,612 @@
+from collections.abc import Iterable, Iterator, Mapping, MutableMapping
+from typing import Callable, override
+from numpy import (
+    arcsin,
+    arctan2,
+    argsort,
+    bincount,
+    bool_,
+    clip,
+    cos,
+    cumsum,
+    empty,
+    flatnonzero,
+    float32,
+    float64,
+    full,
+    int64,
+    intp,
+    sin,
+    size,
+    split,
+    stack,
+    zeros,
+)
+from numpy.typing import ArrayLike, NDArray
+
+_AXES = "xyz"
+
+
+def compose(
+    positions: NDArray[float64],
+    rotations: NDArray[float64],
+    scales: NDArray[float64],
+) -> NDArray[float32]:
+    """
+    Compose model matrices from positions, Euler angles and scales.
+
+    Each matrix translates, then rotates about z, y and x, then scales. Its
+    entries are written out from the sines and cosines of the angles rather
+    than multiplied, for every matrix at once.
+
+    Parameters
+    ----------
+    positions : NDArray[float64]
+        The positions, as an (n, 3) array.
+    rotations : NDArray[float64]
+        The rotations about x, y and z in radians, as an (n, 3) array.
+    scales : NDArray[float64]
+        The uniform scales, as an (n,) array.
+
+    Returns
+    -------
+    NDArray[float32]
+        The model matrices, as an (n, 4, 4) array.
+    """
+    (cx, cy, cz), (sx, sy, sz) = cos(rotations).T, sin(rotations).T
+    czsy, szsy = cz * sy, sz * sy
+    s = scales
+    matrices = zeros((len(s), 4, 4), dtype=float32)
+    matrices[:, 0, 0] = cz * cy * s
+    matrices[:, 0, 1] = (czsy * sx - sz * cx) * s
+    matrices[:, 0, 2] = (czsy * cx + sz * sx) * s
+    matrices[:, 1, 0] = sz * cy * s
+    matrices[:, 1, 1] = (szsy * sx + cz * cx) * s
+    matrices[:, 1, 2] = (szsy * cx - cz * sx) * s
+    matrices[:, 2, 0] = -sy * s
+    matrices[:, 2, 1] = cy * sx * s
+    matrices[:, 2, 2] = cy * cx * s
+    matrices[:, :3, 3] = positions
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def compose_quaternions(
+    positions: NDArray[float64],
+    quaternions: NDArray[float64],
+    scales: NDArray[float64],
+) -> NDArray[float32]:
+    """
+    Compose model matrices from positions, unit quaternions and scales.
+
+    Parameters
+    ----------
+    positions : NDArray[float64]
+        The positions, as an (n, 3) array.
+    quaternions : NDArray[float64]
+        The rotations as unit quaternions (x, y, z, w), as an (n, 4) array.
+    scales : NDArray[float64]
+        The uniform scales, as an (n,) array.
+
+    Returns
+    -------
+    NDArray[float32]
+        The model matrices, as an (n, 4, 4) array.
+    """
+    x, y, z, w = quaternions.T
+    xx, yy, zz = x * x, y * y, z * z
+    xy, xz, yz = x * y, x * z, y * z
+    wx, wy, wz = w * x, w * y, w * z
+    s = 2 * scales
+    matrices = zeros((len(scales), 4, 4), dtype=float32)
+    matrices[:, 0, 0] = scales - (yy + zz) * s
+    matrices[:, 0, 1] = (xy - wz) * s
+    matrices[:, 0, 2] = (xz + wy) * s
+    matrices[:, 1, 0] = (xy + wz) * s
+    matrices[:, 1, 1] = scales - (xx + zz) * s
+    matrices[:, 1, 2] = (yz - wx) * s
+    matrices[:, 2, 0] = (xz - wy) * s
+    matrices[:, 2, 1] = (yz + wx) * s
+    matrices[:, 2, 2] = scales - (xx + yy) * s
+    matrices[:, :3, 3] = positions
+    matrices[:, 3, 3] = 1.0
+    return matrices
+
+
+def euler_angles(quaternions: NDArray[float64]) -> NDArray[float64]:
+    """
+    Convert unit quaternions to the Euler angles `compose` takes.
+
+    Parameters
+    ----------
+    quaternions : NDArray[float64]
+        The rotations as unit quaternions (x, y, z, w), as an (n, 4) array.
+
+    Returns
+    -------
+    NDArray[float64]
+        The rotations about x, y and z in radians, as an (n, 3) array.
+    """
+    x, y, z, w = quaternions.T
+    return stack(
+        [
+            arctan2(2 * (y * z + w * x), 1 - 2 * (x * x + y * y)),
+            arcsin(clip(2 * (w * y - x * z), -1.0, 1.0)),
+            arctan2(2 * (x * y + w * z), 1 - 2 * (y * y + z * z)),
+        ],
+        axis=-1,
+    )
+
+
+def transform_boxes(
+    matrices: NDArray[float32],
+    centers: NDArray[float32],
+    extents: NDArray[float32],
+) -> NDArray[float32]:
+    """
+    Transform axis-aligned boxes by model matrices.
+
+    Parameters
+    ----------
+    matrices : NDArray[float32]
+        A 4x4 matrix, or a stack of them.
+    centers : NDArray[float32]
+        The boxes' centers, one per matrix or one for all.
+    extents : NDArray[float32]
+        The boxes' half extents, one per matrix or one for all.
+
+    Returns
+    -------
+    NDArray[float32]
+        The axis-aligned boxes enclosing each transformed box, as arrays of
+        shape (..., 2, 3) holding their minimum and maximum corners.
+    """
+    linear = matrices[..., :3, :3]
+    centers = (linear @ centers[..., None])[..., 0] + matrices[..., :3, 3]
+    extents = (abs(linear) @ extents[..., None])[..., 0]
+    return stack([centers - extents, centers + extents], axis=-2)
+
+
+class TransformStore:
+    """
+    The placement of every object in a scene, held in contiguous arrays with
+    a row per object.
+
+    Objects read and write their own row, through `TransformView`s for their
+    position and rotation, and writing only marks the row as dirty. `update`
+    then recomputes the model matrices and world bounding boxes of every
+    dirty row at once, so that moving thousands of objects in a frame costs
+    a handful of NumPy calls rather than thousands of Python ones. However
+    many times a row is written to between updates, it is recomputed once.
+
+    A row's rotation is given either by its Euler angles or, if flagged in
+    `has_quaternion`, by a quaternion, which composes rotations without
+    gimbal lock and can be interpolated smoothly. The Euler angles of such a
+    row are kept in step with its quaternion by whoever writes it, for
+    reading, and writing them turns the row back to Euler angles.
+
+    A row may have a parent row, relative to which its placement is given:
+    its world matrix is its parent's world matrix times its own local one.
+    Rows are updated level by level from the roots down, with a single batch
+    multiply per level, and only the subtrees under dirty rows are updated,
+    so that moving a parent with hundreds of children costs one multiply.
+
+    The arrays grow as rows are added, so rows are to be reached through the
+    store's attributes, rather than through references to its arrays kept
+    across calls to `add`. Rows past the store's length are unused.
+
+    Attributes
+    ----------
+    positions : NDArray[float64]
+        The objects' positions.
+    rotations : NDArray[float64]
+        The objects' rotations about x, y and z, in radians.
+    quaternions : NDArray[float64]
+        The objects' rotations as unit quaternions (x, y, z, w), for the
+        rows flagged in `has_quaternion`.
+    has_quaternion : NDArray[bool_]
+        Whether each row's rotation is given by its quaternion.
+    scales : NDArray[float64]
+        The objects' uniform scales.
+    parents : NDArray[intp]
+        The index of each object's parent row, or -1 for objects placed in
+        world space.
+    local_matrices : NDArray[float32]
+        The objects' model matrices relative to their parents, as of the
+        last update.
+    matrices : NDArray[float32]
+        The objects' model matrices in world space, as of the last update,
+        as one contiguous array ready for upload.
+    bounds : NDArray[float32]
+        The objects' axis-aligned bounding boxes in world space, as of the
+        last update, as their minimum and maximum corners.
+    revisions : NDArray[int64]
+        How many times each row's world matrix was recomputed.
+    updated : int
+        Number of world matrices recomputed by the last update, children of
+        dirty rows included.
+    changes : int
+        Number of writes marking rows as dirty since the counters were last
+        reset, each of which used to rebuild a matrix.
+    rebuilds : int
+        Number of dirty rows recomputed since then.
+    """
+
+    positions: NDArray[float64]
+    rotations: NDArray[float64]
+    quaternions: NDArray[float64]
+    has_quaternion: NDArray[bool_]
+    scales: NDArray[float64]
+    parents: NDArray[intp]
+    local_matrices: NDArray[float32]
+    matrices: NDArray[float32]
+    bounds: NDArray[float32]
+    revisions: NDArray[int64]
+    updated: int = 0
+    changes: int = 0
+    rebuilds: int = 0
+    _centers: NDArray[float32]
+    _extents: NDArray[float32]
+    _dirty: NDArray[bool_]
+    _levels: list[NDArray[intp]] | None = None
+    _size: int
+
+    def __init__(self, capacity: int = 16):
+        """
+        Parameters
+        ----------
+        capacity : int
+            Number of rows to allocate room for, before the arrays grow.
+        """
+        self._size = 0
+        self._allocate(max(1, capacity))
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(
+        self,
+        position: ArrayLike,
+        rotation: ArrayLike,
+        scale: float,
+        bounds: NDArray[float32],
+        parent: int = -1,
+    ) -> int:
+        """
+        Add a row, dirty until the next update.
+
+        Parameters
+        ----------
+        position : ArrayLike
+            The position.
+        rotation : ArrayLike
+            The rotation about x, y and z, in radians.
+        scale : float
+            The uniform scale.
+        bounds : NDArray[float32]
+            The model's bounding box, as its minimum and maximum corners.
+        parent : int
+            The index of the parent row, or -1 to place the row in world
+            space.
+
+        Returns
+        -------
+        int
+            The index of the row.
+        """
+        if self._size == len(self.scales):
+            self._allocate(2 * self._size)
+        index = self._size
+        self._size += 1
+        self.positions[index] = position
+        self.rotations[index] = rotation
+        self.scales[index] = scale
+        self._centers[index] = (bounds[0] + bounds[1]) / 2
+        self._extents[index] = (bounds[1] - bounds[0]) / 2
+        self._dirty[index] = True
+        self._levels = None
+        self.set_parent(index, parent)
+        return index
+
+    def set_parent(self, index: int, parent: int) -> None:
+        """
+        Place a row relative to another, keeping its local placement, so
+        that it moves along with its new parent.
+
+        Parameters
+        ----------
+        index : int
+            The index of the row.
+        parent : int
+            The index of the parent row, or -1 to place the row in world
+            space.
+
+        Raises
+        ------
+        ValueError
+            If the row would become its own ancestor.
+        """
+        ancestor = parent
+        while ancestor >= 0:
+            if ancestor == index:
+                raise ValueError(f"Row {index} cannot descend from itself.")
+            ancestor = int(self.parents[ancestor])
+        if self.parents[index] != parent:
+            self.parents[index] = parent
+            self._levels = None
+        self._dirty[index] = True
+
+    def mark(self, index: int | NDArray[intp]) -> None:
+        """
+        Mark rows as dirty, to be recomputed by the next update.
+
+        Parameters
+        ----------
+        index : int | NDArray[intp]
+            The index of a row, or an array of them.
+        """
+        self._dirty[index] = True
+        self.changes += size(index)
+
+    def stale(self, index: int) -> bool:
+        """
+        Tell whether a row was written to since the last update.
+
+        Parameters
+        ----------
+        index : int
+            The index of the row.
+
+        Returns
+        -------
+        bool
+            Whether the row's matrix and bounding box are out of date, as
+            the row or one of its ancestors was written to.
+        """
+        dirty, parents = self._dirty, self.parents
+        while index >= 0:
+            if dirty[index]:
+                return True
+            index = int(parents[index])
+        return False
+
+    def children(self, index: int) -> NDArray[intp]:
+        """
+        Find the rows placed relative to a row.
+
+        Parameters
+        ----------
+        index : int
+            The index of the parent row.
+
+        Returns
+        -------
+        NDArray[intp]
+            The indices of the row's children, not of their own children.
+        """
+        return flatnonzero(self.parents[: self._size] == index)
+
+    @property
+    def avoided(self) -> int:
+        """Number of matrix rebuilds saved by coalescing writes to the same
+        rows since the counters were last reset."""
+        return max(0, self.changes - self.rebuilds)
+
+    def reset_counters(self) -> None:
+        """Reset the counters of changes and rebuilds."""
+        self.changes = 0
+        self.rebuilds = 0
+
+    def update(self) -> NDArray[intp]:
+        """
+        Recompute the local matrices of every dirty row, then the world
+        matrices and bounding boxes of every dirty row and its descendants.
+
+        Returns
+        -------
+        NDArray[intp]
+            The indices of the rows whose world matrices were recomputed.
+        """
+        dirty = self._dirty[: self._size]
+        rows = flatnonzero(dirty)
+        self.rebuilds += len(rows)
+        if not len(rows):
+            self.updated = 0
+            return rows
+        matrices = self._compose(rows)
+        self.local_matrices[rows] = matrices
+        levels = self._hierarchy()
+        if len(levels) > 1:
+            rows = self._propagate(dirty, levels)
+            matrices = self.matrices[rows]
+        else:
+            self.matrices[rows] = matrices
+        self.updated = len(rows)
+        self.bounds[rows] = transform_boxes(
+            matrices, self._centers[rows], self._extents[rows]
+        )
+        self.revisions[rows] += 1
+        dirty[:] = False
+        return rows
+
+    def _compose(self, rows: NDArray[intp]) -> NDArray[float32]:
+        """Compose the local matrices of some rows, from their Euler angles
+        or their quaternions."""
+        positions, scales = self.positions[rows], self.scales[rows]
+        by_quaternion = self.has_quaternion[rows]
+        if not by_quaternion.any():
+            return compose(positions, self.rotations[rows], scales)
+        by_euler = ~by_quaternion
+        matrices = empty((len(rows), 4, 4), dtype=float32)
+        matrices[by_euler] = compose(
+            positions[by_euler],
+            self.rotations[rows[by_euler]],
+            scales[by_euler],
+        )
+        matrices[by_quaternion] = compose_quaternions(
+            positions[by_quaternion],
+            self.quaternions[rows[by_quaternion]],
+            scales[by_quaternion],
+        )
+        return matrices
+
+    def _propagate(
+        self, dirty: NDArray[bool_], levels: list[NDArray[intp]]
+    ) -> NDArray[intp]:
+        """
+        Recompute the world matrices of the dirty rows and their
+        descendants, a level at a time, from their fresh local matrices.
+
+        Returns
+        -------
+        NDArray[intp]
+            The indices of the rows recomputed.
+        """
+        parents, matrices = self.parents, self.matrices
+        local = self.local_matrices
+        # Children move along with their parents, down every dirty subtree
+        moved = dirty.copy()
+        for level in levels[1:]:
+            moved[level] |= moved[parents[level]]
+        roots = levels[0][moved[levels[0]]]
+        matrices[roots] = local[roots]
+        for level in levels[1:]:
+            level = level[moved[level]]
+            if len(level):
+                matrices[level] = matrices[parents[level]] @ local[level]
+        return flatnonzero(moved)
+
+    def _hierarchy(self) -> list[NDArray[intp]]:
+        """
+        Group the rows by depth, roots first, so that each group only holds
+        children of the groups before it, and keep the groups until a row's
+        parent changes.
+        """
+        if self._levels is None:
+            parents = self.parents[: self._size]
+            depths = zeros(self._size, dtype=intp)
+            ancestors = parents.copy()
+            while (below := flatnonzero(ancestors >= 0)).size:
+                depths[below] += 1
+                ancestors[below] = parents[ancestors[below]]
+            order = argsort(depths, kind="stable")
+            self._levels = split(order, cumsum(bincount(depths))[:-1])
+        return self._levels
+
+    def _allocate(self, capacity: int) -> None:
+        """Move the rows to arrays with room for `capacity` rows."""
+        size = self._size
+        for name, shape, dtype, fill in (
+            ("positions", (3,), float64, 0),
+            ("rotations", (3,), float64, 0),
+            ("quaternions", (4,), float64, 0),
+            ("has_quaternion", (), bool_, False),
+            ("scales", (), float64, 0),
+            ("parents", (), intp, -1),
+            ("local_matrices", (4, 4), float32, 0),
+            ("matrices", (4, 4), float32, 0),
+            ("bounds", (2, 3), float32, 0),
+            ("revisions", (), int64, 0),
+            ("_centers", (3,), float32, 0),
+            ("_extents", (3,), float32, 0),
+            ("_dirty", (), bool_, False),
+        ):
+            grown = full((capacity, *shape), fill, dtype=dtype)
+            if size:
+                grown[:size] = getattr(self, name)[:size]
+            setattr(self, name, grown)
+
+
+class TransformView(MutableMapping[str, float]):
+    """
+    An object's position or rotation, as a mapping of the "x", "y" and "z"
+    keys to a row of a `TransformStore`'s array.
+
+    Writing calls back the object the row belongs to, which marks the row as
+    dirty.
+    """
+
+    _store: TransformStore
+    _field: str
+    _index: int
+    _on_change: Callable[[], None]
+
+    def __init__(
+        self,
+        store: TransformStore,
+        field: str,
+        index: int,
+        on_change: Callable[[], None],
+    ):
+        """
+        Parameters
+        ----------
+        store : TransformStore
+            The store holding the row.
+        field : str
+            The name of the store's array, ``"positions"`` or
+            ``"rotations"``.
+        index : int
+            The index of the row.
+        on_change : Callable[[], None]
+            Called after every write.
+        """
+        self._store = store
+        self._field = field
+        self._index = index
+        self._on_change = on_change
+
+    def __getitem__(self, key: str) -> float:
+        row = getattr(self._store, self._field)[self._index]
+        return float(row[self._axis(key)])
+
+    def __setitem__(self, key: str, value: float) -> None:
+        row = getattr(self._store, self._field)[self._index]
+        row[self._axis(key)] = value
+        self._on_change()
+
+    @override
+    def update(
+        self,
+        other: Mapping[str, float] | Iterable[tuple[str, float]] = (),
+        /,
+        **kwargs: float,
+    ) -> None:
+        """
+        Write several axes at once, calling back only once.
+
+        Parameters
+        ----------
+        other : Mapping[str, float] | Iterable[tuple[str, float]]
+            A mapping or iterable of axes and their values.
+        **kwargs : float
+            More axes and their values.
+
+        Raises
+        ------
+        KeyError
+            If any key is not "x", "y", or "z".
+        """
+        row = getattr(self._store, self._field)[self._index]
+        pairs = other.items() if isinstance(other, Mapping) else other
+        for key, value in [*pairs, *kwargs.items()]:
+            row[self._axis(key)] = value
+        self._on_change()
+
+    def __delitem__(self, key: str) -> None:
+        raise TypeError("Axes cannot be removed from a transform.")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(_AXES)
+
+    def __len__(self) -> int:
+        return len(_AXES)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+    @staticmethod
+    def _axis(key: str) -> int:
+        if key not in ("x", "y", "z"):
+            raise KeyError(f"Invalid key: {key}. Only 'x', 'y', 'z' allowed.")
+        return _AXES.index(key)
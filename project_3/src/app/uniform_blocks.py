@@ -0,0 +1,342 @@
+from ctypes import c_ubyte
+from typing import Any
+from app.utils import Shader, gl_supports
+from numpy import dtype, uint8, void, zeros
+from numpy.ctypeslib import as_array
+from numpy.typing import NDArray
+from OpenGL.GL import (
+    GL_MAP_COHERENT_BIT,
+    GL_MAP_PERSISTENT_BIT,
+    GL_MAP_WRITE_BIT,
+    GL_STREAM_DRAW,
+    GL_SYNC_FLUSH_COMMANDS_BIT,
+    GL_SYNC_GPU_COMMANDS_COMPLETE,
+    GL_TIMEOUT_EXPIRED,
+    GL_UNIFORM_BUFFER,
+    GL_UNIFORM_BUFFER_OFFSET_ALIGNMENT,
+    glBindBuffer,
+    glBindBufferRange,
+    glBufferData,
+    glBufferStorage,
+    glBufferSubData,
+    glClientWaitSync,
+    glDeleteSync,
+    glFenceSync,
+    glGenBuffers,
+    glGetIntegerv,
+    glMapBufferRange,
+)
+
+NUM_LIGHTS = 3
+# Records per DrawData range, fitting the smallest uniform block size allowed
+MAX_DRAWS = 128
+
+CAMERA_BINDING = 0
+LIGHTS_BINDING = 1
+OBJECT_BINDING = 2
+DRAW_BINDING = 3
+
+# Copies of the records in a persistently mapped buffer: one being written by
+# the CPU while the GPU may still be reading the two previous frames'
+FRAMES = 3
+# How long to wait on a fence at once, in nanoseconds
+_WAIT_NS = 1_000_000
+
+# Record layouts matching the shaders' std140 uniform blocks. Matrices are
+# declared row_major, so they are stored just as NumPy holds them.
+CAMERA = dtype(
+    {
+        "names": ["view", "projection", "view_pos"],
+        "formats": [("<f4", (4, 4)), ("<f4", (4, 4)), ("<f4", 3)],
+        "offsets": [0, 64, 128],
+        "itemsize": 144,
+    }
+)
+LIGHT = dtype(
+    {
+        "names": ["position", "intensity", "color", "location"],
+        "formats": [("<f4", 3), "<f4", ("<f4", 3), "<i4"],
+        "offsets": [0, 12, 16, 28],
+        "itemsize": 32,
+    }
+)
+LIGHTS = dtype(
+    {
+        "names": ["lights", "ambient_on"],
+        "formats": [(LIGHT, NUM_LIGHTS), "<i4"],
+        "offsets": [0, NUM_LIGHTS * LIGHT.itemsize],
+        "itemsize": NUM_LIGHTS * LIGHT.itemsize + 16,
+    }
+)
+OBJECT = dtype(
+    {
+        "names": [
+            "model",
+            "ambient_color",
+            "ambient_intensity",
+            "emission_color",
+            "diffuse_intensity",
+            "specular_intensity",
+            "specular_exponent",
+            "is_emitter",
+            "object_location",
+            "instanced",
+        ],
+        "formats": [
+            ("<f4", (4, 4)),
+            ("<f4", 3),
+            "<f4",
+            ("<f4", 3),
+            "<f4",
+            "<f4",
+            "<f4",
+            "<i4",
+            "<i4",
+            "<i4",
+        ],
+        "offsets": [0, 64, 76, 80, 92, 96, 100, 104, 108, 112],
+        "itemsize": 128,
+    }
+)
+
+
+def _align(size: int, alignment: int) -> int:
+    return -(-size // alignment) * alignment
+
+
+class FrameUniforms:
+    """
+    The uniform blocks read by the scene's shaders, packed into a single
+    uniform buffer that the records of each frame are streamed into.
+
+    A frame's records hold one ``Camera`` record, one ``Lights`` record and a
+    run of ``ObjectData`` records, each starting at an offset the driver
+    accepts for `glBindBufferRange`. Before each draw call, the drawn
+    object's record is bound in place of the previous one.
+
+    They end with tightly packed copies of the records of batched draws, in
+    ranges of `MAX_DRAWS` bound at once to the ``DrawData`` block, where each
+    draw finds its record by its draw index.
+
+    Where buffer storage is available, the buffer holds `FRAMES` copies of
+    these records and stays mapped for the program's lifetime. Each frame
+    writes to the copy the GPU read the longest ago, directly through NumPy
+    views onto the mapped memory, after a fence confirms the GPU is done with
+    it. Otherwise, the records are kept in system memory and copied to a
+    freshly orphaned buffer every frame.
+
+    Mapped memory may be slow or undefined to read from, so the views are
+    only ever written to. What objects keep across frames, such as their
+    materials, is kept in `records` and copied out as each object is drawn.
+
+    Attributes
+    ----------
+    persistent : bool
+        Whether the records are written straight to mapped memory.
+    camera : NDArray[void]
+        The frame's camera record, a zero-dimensional structured array.
+    lights : NDArray[void]
+        The frame's light sources record, a zero-dimensional structured array.
+    objects : NDArray[void]
+        The frame's per-object records, by slot.
+    draws : NDArray[void]
+        The frame's records of batched draws, by draw index across every
+        range.
+    records : NDArray[void]
+        The per-object records in system memory, by slot, to be read from.
+    """
+
+    persistent: bool
+    camera: NDArray[void]
+    lights: NDArray[void]
+    objects: NDArray[void]
+    draws: NDArray[void]
+    records: NDArray[void]
+    _frames: list[NDArray[uint8]]
+    _fences: list[Any]
+    _frame: int = 0
+    _buffer: int
+    _size: int
+    _lights_offset: int
+    _objects_offset: int
+    _draws_offset: int
+    _draws: int
+    _stride: int
+
+    def __init__(self, shader: Shader, slots: int, draws: int = 0):
+        """
+        Allocate the records and the uniform buffer holding them, and attach
+        the shader's uniform blocks to it.
+
+        Parameters
+        ----------
+        shader : Shader
+            The shader program declaring the uniform blocks.
+        slots : int
+            Number of object records to allocate.
+        draws : int
+            Number of batched draw records to allocate, rounded up to whole
+            ranges.
+        """
+        alignment = int(glGetIntegerv(GL_UNIFORM_BUFFER_OFFSET_ALIGNMENT))
+        self._lights_offset = _align(CAMERA.itemsize, alignment)
+        self._objects_offset = _align(
+            self._lights_offset + LIGHTS.itemsize, alignment
+        )
+        self._stride = _align(OBJECT.itemsize, alignment)
+        self._draws_offset = _align(
+            self._objects_offset + slots * self._stride, alignment
+        )
+        # The DrawData block needs a range bound even if nothing is batched
+        self._draws = _align(max(draws, 1), MAX_DRAWS)
+        # Each copy of the records must start at a valid range offset
+        self._size = _align(
+            self._draws_offset + self._draws * OBJECT.itemsize, alignment
+        )
+        self.records = zeros(slots, dtype=OBJECT)
+
+        self._buffer = int(glGenBuffers(1))
+        glBindBuffer(GL_UNIFORM_BUFFER, self._buffer)
+        self.persistent = gl_supports((4, 4), "GL_ARB_buffer_storage")
+        if self.persistent:
+            size = FRAMES * self._size
+            flags = (
+                GL_MAP_WRITE_BIT | GL_MAP_PERSISTENT_BIT | GL_MAP_COHERENT_BIT
+            )
+            glBufferStorage(GL_UNIFORM_BUFFER, size, None, flags)
+            address = glMapBufferRange(GL_UNIFORM_BUFFER, 0, size, flags)
+            mapped = as_array((c_ubyte * size).from_address(address))
+            mapped[:] = 0
+            self._frames = [
+                mapped[i * self._size : (i + 1) * self._size]
+                for i in range(FRAMES)
+            ]
+        else:
+            glBufferData(GL_UNIFORM_BUFFER, self._size, None, GL_STREAM_DRAW)
+            self._frames = [zeros(self._size, dtype=uint8)]
+        self._fences = [None] * len(self._frames)
+
+        shader.bind_block("Camera", CAMERA_BINDING)
+        shader.bind_block("Lights", LIGHTS_BINDING)
+        shader.bind_block("ObjectData", OBJECT_BINDING)
+        shader.bind_block("DrawData", DRAW_BINDING)
+        self._select(0)
+
+    def begin_frame(self) -> None:
+        """
+        Move on to the next copy of the records, waiting for the GPU to have
+        finished the frame that last used it, if it has not yet.
+        """
+        self._select((self._frame + 1) % len(self._frames))
+        fence = self._fences[self._frame]
+        if fence is not None:
+            while (
+                glClientWaitSync(fence, GL_SYNC_FLUSH_COMMANDS_BIT, _WAIT_NS)
+                == GL_TIMEOUT_EXPIRED
+            ):
+                pass
+            glDeleteSync(fence)
+            self._fences[self._frame] = None
+
+    def upload(self) -> None:
+        """
+        Make the frame's records visible to the GPU, which only takes a copy
+        when they are not written straight to mapped memory.
+        """
+        if self.persistent:
+            return
+        data = self._frames[0]
+        glBindBuffer(GL_UNIFORM_BUFFER, self._buffer)
+        # Orphan the buffer, so the driver need not wait for the GPU to be
+        # done with the previous frame's records before replacing them
+        glBufferData(GL_UNIFORM_BUFFER, self._size, None, GL_STREAM_DRAW)
+        glBufferSubData(GL_UNIFORM_BUFFER, 0, data.nbytes, data)
+
+    def end_frame(self) -> None:
+        """Mark where the GPU will be done reading the frame's records."""
+        if self.persistent:
+            self._fences[self._frame] = glFenceSync(
+                GL_SYNC_GPU_COMMANDS_COMPLETE, 0
+            )
+
+    def bind_object(self, slot: int) -> None:
+        """
+        Make an object's record the one read by subsequent draw calls.
+
+        Parameters
+        ----------
+        slot : int
+            The index of the record in `objects`.
+        """
+        offset = self._base + self._objects_offset + slot * self._stride
+        glBindBufferRange(
+            GL_UNIFORM_BUFFER,
+            OBJECT_BINDING,
+            self._buffer,
+            offset,
+            OBJECT.itemsize,
+        )
+
+    def bind_draws(self, first: int) -> None:
+        """
+        Make a range of batched draw records the one read by subsequent draw
+        calls.
+
+        Parameters
+        ----------
+        first : int
+            The index in `draws` of the range's first record, a multiple of
+            `MAX_DRAWS`.
+        """
+        glBindBufferRange(
+            GL_UNIFORM_BUFFER,
+            DRAW_BINDING,
+            self._buffer,
+            self._base + self._draws_offset + first * OBJECT.itemsize,
+            MAX_DRAWS * OBJECT.itemsize,
+        )
+
+    @property
+    def _base(self) -> int:
+        """Offset in the buffer of the current frame's records."""
+        return self._frame * self._size
+
+    def _select(self, frame: int) -> None:
+        """Point the record views and bound ranges at a copy of the records."""
+        self._frame = frame
+        data = self._frames[frame]
+        lights = self._lights_offset
+        self.camera = data[: CAMERA.itemsize].view(CAMERA).reshape(())
+        self.lights = (
+            data[lights : lights + LIGHTS.itemsize].view(LIGHTS).reshape(())
+        )
+        padded = dtype(
+            {
+                "names": ["record"],
+                "formats": [OBJECT],
+                "offsets": [0],
+                "itemsize": self._stride,
+            }
+        )
+        objects_end = self._objects_offset + len(self.records) * self._stride
+        self.objects = data[self._objects_offset : objects_end].view(padded)[
+            "record"
+        ]
+        draws_end = self._draws_offset + self._draws * OBJECT.itemsize
+        self.draws = data[self._draws_offset : draws_end].view(OBJECT)
+
+        glBindBufferRange(
+            GL_UNIFORM_BUFFER,
+            CAMERA_BINDING,
+            self._buffer,
+            self._base,
+            CAMERA.itemsize,
+        )
+        glBindBufferRange(
+            GL_UNIFORM_BUFFER,
+            LIGHTS_BINDING,
+            self._buffer,
+            self._base + lights,
+            LIGHTS.itemsize,
+        )
+        self.bind_draws(0)
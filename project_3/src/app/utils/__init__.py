@@ -1,24 +1,47 @@
+from .console_display import ConsoleDisplay
 from .dataclasses import (
     BufferData,
     Face,
     IlluminationProperties,
+    InstanceTransform,
+    KeyframeTrack,
+    Mesh,
     Model,
     ObjectConfig,
+    Portal,
     ReflectionCoefficients,
 )
-from .enums import Location, Mode
+from .enums import Interpolation, Location, Mode
+from .frame_scheduler import FrameScheduler, FrameStats
+from .gl_info import gl_extensions, gl_supports, gl_version
+from .gl_recorder import CallStats, GLRecorder
 from .shader import Shader
+from .vertex_array import VertexArray
 from .object_state import ObjectState
 
 __all__ = [
     "BufferData",
+    "CallStats",
+    "ConsoleDisplay",
     "Face",
+    "FrameScheduler",
+    "FrameStats",
+    "GLRecorder",
     "Location",
+    "Mesh",
     "Mode",
     "Model",
     "ObjectConfig",
     "ObjectState",
+    "Portal",
     "IlluminationProperties",
+    "InstanceTransform",
+    "Interpolation",
+    "KeyframeTrack",
     "ReflectionCoefficients",
     "Shader",
+    "VertexArray",
+    "gl_extensions",
+    "gl_supports",
+    "gl_version",
 ]
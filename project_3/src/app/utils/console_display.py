@@ -0,0 +1,138 @@
+import sys
+from threading import Event, Thread
+from traceback import print_exc
+from typing import Callable, TextIO
+
+# ANSI escape sequences: clear the screen, and clear the rest of a line or of
+# the screen from the cursor on
+_CLEAR_SCREEN = "\x1b[H\x1b[2J"
+_CLEAR_LINE = "\x1b[K"
+_CLEAR_BELOW = "\x1b[J"
+
+
+class ConsoleDisplay:
+    """
+    Show text that keeps changing in the console, such as the state of a
+    scene, without slowing down the thread that changes it.
+
+    The text is rendered and written from a background thread, at most `rate`
+    times per second and only after being marked out of date, so that bursts
+    of changes are shown together. Rather than clearing the console, the
+    cursor is moved to each line that changed, which alone is rewritten.
+
+    The render function reads whatever state it shows from the background
+    thread, while that state may be changing: a display caught halfway
+    through a change is corrected by the next one. Should rendering fail, the
+    error is printed the first time, and the text is rendered again at the
+    next redraw, rather than the display stopping altogether.
+
+    Attributes
+    ----------
+    rate : float
+        Most redraws per second.
+    """
+
+    rate: float
+    _render: Callable[[], str]
+    _stream: TextIO
+    _lines: list[str]
+    _failing: bool = False
+    _outdated: Event
+    _cleared: Event
+    _stopped: Event
+    _thread: Thread
+
+    def __init__(
+        self,
+        render: Callable[[], str],
+        rate: float = 10.0,
+        stream: TextIO | None = None,
+    ):
+        """
+        Start the background thread, which waits for the text to be marked
+        out of date before showing it for the first time.
+
+        Parameters
+        ----------
+        render : Callable[[], str]
+            Render the text to show, called from the background thread.
+        rate : float
+            Most redraws per second.
+        stream : TextIO | None
+            Where to write the text, standard output by default.
+        """
+        self.rate = rate
+        self._render = render
+        self._stream = stream or sys.stdout
+        self._lines = []
+        self._outdated = Event()
+        self._cleared = Event()
+        self._stopped = Event()
+        self._thread = Thread(
+            target=self._run, name="console-display", daemon=True
+        )
+        self._thread.start()
+
+    def refresh(self) -> None:
+        """Mark the text out of date, to be shown again soon."""
+        self._outdated.set()
+
+    def reset(self) -> None:
+        """
+        Clear the console on the next redraw and show every line, such as
+        after something else was printed below the text, which is then left
+        in view until the text is out of date.
+        """
+        self._cleared.set()
+
+    def close(self) -> None:
+        """Show the text one last time if out of date, and stop the thread."""
+        self._stopped.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        period = 1.0 / self.rate
+        while not self._stopped.is_set():
+            if not self._outdated.wait(period):
+                continue
+            self._outdated.clear()
+            self._show()
+            # Let changes accumulate until the next redraw is allowed
+            self._stopped.wait(period)
+        if self._outdated.is_set():
+            self._show()
+
+    def _show(self) -> None:
+        """Render the text and draw it, or leave it out of date if rendering
+        fails, for it to be tried again."""
+        try:
+            text = self._render()
+        except Exception:
+            if not self._failing:
+                print_exc()
+                # The error is left in view below the text
+                self._cleared.set()
+            self._failing = True
+            self._outdated.set()
+            return
+        self._failing = False
+        self._draw(text.splitlines())
+
+    def _draw(self, lines: list[str]) -> None:
+        """Rewrite the lines that differ from those shown last."""
+        previous = self._lines
+        if self._cleared.is_set():
+            self._cleared.clear()
+            previous = []
+        output = [] if previous else [_CLEAR_SCREEN]
+        for row, line in enumerate(lines):
+            if row < len(previous) and previous[row] == line:
+                continue
+            output.append(f"\x1b[{row + 1};1H{line}{_CLEAR_LINE}")
+        if len(lines) < len(previous):
+            output.append(f"\x1b[{len(lines) + 1};1H{_CLEAR_BELOW}")
+        # Leave the cursor below the text, for anything else printed
+        output.append(f"\x1b[{len(lines) + 1};1H")
+        self._stream.write("".join(output))
+        self._stream.flush()
+        self._lines = lines
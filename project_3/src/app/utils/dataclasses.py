@@ -1,5 +1,7 @@
 from dataclasses import dataclass, field
-from .enums import Location
+from numpy import float32
+from numpy.typing import NDArray
+from .enums import Interpolation, Location
 
 @dataclass
 class ReflectionCoefficients:
@@ -22,6 +24,44 @@ class IlluminationProperties:
     emission_color: tuple[float, float, float]
 
 
+@dataclass
+class InstanceTransform:
+    """
+    The placement of a single instance of an instanced object, relative to
+    the object's own transformation.
+    """
+
+    position: tuple[float, float, float]
+    rotation: tuple[float, float, float]
+    scale: float
+
+
+@dataclass
+class KeyframeTrack:
+    """
+    An object's orientation over time, interpolated between keyframes.
+
+    Attributes
+    ----------
+    times : list[float]
+        The keyframes' times in seconds, in increasing order.
+    orientations : list[tuple[float, float, float, float]]
+        The object's orientation at each keyframe, as a quaternion
+        (x, y, z, w).
+    loop : bool
+        Whether the track starts over after its last keyframe, rather than
+        holding it.
+    interpolation : Interpolation
+        How orientations are interpolated: slerp turns at a constant speed
+        between keyframes, while nlerp is cheaper but speeds up midway.
+    """
+
+    times: list[float]
+    orientations: list[tuple[float, float, float, float]]
+    loop: bool = True
+    interpolation: Interpolation = Interpolation.slerp
+
+
 @dataclass
 class ObjectConfig:
     """
@@ -29,23 +69,59 @@ class ObjectConfig:
 
     Attributes
     ----------
+    name : str
+        The name of the object, as given in the configuration file.
     model_name : str
         The name of the 3D model, must match a folder name under src/objects.
     initial_position : tuple[float, float, float]
         The initial position of the object in 3D space.
     initial_rotation : tuple[float, float, float]
         The initial rotation of the object in radians.
+    orientation : tuple[float, float, float, float] | None
+        The initial rotation as a quaternion (x, y, z, w), used instead of
+        the Euler angles if given.
     initial_scale : float
         The initial scale of the object.
+    instances : list[InstanceTransform]
+        Placements of the model's copies, if it is drawn instanced.
+    static : bool
+        Whether the object is not expected to move, and so may be batched.
+    parent : str | None
+        The name of the object this one is placed relative to, if any.
+    animation : KeyframeTrack | None
+        The keyframes the object's orientation is animated through, if any.
     """
 
     path: str
+    name: str
     model_name: str
     position: tuple[float, float, float]
     rotation: tuple[float, float, float]
     scale: float
     illumination_properties: IlluminationProperties
     location: Location = Location.both
+    instances: list[InstanceTransform] = field(default_factory=list)
+    static: bool = False
+    parent: str | None = None
+    orientation: tuple[float, float, float, float] | None = None
+    animation: KeyframeTrack | None = None
+
+
+@dataclass
+class Portal:
+    """
+    An opening through which one zone of the scene can be seen from another.
+
+    Attributes
+    ----------
+    name : str
+        The name given to the portal in the configuration file.
+    vertices : list[tuple[float, float, float]]
+        The corners of the (convex, planar) portal polygon in world space.
+    """
+
+    name: str
+    vertices: list[tuple[float, float, float]]
 
 
 @dataclass
@@ -55,6 +131,34 @@ class BufferData:
     texture_coord: list[tuple[float, float]] = field(default_factory=list)
 
 
+@dataclass(frozen=True)
+class Mesh:
+    """
+    A model loaded into the scene's buffer data, shared by every object
+    referencing it.
+
+    Attributes
+    ----------
+    first_vertex : int
+        Index of the model's first vertex in the buffer data.
+    vertices_count : int
+        Number of vertices of the model.
+    texture : int
+        The OpenGL texture name holding the model's texture.
+    bounds : NDArray[float32]
+        The model's axis-aligned bounding box, as its minimum and maximum
+        corners.
+    translucent : bool
+        Whether the texture has see-through texels, needing blending.
+    """
+
+    first_vertex: int
+    vertices_count: int
+    texture: int
+    bounds: NDArray[float32]
+    translucent: bool = False
+
+
 @dataclass
 class Face:
     vertices: list[int] = field(default_factory=list)
@@ -7,6 +7,11 @@ class Location(IntEnum):
     both = 2
 
 
+class Interpolation(IntEnum):
+    slerp = 0
+    nlerp = 1
+
+
 class Mode(IntEnum):
     camera = 0
     translating = 1
@@ -0,0 +1,196 @@
+from collections import deque
+from dataclasses import dataclass
+from statistics import fmean, pstdev, quantiles
+from time import perf_counter, sleep
+from glfw import swap_interval
+
+
+@dataclass(frozen=True)
+class FrameStats:
+    """
+    Frame time statistics over the most recent frames, in milliseconds.
+
+    Attributes
+    ----------
+    frames : int
+        Number of frames measured.
+    mean : float
+        Mean time between consecutive frames.
+    jitter : float
+        Standard deviation of the time between consecutive frames.
+    p99 : float
+        99th percentile of the time between consecutive frames.
+    worst : float
+        Longest time between consecutive frames.
+    missed : int
+        Number of frames that took over one and a half target frame times.
+    """
+
+    frames: int
+    mean: float
+    jitter: float
+    p99: float
+    worst: float
+    missed: int
+
+    def __str__(self) -> str:
+        return (
+            f"{self.mean:.2f} ms mean, {self.jitter:.2f} ms jitter, "
+            f"{self.p99:.2f} ms p99, {self.worst:.2f} ms worst, "
+            f"{self.missed} of {self.frames} frames late"
+        )
+
+
+class FrameScheduler:
+    """
+    Pace a render loop to a target frame rate, and run a fixed-timestep update
+    alongside it, independent of how long frames take to render.
+
+    Frames end on a regular schedule of deadlines. Waiting for each deadline
+    sleeps for most of the time left, short of how much sleeps have been
+    overshooting lately, and then spins for the remainder, so that frames end
+    on time without holding the CPU for the whole wait.
+
+    Loops that stop drawing while nothing changes call `idle` before waiting
+    for events, so that the time spent waiting is not counted as a frame.
+
+    Attributes
+    ----------
+    frame_time : float
+        Target time between frames, in seconds.
+    timestep : float
+        Simulated time advanced by each update, in seconds.
+    max_updates : int
+        Most updates run per frame. Time beyond that is dropped, rather than
+        slowing frames further down to catch up with it.
+    """
+
+    frame_time: float
+    timestep: float
+    max_updates: int
+    _deadline: float
+    _previous: float
+    _last_update: float
+    _accumulator: float = 0.0
+    _slack: float = 0.001
+    _idle: bool = False
+    _frame_times: deque[float]
+
+    def __init__(
+        self,
+        fps: float = 60.0,
+        update_rate: float = 60.0,
+        vsync: bool = False,
+        max_updates: int = 5,
+        history: int = 240,
+    ):
+        """
+        Start scheduling frames from now, which requires a current OpenGL
+        context.
+
+        Parameters
+        ----------
+        fps : float
+            Target number of frames per second.
+        update_rate : float
+            Number of updates per second of simulated time.
+        vsync : bool
+            Whether buffer swaps wait for the display's vertical retrace, in
+            which case the target frame rate only acts as a cap.
+        max_updates : int
+            Most updates run per frame.
+        history : int
+            Number of recent frames statistics are computed over.
+        """
+        swap_interval(1 if vsync else 0)
+        self.frame_time = 1.0 / fps
+        self.timestep = 1.0 / update_rate
+        self.max_updates = max_updates
+        self._frame_times = deque(maxlen=history)
+        now = perf_counter()
+        self._deadline = self._previous = self._last_update = now
+
+    def updates(self) -> int:
+        """
+        Count the fixed-timestep updates due since the previous call.
+
+        Returns
+        -------
+        int
+            Number of times to run the update step this frame.
+        """
+        now = perf_counter()
+        self._accumulator += now - self._last_update
+        self._last_update = now
+        steps = int(self._accumulator // self.timestep)
+        if steps > self.max_updates:
+            steps = self.max_updates
+            self._accumulator = 0.0
+        else:
+            self._accumulator -= steps * self.timestep
+        return steps
+
+    def remaining(self) -> float:
+        """
+        Time left until the next frame is due, for waiting on something else
+        in the meantime.
+
+        Returns
+        -------
+        float
+            Seconds until the next deadline, or 0 if it has passed.
+        """
+        return max(self._deadline + self.frame_time - perf_counter(), 0.0)
+
+    def idle(self) -> None:
+        """
+        Leave the time until the next frame ends out of the statistics, as
+        the loop is about to wait for something to draw.
+        """
+        self._idle = True
+
+    def wait(self) -> None:
+        """Wait until the current frame's deadline, and move on to the next."""
+        self._deadline += self.frame_time
+        now = perf_counter()
+        if now > self._deadline + self.frame_time:
+            # Too far behind to catch up, so start the schedule over
+            self._deadline = now
+        elif now < self._deadline:
+            requested = self._deadline - now - 2 * self._slack
+            if requested > 0:
+                sleep(requested)
+                overshoot = perf_counter() - now - requested
+                self._slack += 0.1 * (max(overshoot, 0.0) - self._slack)
+            while perf_counter() < self._deadline:
+                pass
+
+        now = perf_counter()
+        if not self._idle:
+            self._frame_times.append(now - self._previous)
+        self._idle = False
+        self._previous = now
+
+    def stats(self) -> FrameStats:
+        """
+        Summarize the time between the most recent frames.
+
+        Returns
+        -------
+        FrameStats
+            The statistics, all zero until two frames have been measured.
+        """
+        # Copied at once, as frames may be added from another thread while
+        # a display reads the statistics
+        times = [t * 1000 for t in tuple(self._frame_times)]
+        if len(times) < 2:
+            return FrameStats(len(times), 0.0, 0.0, 0.0, 0.0, 0)
+        late = 1500 * self.frame_time
+        return FrameStats(
+            frames=len(times),
+            mean=fmean(times),
+            jitter=pstdev(times),
+            p99=quantiles(times, n=100)[98],
+            worst=max(times),
+            missed=sum(t > late for t in times),
+        )
@@ -0,0 +1,63 @@
+from functools import cache
+from OpenGL.GL import (
+    GL_EXTENSIONS,
+    GL_MAJOR_VERSION,
+    GL_MINOR_VERSION,
+    GL_NUM_EXTENSIONS,
+    glGetIntegerv,
+    glGetStringi,
+)
+
+
+@cache
+def gl_version() -> tuple[int, int]:
+    """
+    The version of the current OpenGL context.
+
+    Returns
+    -------
+    tuple[int, int]
+        The major and minor version numbers.
+    """
+    return (
+        int(glGetIntegerv(GL_MAJOR_VERSION)),
+        int(glGetIntegerv(GL_MINOR_VERSION)),
+    )
+
+
+@cache
+def gl_extensions() -> frozenset[str]:
+    """
+    The extensions supported by the current OpenGL context.
+
+    Returns
+    -------
+    frozenset[str]
+        The extensions' names, such as ``"GL_ARB_buffer_storage"``.
+    """
+    count = int(glGetIntegerv(GL_NUM_EXTENSIONS))
+    return frozenset(
+        glGetStringi(GL_EXTENSIONS, i).decode() for i in range(count)
+    )
+
+
+def gl_supports(version: tuple[int, int], extension: str = "") -> bool:
+    """
+    Check whether a feature is available, being core since some version or
+    provided by an extension.
+
+    Parameters
+    ----------
+    version : tuple[int, int]
+        The OpenGL version the feature became core in.
+    extension : str
+        The extension providing the feature in earlier versions, if any.
+
+    Returns
+    -------
+    bool
+        Whether the current context supports the feature.
+    """
+    if gl_version() >= version:
+        return True
+    return bool(extension) and extension in gl_extensions()
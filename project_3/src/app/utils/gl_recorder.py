@@ -0,0 +1,351 @@
+import re
+import sys
+from collections import deque
+from dataclasses import dataclass
+from fnmatch import fnmatchcase
+from itertools import count
+from time import perf_counter_ns
+from types import ModuleType
+from typing import Any, Callable, Iterator
+from numpy import arange, uint32
+from OpenGL.GL import (
+    GL_ACTIVE_UNIFORMS,
+    GL_ALREADY_SIGNALED,
+    GL_FILL,
+    GL_FRAMEBUFFER_COMPLETE,
+    GL_MAJOR_VERSION,
+    GL_MINOR_VERSION,
+    GL_POLYGON_MODE,
+    GL_UNIFORM_BUFFER_OFFSET_ALIGNMENT,
+)
+from tabulate import tabulate
+
+# Uniforms outside of blocks, such as "uniform mat4 model;" or "uniform
+# float weights[4];", as declared in GLSL sources
+_UNIFORM = re.compile(
+    r"^\s*uniform\s+\w+\s+(\w+)\s*(?:\[(\d+)\])?\s*;", re.MULTILINE
+)
+
+
+@dataclass(frozen=True)
+class CallStats:
+    """
+    The calls made to an OpenGL entry point during a frame.
+
+    Attributes
+    ----------
+    calls : int
+        Number of calls.
+    time : float
+        Time spent in the calls, in milliseconds, as seen from Python.
+    """
+
+    calls: int
+    time: float
+
+
+class GLRecorder:
+    """
+    Count and time every call made to OpenGL entry points, frame by frame.
+
+    Modules import the functions they call from ``OpenGL.GL`` by name, so the
+    recorder replaces those names in the given modules with wrappers, and
+    restores them when uninstalled. Calls are either forwarded to the current
+    OpenGL context, to measure how much each costs through PyOpenGL, or, in
+    mock mode, answered without any context at all, so that the rest of the
+    code can be measured and its calls counted with no GPU nor driver.
+
+    The mock answers just enough for the scene to run: names from counters,
+    OpenGL 3.3 with no extensions, successful compilation and linking, active
+    uniforms read from the shaders' sources, and queries whose results are
+    always available. Everything else returns None.
+
+    Examples
+    --------
+    Call counts can be held to a budget, once the modules making the calls
+    are imported::
+
+        with GLRecorder().install() as recorder:
+            draw_frame()
+            recorder.end_frame()
+        assert recorder.calls("glUniform*") <= 8
+
+    Attributes
+    ----------
+    mock : bool
+        Whether calls are answered without reaching OpenGL.
+    frames : int
+        Number of frames ended so far.
+    """
+
+    mock: bool
+    frames: int = 0
+    _current: dict[str, list[int]]
+    _history: deque[dict[str, CallStats]]
+    _originals: list[tuple[ModuleType, str, Callable[..., Any]]]
+    _stubs: "_MockGL | None"
+
+    def __init__(self, mock: bool = False, history: int = 240):
+        """
+        Parameters
+        ----------
+        mock : bool
+            Whether to answer calls without reaching OpenGL.
+        history : int
+            Number of recent frames kept.
+        """
+        self.mock = mock
+        self._current = {}
+        self._history = deque(maxlen=history)
+        self._originals = []
+        self._stubs = _MockGL() if mock else None
+
+    def install(self, *modules: ModuleType) -> "GLRecorder":
+        """
+        Start recording the OpenGL calls made by some modules.
+
+        Parameters
+        ----------
+        *modules : ModuleType
+            The modules whose OpenGL calls to record. By default, every
+            module of the ``app`` package imported so far.
+
+        Returns
+        -------
+        GLRecorder
+            The recorder itself, to be used as a context manager.
+        """
+        if not modules:
+            modules = tuple(
+                module
+                for name, module in list(sys.modules.items())
+                if name == "app" or name.startswith("app.")
+            )
+        for module in modules:
+            for name, function in list(vars(module).items()):
+                if not (name[:2] == "gl" and name[2:3].isupper()):
+                    continue
+                if not callable(function):
+                    continue
+                self._originals.append((module, name, function))
+                target = (
+                    self._stubs.function(name) if self._stubs else function
+                )
+                setattr(module, name, self._wrap(name, target))
+        return self
+
+    def uninstall(self) -> None:
+        """Restore the modules' own OpenGL functions."""
+        for module, name, function in reversed(self._originals):
+            setattr(module, name, function)
+        self._originals.clear()
+
+    def __enter__(self) -> "GLRecorder":
+        return self
+
+    def __exit__(self, *_: object) -> None:
+        self.uninstall()
+
+    def end_frame(self) -> None:
+        """End the current frame, keeping the calls made during it."""
+        self._history.append(
+            {
+                name: CallStats(calls, ns / 1e6)
+                for name, (calls, ns) in self._current.items()
+            }
+        )
+        self._current = {}
+        self.frames += 1
+
+    def frame(self, index: int = -1) -> dict[str, CallStats]:
+        """
+        Get the calls made during a recent frame.
+
+        Parameters
+        ----------
+        index : int
+            Index of the frame among those kept, the last one by default.
+
+        Returns
+        -------
+        dict[str, CallStats]
+            The calls made to each entry point, in the order first called.
+        """
+        return self._history[index] if self._history else {}
+
+    def calls(self, pattern: str = "*", index: int = -1) -> int:
+        """
+        Count the calls made during a recent frame.
+
+        Parameters
+        ----------
+        pattern : str
+            Shell-style pattern the entry points' names must match, such as
+            ``"glUniform*"``.
+        index : int
+            Index of the frame among those kept, the last one by default.
+
+        Returns
+        -------
+        int
+            Number of calls made to matching entry points.
+        """
+        return sum(
+            stats.calls
+            for name, stats in self.frame(index).items()
+            if fnmatchcase(name, pattern)
+        )
+
+    def table(self, index: int = -1) -> str:
+        """
+        Format the calls made during a recent frame as a table.
+
+        Parameters
+        ----------
+        index : int
+            Index of the frame among those kept, the last one by default.
+
+        Returns
+        -------
+        str
+            A row per entry point, costliest first, and their total.
+        """
+        frame = self.frame(index)
+        rows = [
+            [
+                name,
+                stats.calls,
+                f"{stats.time:.3f}",
+                f"{stats.time * 1000 / stats.calls:.2f}",
+            ]
+            for name, stats in sorted(
+                frame.items(), key=lambda item: -item[1].time
+            )
+        ]
+        calls = sum(stats.calls for stats in frame.values())
+        time = sum(stats.time for stats in frame.values())
+        rows.append(["total", calls, f"{time:.3f}", ""])
+        headers = ["Entry point", "Calls", "Time (ms)", "Per call (us)"]
+        return tabulate(rows, headers=headers)
+
+    def _wrap(
+        self, name: str, function: Callable[..., Any]
+    ) -> Callable[..., Any]:
+        def record(*args: Any, **kwargs: Any) -> Any:
+            start = perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                elapsed = perf_counter_ns() - start
+                stats = self._current.setdefault(name, [0, 0])
+                stats[0] += 1
+                stats[1] += elapsed
+
+        record.__name__ = record.__qualname__ = name
+        return record
+
+
+class _MockGL:
+    """Answers to OpenGL calls, standing in for a context."""
+
+    _names: Iterator[int]
+    _sources: dict[int, str]
+    _programs: dict[int, list[int]]
+    _integers: dict[int, Any]
+
+    def __init__(self) -> None:
+        self._names = count(1)
+        self._sources = {}
+        self._programs = {}
+        self._integers = {
+            GL_MAJOR_VERSION: 3,
+            GL_MINOR_VERSION: 3,
+            GL_UNIFORM_BUFFER_OFFSET_ALIGNMENT: 256,
+            GL_POLYGON_MODE: [GL_FILL, GL_FILL],
+        }
+
+    def function(self, name: str) -> Callable[..., Any]:
+        """
+        Get the stand-in for an OpenGL entry point.
+
+        Parameters
+        ----------
+        name : str
+            The entry point's name, such as ``"glGenBuffers"``.
+
+        Returns
+        -------
+        Callable[..., Any]
+            A function taking the entry point's arguments.
+        """
+        handler = getattr(self, f"_{name}", None)
+        if handler is not None:
+            return handler
+        if name.startswith("glGen"):
+            return self._generate
+        if name.startswith("glCreate") or name in (
+            "glFenceSync",
+            "glGetAttribLocation",
+            "glGetUniformBlockIndex",
+            "glGetUniformLocation",
+        ):
+            return lambda *_: next(self._names)
+        if name.startswith("glGetQueryObject"):
+            return lambda *_: 1
+        return lambda *_: None
+
+    def _generate(self, n: int, *_: Any) -> Any:
+        first = next(self._names)
+        for _ in range(n - 1):
+            next(self._names)
+        return first if n == 1 else arange(first, first + n, dtype=uint32)
+
+    def _uniforms(self, program: int) -> list[tuple[str, int]]:
+        """List a program's uniforms, as declared in its shaders' sources."""
+        uniforms: dict[str, int] = {}
+        for shader in self._programs.get(program, []):
+            for name, size in _UNIFORM.findall(self._sources[shader]):
+                key = f"{name}[0]" if size else name
+                uniforms[key] = int(size or 1)
+        return list(uniforms.items())
+
+    def _glGetIntegerv(self, pname: int, *_: Any) -> Any:
+        return self._integers.get(pname, 0)
+
+    _glGetInteger = _glGetIntegerv
+
+    def _glShaderSource(self, shader: int, source: Any) -> None:
+        if not isinstance(source, str):
+            source = "".join(source)
+        self._sources[shader] = source
+
+    def _glAttachShader(self, program: int, shader: int) -> None:
+        self._programs.setdefault(program, []).append(shader)
+
+    def _glGetProgramiv(self, program: int, pname: int) -> int:
+        if pname == GL_ACTIVE_UNIFORMS:
+            return len(self._uniforms(program))
+        return 1
+
+    def _glGetShaderiv(self, *_: Any) -> int:
+        return 1
+
+    def _glGetActiveUniform(
+        self, program: int, index: int
+    ) -> tuple[bytes, int, int]:
+        name, size = self._uniforms(program)[index]
+        return name.encode(), size, 0
+
+    def _glCheckFramebufferStatus(self, *_: Any) -> int:
+        return GL_FRAMEBUFFER_COMPLETE
+
+    def _glClientWaitSync(self, *_: Any) -> int:
+        return GL_ALREADY_SIGNALED
+
+    def _glGetString(self, *_: Any) -> bytes:
+        return b"mock"
+
+    def _glReadPixels(
+        self, x: int, y: int, width: int, height: int, *_: Any
+    ) -> bytes:
+        return bytes(width * height * 4)
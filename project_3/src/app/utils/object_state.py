@@ -7,13 +7,15 @@ class ObjectState:
     position: dict[str, float]
     rotation: dict[str, float]
     scale: float
+    orientation: tuple[float, float, float, float] | None
 
     def __init__(
         self,
         position: tuple[float, float, float],
         rotation: tuple[float, float, float],
         scale: float,
-        callback: Callable[[], None],
+        callback: Callable[[], None] | None = None,
+        orientation: tuple[float, float, float, float] | None = None,
     ):
         self.position = TransformDict(
             {key: value for key, value in zip(("x", "y", "z"), position)},
@@ -24,9 +26,12 @@ class ObjectState:
             on_change=callback,
         )
         self.scale = scale
+        # A quaternion (x, y, z, w), in place of the Euler angles if given
+        self.orientation = orientation
 
     def copy(self, other: "ObjectState"):
         """Copy the state from another ObjectState instance deeply."""
         self.position = copy(other.position)
         self.rotation = copy(other.rotation)
         self.scale = other.scale
+        self.orientation = other.orientation
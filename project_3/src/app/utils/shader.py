@@ -3,21 +3,22 @@ from OpenGL.GL import (
     GL_LINK_STATUS,
     GL_VERTEX_SHADER,
     GL_FRAGMENT_SHADER,
+    GL_INVALID_INDEX,
     glCreateShader,
     glCompileShader,
     glGetProgramInfoLog,
+    glGetAttribLocation,
     glGetProgramiv,
     glGetShaderInfoLog,
     glGetShaderiv,
-    glGetUniformLocation,
+    glGetUniformBlockIndex,
     glShaderSource,
     glCreateProgram,
     glAttachShader,
     glLinkProgram,
     glDeleteShader,
     glUseProgram,
-    glUniform1f,
-    glUniform1i,
+    glUniformBlockBinding,
 )
 
 
@@ -25,6 +26,11 @@ class Shader:
     """
     A class to manage OpenGL shader programs, including compilation and linking.
 
+    The shaders read their uniforms from uniform blocks, fed from a buffer
+    rather than set on the program, apart from the texture sampler, which
+    keeps texture unit 0. The program only needs its blocks attached to
+    binding points, with `bind_block`.
+
     Attributes
     ----------
     id : int
@@ -32,6 +38,7 @@ class Shader:
     """
 
     id: int
+    _attributes: dict[str, int]
 
     def __init__(self, vertexPath: str, fragmentPath: str):
         try:
@@ -56,6 +63,7 @@ class Shader:
             glAttachShader(self.id, fragment)
             glLinkProgram(self.id)
             self._checkCompileErrors(self.id, "PROGRAM")
+            self._attributes = {}
             # delete the shaders as they're linked into our program now and no longer necessary
             glDeleteShader(vertex)
             glDeleteShader(fragment)
@@ -80,45 +88,40 @@ class Shader:
         """
         glUseProgram(self.id)
 
-    # utility functions
-    def setBool(self, name: str, value: bool) -> None:
+    # attribute locations and uniform blocks
+    # ------------------------------------------------------------------------
+    def attribute(self, name: str) -> int:
         """
-        Set a boolean uniform in the shader.
+        Get the location of a vertex attribute, querying it only once.
 
         Parameters
         ----------
         name : str
-            The name of the uniform variable in the shader.
-        value : bool
-            The boolean value to set.
-        """
-        glUniform1i(glGetUniformLocation(self.id, name), int(value))
+            The name of the attribute.
 
-    def setInt(self, name: str, value: int) -> None:
-        """
-        Set an integer uniform in the shader.
-
-        Parameters
-        ----------
-        name : str
-            The name of the uniform variable in the shader.
-        value : int
-            The integer value to set.
+        Returns
+        -------
+        int
+            The attribute's location, or -1 if it is not active.
         """
-        glUniform1i(glGetUniformLocation(self.id, name), value)
+        if name not in self._attributes:
+            self._attributes[name] = glGetAttribLocation(self.id, name)
+        return self._attributes[name]
 
-    def setFloat(self, name: str, value: float) -> None:
+    def bind_block(self, name: str, binding: int) -> None:
         """
-        Set a float uniform in the shader.
+        Attach a uniform block to a uniform buffer binding point.
 
         Parameters
         ----------
         name : str
-            The name of the uniform variable in the shader.
-        value : float
-            The float value to set.
+            The name of the uniform block, such as "Camera".
+        binding : int
+            The binding point the block's buffer range is bound to.
         """
-        glUniform1f(glGetUniformLocation(self.id, name), value)
+        index = glGetUniformBlockIndex(self.id, name)
+        if index != GL_INVALID_INDEX:
+            glUniformBlockBinding(self.id, index, binding)
 
     def _checkCompileErrors(self, shader: int, type: str) -> None:
         """
@@ -81,17 +81,23 @@ class TransformDict(dict[str, float]):
                 f"update expected at most 1 argument, got {len(args)}"
             )
 
-        if args:
-            other = args[0]
-            if isinstance(other, Mapping):
-                for key in other:
-                    self[key] = other[key]  # pyright: ignore [reportArgumentType]
-            else:
-                for key, value in other:
-                    self[key] = value
-
-        for key, value in kwargs.items():
-            self[key] = value
+        # Keys are written without calling back, for the callback to be
+        # called once, after all of them
+        on_change, self._on_change = self._on_change, None
+        try:
+            if args:
+                other = args[0]
+                if isinstance(other, Mapping):
+                    for key in other:
+                        self[key] = other[key]  # pyright: ignore [reportArgumentType]
+                else:
+                    for key, value in other:
+                        self[key] = value
+
+            for key, value in kwargs.items():
+                self[key] = value
+        finally:
+            self._on_change = on_change
 
         if self._on_change:
             self._on_change()
@@ -0,0 +1,110 @@
+import ctypes
+from typing import ClassVar
+from OpenGL.GL import (
+    GL_ARRAY_BUFFER,
+    GL_FLOAT as FLOAT,
+    glBindBuffer,
+    glBindVertexArray,
+    glEnableVertexAttribArray,
+    glGenVertexArrays,
+    glVertexAttribDivisor,
+    glVertexAttribPointer,
+)
+
+
+class VertexArray:
+    """
+    A vertex array object, recording which buffer feeds each vertex attribute
+    and how, so that switching between vertex layouts takes a single bind.
+
+    Attributes
+    ----------
+    id : int
+        The OpenGL vertex array object name.
+    """
+
+    id: int
+    _attributes: list[tuple[int, int, int, int, int, int]]
+    _bound: ClassVar[int] = 0
+
+    def __init__(self) -> None:
+        self.id = int(glGenVertexArrays(1))
+        self._attributes = []
+
+    def add(
+        self,
+        location: int,
+        buffer: int,
+        size: int,
+        divisor: int = 0,
+        stride: int = 0,
+        offset: int = 0,
+    ) -> None:
+        """
+        Feed a float vertex attribute from a buffer.
+
+        Parameters
+        ----------
+        location : int
+            The attribute's location in the shader program.
+        buffer : int
+            The buffer holding the attribute's values.
+        size : int
+            Number of components per value, from 1 to 4.
+        divisor : int
+            Advance to the next value every `divisor` instances rather than
+            every vertex, if not 0.
+        stride : int
+            Bytes between consecutive values, if not tightly packed.
+        offset : int
+            Bytes from the start of the buffer to the first value.
+        """
+        self.bind()
+        glBindBuffer(GL_ARRAY_BUFFER, buffer)
+        glEnableVertexAttribArray(location)
+        pointer = ctypes.c_void_p(offset)
+        glVertexAttribPointer(location, size, FLOAT, False, stride, pointer)
+        if divisor:
+            glVertexAttribDivisor(location, divisor)
+        self._attributes.append(
+            (location, buffer, size, divisor, stride, offset)
+        )
+
+    def add_matrix(self, location: int, buffer: int, divisor: int = 0) -> None:
+        """
+        Feed a mat4 vertex attribute, taking four consecutive locations, from
+        a buffer of column-major 4x4 float matrices.
+
+        Parameters
+        ----------
+        location : int
+            The location of the attribute's first column.
+        buffer : int
+            The buffer holding the matrices.
+        divisor : int
+            Advance to the next matrix every `divisor` instances rather than
+            every vertex, if not 0.
+        """
+        for column in range(4):
+            self.add(location + column, buffer, 4, divisor, 64, 16 * column)
+
+    def derive(self) -> "VertexArray":
+        """
+        Create a vertex array fed by the same buffers, to be extended with
+        further attributes.
+
+        Returns
+        -------
+        VertexArray
+            A new vertex array object with every attribute added so far.
+        """
+        vertex_array = VertexArray()
+        for attribute in self._attributes:
+            vertex_array.add(*attribute)
+        return vertex_array
+
+    def bind(self) -> None:
+        """Make this vertex array the one used by draw calls."""
+        if VertexArray._bound != self.id:
+            glBindVertexArray(self.id)
+            VertexArray._bound = self.id
@@ -0,0 +1,234 @@
+from app.object import Object
+from app.static_batch import Drawable
+from app.utils import Location, Portal
+from numpy import array, concatenate, cross, float32, where
+from numpy.linalg import norm
+from numpy.typing import NDArray
+
+
+class Frustum:
+    """
+    A convex volume bounded by planes whose normals point inwards.
+
+    Each plane is stored as a row (a, b, c, d) so that a point p lies inside
+    the frustum when a * p.x + b * p.y + c * p.z + d >= 0 for every plane.
+    """
+
+    planes: NDArray[float32]
+
+    def __init__(self, planes: NDArray[float32]) -> None:
+        self.planes = planes
+
+    @classmethod
+    def from_matrix(cls, clip: NDArray[float32]) -> "Frustum":
+        """
+        Extract the six frustum planes from a combined projection-view matrix.
+
+        Parameters
+        ----------
+        clip : NDArray[float32]
+            The 4x4 matrix mapping world coordinates to clip coordinates.
+
+        Returns
+        -------
+        Frustum
+            The view frustum, with its planes normalized.
+        """
+        r = clip
+        planes = array(
+            [
+                r[3] + r[0],  # left
+                r[3] - r[0],  # right
+                r[3] + r[1],  # bottom
+                r[3] - r[1],  # top
+                r[3] + r[2],  # near
+                r[3] - r[2],  # far
+            ],
+            dtype=float32,
+        )
+        return cls(planes / norm(planes[:, :3], axis=1)[:, None])
+
+    @classmethod
+    def through_portal(
+        cls, eye: NDArray[float32], polygon: NDArray[float32]
+    ) -> "Frustum":
+        """
+        Build the frustum seen from an eye point through a convex polygon.
+
+        Parameters
+        ----------
+        eye : NDArray[float32]
+            The position of the viewer.
+        polygon : NDArray[float32]
+            The (already clipped) corners of the portal, in order.
+
+        Returns
+        -------
+        Frustum
+            A frustum made of one plane per polygon edge, plus the portal's
+            own plane so that only what lies beyond the opening is kept.
+        """
+        centroid = polygon.mean(axis=0)
+        planes: list[NDArray[float32]] = []
+        for a, b in zip(polygon, concatenate([polygon[1:], polygon[:1]])):
+            normal = cross(a - eye, b - eye)
+            length = norm(normal)
+            if length < 1e-9:
+                continue
+            normal = normal / length
+            d = -normal @ eye
+            if normal @ centroid + d < 0:
+                normal, d = -normal, -d
+            planes.append(array([*normal, d], dtype=float32))
+
+        normal = cross(polygon[1] - polygon[0], polygon[2] - polygon[0])
+        normal = normal / max(float(norm(normal)), 1e-9)
+        d = -normal @ centroid
+        if normal @ eye + d > 0:
+            normal, d = -normal, -d
+        planes.append(array([*normal, d], dtype=float32))
+        return cls(array(planes, dtype=float32))
+
+    def intersects_box(self, bounds: NDArray[float32]) -> bool:
+        """
+        Test whether an axis-aligned box is at least partially inside.
+
+        Parameters
+        ----------
+        bounds : NDArray[float32]
+            A 2x3 array holding the box's minimum and maximum corners.
+
+        Returns
+        -------
+        bool
+            False only if the box lies entirely behind one of the planes.
+        """
+        # For every plane pick the box corner furthest along its normal
+        corners = where(self.planes[:, :3] >= 0, bounds[1], bounds[0])
+        distances = (corners * self.planes[:, :3]).sum(axis=1)
+        return bool((distances + self.planes[:, 3] >= 0).all())
+
+    def clip_polygon(self, polygon: NDArray[float32]) -> NDArray[float32]:
+        """
+        Clip a convex polygon against every plane (Sutherland-Hodgman).
+
+        Parameters
+        ----------
+        polygon : NDArray[float32]
+            The polygon's corners, in order.
+
+        Returns
+        -------
+        NDArray[float32]
+            The corners of the part of the polygon inside the frustum, which
+            has fewer than three rows if nothing of it is visible.
+        """
+        points = list(polygon)
+        for plane in self.planes:
+            if len(points) < 3:
+                break
+            clipped: list[NDArray[float32]] = []
+            for i, current in enumerate(points):
+                previous = points[i - 1]
+                d_cur = plane[:3] @ current + plane[3]
+                d_prev = plane[:3] @ previous + plane[3]
+                if (d_cur >= 0) != (d_prev >= 0):
+                    t = d_prev / (d_prev - d_cur)
+                    clipped.append(previous + t * (current - previous))
+                if d_cur >= 0:
+                    clipped.append(current)
+            points = clipped
+        return array(points, dtype=float32).reshape(-1, 3)
+
+
+class ZoneVisibility:
+    """
+    Decide which objects can be seen from the camera, using the objects'
+    location tags as zones and portals as the only openings between them.
+
+    Objects tagged as ``internal`` form the interior zone, those tagged as
+    ``external`` the exterior one, and objects tagged as ``both`` belong to
+    every zone. Objects in the camera's zone are tested against the view
+    frustum; objects in the other zone are only kept when they intersect the
+    frustum seen through one of the portals. Without any portals configured
+    the zones are not separated and only the view frustum is used.
+    """
+
+    _objects: list[Object]
+    _portals: list[NDArray[float32]]
+    culled: int = 0
+
+    def __init__(self, objects: list[Object], portals: list[Portal]) -> None:
+        self._objects = objects
+        self._portals = [array(p.vertices, dtype=float32) for p in portals]
+
+    def camera_zone(self, eye: NDArray[float32]) -> Location:
+        """
+        Find the zone the camera is in.
+
+        Parameters
+        ----------
+        eye : NDArray[float32]
+            The camera position.
+
+        Returns
+        -------
+        Location
+            ``internal`` if the camera lies within the bounding box of all
+            internal objects, ``external`` otherwise.
+        """
+        inside = [
+            o.world_bounds
+            for o in self._objects
+            if o.location == Location.internal
+        ]
+        if not inside:
+            return Location.external
+        bounds = array(inside)
+        low, high = bounds[:, 0].min(axis=0), bounds[:, 1].max(axis=0)
+        if ((low <= eye) & (eye <= high)).all():
+            return Location.internal
+        return Location.external
+
+    def visible(
+        self,
+        objects: list[Drawable],
+        eye: NDArray[float32],
+        clip: NDArray[float32],
+    ) -> list[Drawable]:
+        """
+        Select the objects to be drawn this frame.
+
+        Parameters
+        ----------
+        objects : list[Drawable]
+            The objects, or batches of static objects, to choose from.
+        eye : NDArray[float32]
+            The camera position.
+        clip : NDArray[float32]
+            The camera's combined projection-view matrix.
+
+        Returns
+        -------
+        list[Drawable]
+            The visible objects, in the given order.
+        """
+        frustum = Frustum.from_matrix(clip)
+        zone = self.camera_zone(eye)
+        portal_frustums: list[Frustum] = []
+        for portal in self._portals:
+            opening = frustum.clip_polygon(portal)
+            if len(opening) >= 3:
+                portal_frustums.append(Frustum.through_portal(eye, opening))
+
+        visible: list[Drawable] = []
+        for obj in objects:
+            bounds = obj.world_bounds
+            if not self._portals or obj.location in (Location.both, zone):
+                seen = frustum.intersects_box(bounds)
+            else:
+                seen = any(f.intersects_box(bounds) for f in portal_frustums)
+            if seen:
+                visible.append(obj)
+        self.culled = len(objects) - len(visible)
+        return visible
@@ -1,6 +1,14 @@
 from typing import Any
+import glfw
+from app.headless import HeadlessWindow
 from glfw import (
+    CONTEXT_VERSION_MAJOR,
+    CONTEXT_VERSION_MINOR,
     FALSE,
+    OPENGL_CORE_PROFILE,
+    OPENGL_FORWARD_COMPAT,
+    OPENGL_PROFILE,
+    TRUE,
     VISIBLE,
     create_window,
     init,
@@ -39,13 +47,18 @@ def init_window(width: int, height: int, title: str) -> Any:
     -----
     This function:
     1. Initializes GLFW
-    2. Creates an invisible window (initially hidden)
+    2. Creates an invisible window (initially hidden), with an OpenGL 3.3 or
+       later core profile context
     3. Sets the window's OpenGL context as current
     4. Returns the window handle for further operations
     """
     if not init():
         raise Exception("GLFW initialization failed")
     window_hint(VISIBLE, FALSE)
+    window_hint(CONTEXT_VERSION_MAJOR, 3)
+    window_hint(CONTEXT_VERSION_MINOR, 3)
+    window_hint(OPENGL_PROFILE, OPENGL_CORE_PROFILE)
+    window_hint(OPENGL_FORWARD_COMPAT, TRUE)
     window = create_window(width, height, title, None, None)
     if window is None:
         terminate()
@@ -53,3 +66,50 @@ def init_window(width: int, height: int, title: str) -> Any:
 
     make_context_current(window)
     return window
+
+
+def get_window_size(window: Any) -> tuple[int, int]:
+    """
+    Get the size of a window's drawing area.
+
+    Parameters
+    ----------
+    window : Any
+        The GLFW window object, or a headless stand-in for one.
+
+    Returns
+    -------
+    tuple[int, int]
+        The width and height, in screen coordinates.
+    """
+    if isinstance(window, HeadlessWindow):
+        return window.width, window.height
+    return glfw.get_window_size(window)
+
+
+def show_window(window: Any) -> None:
+    """
+    Make a window visible, which does nothing for a headless one.
+
+    Parameters
+    ----------
+    window : Any
+        The GLFW window object, or a headless stand-in for one.
+    """
+    if not isinstance(window, HeadlessWindow):
+        glfw.show_window(window)
+
+
+def swap_buffers(window: Any) -> None:
+    """
+    Present the frame just rendered to a window.
+
+    Parameters
+    ----------
+    window : Any
+        The GLFW window object, or a headless stand-in for one.
+    """
+    if isinstance(window, HeadlessWindow):
+        window.swap()
+    else:
+        glfw.swap_buffers(window)
@@ -1,27 +1,139 @@
+import sys
+from argparse import ArgumentParser, Namespace
+from os import environ
 from os.path import dirname
-from glfw import wait_events, terminate, window_should_close
+from time import perf_counter
+
+# PyOpenGL settles on how to reach the driver when first imported, so an
+# offscreen context must be asked for before anything imports OpenGL
+if "--headless" in sys.argv:
+    environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+from glfw import (
+    terminate,
+    wait_events,
+    wait_events_timeout,
+    window_should_close,
+)
+from PIL import Image
 from app.controller import Controller
+from app.headless import HeadlessWindow
+from app.metrics_exporter import MetricsExporter
 from app.scene import Scene
+from app.utils import FrameScheduler
 from app.window import init_window
-import sys
+
+# Time animations advance by per frame when headless, as if drawn at 60 FPS
+HEADLESS_STEP = 1 / 60
+
+
+def parse_arguments() -> Namespace:
+    parser = ArgumentParser(description="Render a 3D scene with OpenGL.")
+    parser.add_argument(
+        "config_path",
+        nargs="?",
+        default=f"{dirname(__file__)}/objects/config.toml",
+        help="the scene's configuration file",
+    )
+    parser.add_argument(
+        "--headless",
+        action="store_true",
+        help="render offscreen with EGL, with no window, and report timings",
+    )
+    parser.add_argument(
+        "--frames",
+        type=int,
+        default=100,
+        help="number of frames to render when headless",
+    )
+    parser.add_argument(
+        "--output",
+        help="where to save the last frame rendered when headless, as PNG",
+    )
+    parser.add_argument(
+        "--metrics",
+        help="JSON lines file to append rendering metrics to periodically",
+    )
+    parser.add_argument(
+        "--prometheus",
+        help="file to write rendering metrics to for Prometheus (*.prom)",
+    )
+    parser.add_argument(
+        "--metrics-interval",
+        type=float,
+        default=10.0,
+        help="seconds between metrics exports",
+    )
+    return parser.parse_args()
+
+
+def start_exporter(args: Namespace, scene: Scene) -> MetricsExporter | None:
+    if not (args.metrics or args.prometheus):
+        return None
+    return MetricsExporter(
+        scene, args.metrics, args.prometheus, args.metrics_interval
+    )
+
+
+def run_headless(args: Namespace) -> None:
+    window = HeadlessWindow(940, 1000, core=True)
+    scene = Scene(window, args.config_path)
+    exporter = start_exporter(args, scene)
+    start = perf_counter()
+    for _ in range(args.frames):
+        scene.animate(HEADLESS_STEP)
+        scene.draw()
+        if exporter:
+            exporter.frame()
+    elapsed = perf_counter() - start
+    if exporter:
+        exporter.close()
+
+    print(
+        f"{args.frames} frames in {elapsed:.3f} s "
+        f"({args.frames / elapsed:.1f} FPS)\n"
+    )
+    print(scene.profiler.table())
+    if args.output:
+        Image.fromarray(window.read_pixels()).save(args.output)
+    window.close()
 
 
 def main():
+    args = parse_arguments()
+    if args.headless:
+        run_headless(args)
+        return
+
     window = init_window(940, 1000, "Program")
-    config_path = (
-        f"{dirname(__file__)}/objects/config.toml"
-        if len(sys.argv) <= 1
-        else sys.argv[1]
-    )
-    scene = Scene(window, config_path)
-    controller = Controller(scene)
+    scene = Scene(window, args.config_path)
+    scheduler = FrameScheduler()
+    controller = Controller(scene, scheduler)
+    exporter = start_exporter(args, scene)
 
-    # Main loop
+    # Main loop. Nothing is drawn until something changes the scene, and
+    # events arriving before the next frame is due are drawn together with it.
+    # Animations are played forward in fixed steps, however long frames take
     while not window_should_close(window):
+        if not (scene.dirty or scene.animated):
+            scheduler.idle()
+            wait_events()
+            continue
+        timeout = scheduler.remaining()
+        if timeout > 0.0:
+            wait_events_timeout(timeout)
+            continue
+        for _ in range(scheduler.updates()):
+            scene.animate(scheduler.timestep)
         scene.draw()
-        wait_events()
+        if exporter:
+            exporter.frame()
+        scheduler.wait()
         controller.log()
 
+    controller.display.close()
+    if exporter:
+        exporter.close()
     terminate()
 
 
@@ -1,5 +1,6 @@
 #version 330 core
 #define NUM_LIGHTS 3
+#define MAX_DRAWS 128
 
 // Define integer constants for locations.
 #define LOCATION_INTERNAL 0
@@ -9,45 +10,66 @@
 // --- Light Source Struct ---
 struct LightSource {
     vec3  position;
-    vec3  color;
     float intensity;
+    vec3  color;
     int   location; // Corresponds to LOCATION_INTERNAL, EXTERNAL, BOTH
 };
 
-// --- Uniforms ---
-uniform LightSource lights[NUM_LIGHTS]; // Array of light source structs
+// --- Uniform Blocks ---
+layout(std140) uniform Lights {
+    LightSource lights[NUM_LIGHTS]; // Array of light source structs
+    bool ambient_on;
+};
 
-// Global Lighting Parameters
-uniform float ambient_intensity;
-uniform vec3  ambient_color;
+// Camera/View Parameters
+layout(std140, row_major) uniform Camera {
+    mat4 view;
+    mat4 projection;
+    vec3 viewPos;
+};
 
-// Material Parameters
-uniform float diffuse_intensity;
-uniform float specular_intensity;
-uniform float specular_exponent;
+// Per-object record: that of the object being drawn, bound to ObjectData,
+// or one of the records of a batched draw, picked by its draw index
+struct ObjectRecord {
+    mat4  model;
+    vec3  ambient_color;      // Global lighting parameters
+    float ambient_intensity;
+    vec3  emission_color;     // If is_emitter, its glow color
+    float diffuse_intensity;  // Material parameters
+    float specular_intensity;
+    float specular_exponent;
+    bool  is_emitter;         // Is this object a light source itself (and thus glows)?
+    int   object_location;    // Location type of the current object being rendered
+    bool  instanced;
+};
 
-// Camera/View Parameters
-uniform vec3 viewPos;
+layout(std140, row_major) uniform ObjectData {
+    ObjectRecord object;
+};
 
-// Object-Specific Behavior Parameters
-uniform bool is_emitter;       // Is this object a light source itself (and thus glows)?
-uniform vec3 emission_color;   // If is_emitter, its glow color
-uniform int  object_location;  // Location type of the current object being rendered
+layout(std140, row_major) uniform DrawData {
+    ObjectRecord draws[MAX_DRAWS];
+};
 
 // Varying Inputs
-varying vec2 out_textureCoords;
-varying vec3 out_normal;
-varying vec3 out_fragPos;
+in vec2 out_textureCoords;
+in vec3 out_normal;
+in vec3 out_fragPos;
+flat in int out_draw;
 
 // Texture Sampler
 uniform sampler2D samplerTexture;
 
+// Output
+out vec4 frag_color;
+
 void main() {
-    vec4 textureColor = texture2D(samplerTexture, out_textureCoords);
+    vec4 textureColor = texture(samplerTexture, out_textureCoords);
+    ObjectRecord obj = out_draw < 0 ? object : draws[out_draw];
 
     // 1. Handle Emissive Objects (Light source objects glow)
-    if (is_emitter) {
-        gl_FragColor = vec4(emission_color, textureColor.a);
+    if (obj.is_emitter) {
+        frag_color = vec4(obj.emission_color, textureColor.a);
         return; // No further lighting for purely emissive surfaces
     }
 
@@ -56,7 +78,8 @@ void main() {
     vec3 viewDir = normalize(viewPos - out_fragPos);
 
     // 3. Ambient Lighting
-    vec3 ambientReflection = ambient_intensity * ambient_color * textureColor.rgb;
+    float ambient = ambient_on ? obj.ambient_intensity : 0.0;
+    vec3 ambientReflection = ambient * obj.ambient_color * textureColor.rgb;
 
     // Initialize accumulators
     vec3 totalDiffuse = vec3(0.0);
@@ -66,22 +89,22 @@ void main() {
     for (int i = 0; i < NUM_LIGHTS; ++i) {
         // Rule 2: Location-based light affection
         // Accessing struct members: lights[i].location
-        if (lights[i].location == object_location ||
+        if (lights[i].location == obj.object_location ||
             lights[i].location == LOCATION_BOTH ||
-            object_location == LOCATION_BOTH) {
+            obj.object_location == LOCATION_BOTH) {
             // Accessing struct members: lights[i].color, lights[i].intensity, lights[i].position
             vec3 currentLightEffectiveColor = lights[i].color * lights[i].intensity;
 
             // Diffuse
             vec3 lightDir = normalize(lights[i].position - out_fragPos);
             float diffFactor = max(dot(norm, lightDir), 0.0);
-            vec3 diffuseComponent = diffuse_intensity * diffFactor * currentLightEffectiveColor;
+            vec3 diffuseComponent = obj.diffuse_intensity * diffFactor * currentLightEffectiveColor;
             totalDiffuse += diffuseComponent;
 
             // Specular
             vec3 reflectDir = reflect(-lightDir, norm);
-            float specFactor = pow(max(dot(viewDir, reflectDir), 0.0), specular_exponent);
-            vec3 specularComponent = specular_intensity * specFactor * currentLightEffectiveColor;
+            float specFactor = pow(max(dot(viewDir, reflectDir), 0.0), obj.specular_exponent);
+            vec3 specularComponent = obj.specular_intensity * specFactor * currentLightEffectiveColor;
             totalSpecular += specularComponent;
         }
     }
@@ -89,5 +112,5 @@ void main() {
     // 5. Combine Lighting Components
     vec3 finalColor = ambientReflection + (totalDiffuse * textureColor.rgb) + totalSpecular;
     
-    gl_FragColor = vec4(finalColor, textureColor.a);
+    frag_color = vec4(finalColor, textureColor.a);
 }
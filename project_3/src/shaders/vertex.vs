@@ -1,21 +1,53 @@
 #version 330 core
+#define MAX_DRAWS 128
 
-attribute vec3 position;
-attribute vec2 texture_coord;
-attribute vec3 normals;
+in vec3 position;
+in vec2 texture_coord;
+in vec3 normals;
+in mat4 instance_model; // per-instance placement, if instanced
+in float draw_index;    // record of a batched draw, or -1
 
-varying vec2 out_textureCoords;
-varying vec3 out_fragPos; // posicao do fragmento, informa onde a iluminacao
-                          // sera calculada
-varying vec3 out_normal;
+out vec2 out_textureCoords;
+out vec3 out_fragPos; // posicao do fragmento, informa onde a iluminacao
+                      // sera calculada
+out vec3 out_normal;
+flat out int out_draw;
 
-uniform mat4 model;
-uniform mat4 view;
-uniform mat4 projection;
+layout(std140, row_major) uniform Camera {
+    mat4 view;
+    mat4 projection;
+    vec3 viewPos;
+};
+
+// Per-object record: that of the object being drawn, bound to ObjectData,
+// or one of the records of a batched draw, picked by its draw index
+struct ObjectRecord {
+    mat4  model;
+    vec3  ambient_color;
+    float ambient_intensity;
+    vec3  emission_color;
+    float diffuse_intensity;
+    float specular_intensity;
+    float specular_exponent;
+    bool  is_emitter;
+    int   object_location;
+    bool  instanced;
+};
+
+layout(std140, row_major) uniform ObjectData {
+    ObjectRecord object;
+};
+
+layout(std140, row_major) uniform DrawData {
+    ObjectRecord draws[MAX_DRAWS];
+};
 
 void main() {
-    gl_Position = projection * view * model * vec4(position, 1.0);
+    out_draw = int(draw_index);
+    ObjectRecord obj = out_draw < 0 ? object : draws[out_draw];
+    mat4 world = obj.instanced ? obj.model * instance_model : obj.model;
+    gl_Position = projection * view * world * vec4(position, 1.0);
     out_textureCoords = vec2(texture_coord);
-    out_fragPos = vec3(model * vec4(position, 1.0));
-    out_normal = vec3(model * vec4(normals, 1.0));
+    out_fragPos = vec3(world * vec4(position, 1.0));
+    out_normal = vec3(world * vec4(normals, 1.0));
 }
@@ -0,0 +1,49 @@
+"""
+Check that keyframe tracks play and stop as configured.
+"""
+
+import pytest
+from numpy import array, float32
+from numpy.testing import assert_allclose
+from app.animation import Animator
+from app.transform_store import TransformStore
+from app.utils import KeyframeTrack
+
+BOUNDS = array([[-1.0, -1.0, -1.0], [1.0, 1.0, 1.0]], dtype=float32)
+# Half a turn about z, at one second
+TURN = [(0.0, 0.0, 0.0, 1.0), (0.0, 0.0, 1.0, 0.0)]
+
+
+def animator(*tracks: KeyframeTrack) -> Animator:
+    """Play each track on a row of its own."""
+    store = TransformStore()
+    animator = Animator(store)
+    for track in tracks:
+        animator.add(store.add((0, 0, 0), (0, 0, 0), 1.0, BOUNDS), track)
+    return animator
+
+
+def test_finished_tracks_stop_running():
+    played = animator(KeyframeTrack([0.0, 1.0], TURN, loop=False))
+    assert played.running
+    assert len(played.advance(0.6))
+    assert len(played.advance(0.6))
+    assert_allclose(played.store.quaternions[0], TURN[1])
+    assert not played.running
+    assert not len(played.advance(0.6))
+
+
+def test_looping_tracks_keep_running():
+    played = animator(
+        KeyframeTrack([0.0, 1.0], TURN, loop=False),
+        KeyframeTrack([0.0, 1.0], TURN),
+    )
+    for _ in range(5):
+        played.advance(0.6)
+    assert played.running
+    assert len(played.advance(0.6)) == 2
+
+
+def test_zero_quaternions_are_rejected():
+    with pytest.raises(ValueError):
+        animator(KeyframeTrack([0.0, 1.0], [TURN[0], (0.0, 0.0, 0.0, 0.0)]))
@@ -0,0 +1,29 @@
+"""
+Check that the console display keeps showing the text after rendering it
+fails.
+"""
+
+from io import StringIO
+from time import monotonic, sleep
+from app.utils import ConsoleDisplay
+
+
+def test_display_survives_failing_render(capsys):
+    calls = []
+
+    def render() -> str:
+        calls.append(None)
+        if len(calls) == 1:
+            raise RuntimeError("deque mutated during iteration")
+        return "state"
+
+    stream = StringIO()
+    display = ConsoleDisplay(render, rate=100.0, stream=stream)
+    display.refresh()
+    deadline = monotonic() + 5.0
+    while len(calls) < 2 and monotonic() < deadline:
+        sleep(0.01)
+    display.close()
+    assert len(calls) == 2
+    assert "state" in stream.getvalue()
+    assert "RuntimeError" in capsys.readouterr().err
@@ -0,0 +1,65 @@
+"""
+Hold the OpenGL calls made to draw a fixed scene to a budget, with every call
+answered by the recorder's mock, so that no context nor GPU is needed.
+"""
+
+import sys
+from os import path
+from tempfile import TemporaryDirectory
+import pytest
+from app.headless import HeadlessWindow
+from app.scene import Scene
+from app.utils import GLRecorder
+
+sys.path.insert(0, path.join(path.dirname(__file__), "..", "benchmarks"))
+from synthetic import write_config, write_model  # noqa: E402
+
+# Calls that change the state draw calls are made with
+STATE_CHANGES = (
+    "glUseProgram",
+    "glBindVertexArray",
+    "glBindTexture",
+    "glActiveTexture",
+    "glEnable",
+    "glDisable",
+    "glBlendFunc",
+    "glDepthMask",
+    "glCullFace",
+    "glPolygonMode",
+)
+
+
+class MockWindow(HeadlessWindow):
+    """A headless window with no context behind it."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+
+
+@pytest.mark.parametrize("objects", [10, 100])
+def test_frame_calls_stay_within_budget(objects):
+    recorder = GLRecorder(mock=True).install()
+    try:
+        with TemporaryDirectory() as root:
+            write_model(root, "Sphere", 8)
+            config = write_config(root, "Sphere", objects)
+            scene = Scene(MockWindow(940, 1000), config)
+            # The first frame uploads what every later one reuses
+            scene.draw()
+            recorder.end_frame()
+            scene.draw()
+            recorder.end_frame()
+    finally:
+        recorder.uninstall()
+
+    draws = recorder.calls("glDraw*") + recorder.calls("glMultiDraw*")
+    assert draws == scene.draw_calls
+    # Static objects are drawn together, and some are culled
+    assert draws < objects
+    # Every object shares a texture and program, set once per frame
+    assert sum(recorder.calls(name) for name in STATE_CHANGES) <= 4
+    # Per-object parameters come from a buffer range, not uniforms
+    assert recorder.calls("glUniform*") == 0
+    assert recorder.calls("glBindBufferRange") <= draws + 4
+    assert recorder.calls("glBuffer*Data") <= 2
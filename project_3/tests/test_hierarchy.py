@@ -0,0 +1,77 @@
+"""
+Check that rows placed relative to others follow their ancestors: world
+matrices are the products of the local matrices down the chain, and marking
+an ancestor dirty recomputes its subtree only.
+"""
+
+import pytest
+from numpy import array, float32
+from numpy.testing import assert_allclose
+from app.transform_store import TransformStore
+
+BOUNDS = array([[-1.0, -1.0, -1.0], [1.0, 1.0, 1.0]], dtype=float32)
+
+
+def chain() -> TransformStore:
+    """A root, a middle row and a leaf below it, next to an unrelated row,
+    all updated once."""
+    store = TransformStore()
+    root = store.add((1.0, 2.0, 3.0), (0.1, 0.2, 0.3), 2.0, BOUNDS)
+    middle = store.add((0.0, 1.0, 0.0), (0.0, 0.5, 0.0), 0.5, BOUNDS, root)
+    store.add((4.0, 0.0, -1.0), (0.3, 0.0, 0.7), 1.5, BOUNDS, middle)
+    store.add((9.0, 9.0, 9.0), (0.0, 0.0, 0.0), 1.0, BOUNDS)
+    store.update()
+    return store
+
+
+def assert_chain_composed(store: TransformStore) -> None:
+    """Check each world matrix against its parent's times its local one."""
+    local, world = store.local_matrices, store.matrices
+    assert_allclose(world[0], local[0], rtol=1e-6)
+    assert_allclose(world[1], world[0] @ local[1], rtol=1e-5, atol=1e-5)
+    assert_allclose(world[2], world[1] @ local[2], rtol=1e-5, atol=1e-5)
+    assert_allclose(
+        world[2], local[0] @ local[1] @ local[2], rtol=1e-5, atol=1e-5
+    )
+
+
+def test_set_parent_rejects_cycles():
+    store = chain()
+    with pytest.raises(ValueError):
+        store.set_parent(0, 2)
+    with pytest.raises(ValueError):
+        store.set_parent(1, 1)
+    # A rejected parent leaves the hierarchy as it was
+    assert list(store.parents[:4]) == [-1, 0, 1, -1]
+
+
+def test_initial_update_composes_chain():
+    assert_chain_composed(chain())
+
+
+@pytest.mark.parametrize("marked", [0, 1])
+def test_marked_ancestor_updates_descendants(marked):
+    store = chain()
+    revisions = store.revisions[:4].copy()
+    store.positions[marked] += (0.5, -2.0, 1.0)
+    store.rotations[marked] += (0.2, 0.0, -0.4)
+    store.mark(marked)
+    rows = store.update()
+
+    assert list(rows) == list(range(marked, 3))
+    assert_chain_composed(store)
+    # Rows above the marked one, and outside its subtree, are left alone
+    moved = (store.revisions[:4] - revisions).tolist()
+    assert moved == [int(row >= marked) for row in range(3)] + [0]
+
+
+def test_descendant_of_marked_row_is_stale():
+    store = chain()
+    assert not any(store.stale(row) for row in range(4))
+    store.mark(1)
+    assert not store.stale(0)
+    assert store.stale(1)
+    assert store.stale(2)
+    assert not store.stale(3)
+    store.update()
+    assert not store.stale(2)
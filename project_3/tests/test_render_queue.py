@@ -0,0 +1,75 @@
+"""
+Check the radix sort against NumPy's stable sort, and that the render queue
+draws see-through objects last, from the farthest to the nearest.
+"""
+
+from types import SimpleNamespace
+from hypothesis import given, strategies as st
+from hypothesis.extra.numpy import arrays
+from numpy import argsort, array, eye, float32, uint64
+from numpy.testing import assert_array_equal
+from app.render_queue import RenderQueue, radix_sort
+from app.utils.dataclasses import (
+    IlluminationProperties,
+    ReflectionCoefficients,
+)
+
+# Keys drawn from a few values too, so that ties test the sort's stability
+keys = st.one_of(
+    arrays(uint64, st.integers(0, 300)),
+    arrays(
+        uint64,
+        st.integers(0, 300),
+        elements=st.sampled_from([0, 1, 1 << 16, 1 << 40, (1 << 64) - 1]),
+    ),
+)
+
+
+def drawable(z: float, texture: int, translucent: bool) -> SimpleNamespace:
+    """A stand-in for an object, with a unit box centered at depth `z`."""
+    return SimpleNamespace(
+        texture=texture,
+        translucent=translucent,
+        world_bounds=array(
+            [[-0.5, -0.5, z - 0.5], [0.5, 0.5, z + 0.5]], dtype=float32
+        ),
+        illumination=IlluminationProperties(
+            ReflectionCoefficients(0.2, 0.6, 0.4, 32.0),
+            0.0,
+            (1.0, 1.0, 1.0),
+            (0.0, 0.0, 0.0),
+        ),
+    )
+
+
+@given(keys)
+def test_radix_sort_matches_stable_argsort(values):
+    assert_array_equal(radix_sort(values), argsort(values, kind="stable"))
+
+
+def test_translucent_objects_come_last_back_to_front():
+    objects = [
+        drawable(-4.0, 1, True),
+        drawable(-2.0, 2, False),
+        drawable(-9.0, 1, True),
+        drawable(-6.0, 1, False),
+        drawable(-1.0, 2, True),
+        drawable(-3.0, 1, False),
+        drawable(-7.0, 2, True),
+    ]
+    # The camera looks down -z from the origin
+    order = RenderQueue().sort(objects, eye(4, dtype=float32), 1)
+
+    assert sorted(map(id, order)) == sorted(map(id, objects))
+    blended = [o.translucent for o in order]
+    assert blended == sorted(blended)
+    depths = [-float(o.world_bounds[0, 2]) - 0.5 for o in order]
+    translucent = depths[blended.index(True):]
+    assert translucent == sorted(translucent, reverse=True)
+    # Opaque objects are grouped by texture, each front to back
+    opaque = [
+        (o.texture, depth)
+        for o, depth in zip(order, depths)
+        if not o.translucent
+    ]
+    assert opaque == sorted(opaque)
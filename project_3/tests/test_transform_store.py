@@ -0,0 +1,98 @@
+"""
+Check the closed-form model matrices against the products of translation,
+rotation and scale matrices they stand for.
+"""
+
+from math import cos, pi, sin
+from hypothesis import given, strategies as st
+from numpy import array, diag, float64
+from numpy.testing import assert_allclose
+from numpy.typing import NDArray
+from app.transform_store import compose, compose_quaternions, euler_angles
+
+coordinates = st.floats(-100.0, 100.0)
+angles = st.floats(-2 * pi, 2 * pi)
+# Negative scales mirror the model and a zero scale flattens it to a point
+scales = st.one_of(st.just(0.0), st.floats(-10.0, 10.0))
+placements = st.lists(
+    st.tuples(
+        st.tuples(coordinates, coordinates, coordinates),
+        st.tuples(angles, angles, angles),
+        scales,
+    ),
+    min_size=1,
+    max_size=16,
+)
+# Quaternions drawn away from zero, so that they can be normalized
+quaternions = st.lists(
+    st.tuples(*[st.floats(-1.0, 1.0)] * 4).filter(
+        lambda q: sum(c * c for c in q) > 1e-3
+    ),
+    min_size=1,
+    max_size=16,
+)
+
+
+def model_matrix(
+    position: tuple[float, float, float],
+    rotation: tuple[float, float, float],
+    scale: float,
+) -> NDArray[float64]:
+    """Multiply out T * Rz * Ry * Rx * S, one matrix per step."""
+    (cx, cy, cz), (sx, sy, sz) = map(cos, rotation), map(sin, rotation)
+    translation = diag([1.0, 1.0, 1.0, 1.0])
+    translation[:3, 3] = position
+    rz = array(
+        [[cz, -sz, 0, 0], [sz, cz, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]],
+        dtype=float64,
+    )
+    ry = array(
+        [[cy, 0, sy, 0], [0, 1, 0, 0], [-sy, 0, cy, 0], [0, 0, 0, 1]],
+        dtype=float64,
+    )
+    rx = array(
+        [[1, 0, 0, 0], [0, cx, -sx, 0], [0, sx, cx, 0], [0, 0, 0, 1]],
+        dtype=float64,
+    )
+    scaling = diag([scale, scale, scale, 1.0])
+    return translation @ rz @ ry @ rx @ scaling
+
+
+def split(
+    rows: list[tuple[tuple[float, ...], tuple[float, ...], float]],
+) -> tuple[NDArray[float64], NDArray[float64], NDArray[float64]]:
+    """Turn a list of placements into the arrays `compose` takes."""
+    positions, rotations, scales = zip(*rows)
+    return (
+        array(positions, dtype=float64),
+        array(rotations, dtype=float64),
+        array(scales, dtype=float64),
+    )
+
+
+@given(placements)
+def test_compose_matches_matrix_product(rows):
+    expected = array([model_matrix(*row) for row in rows])
+    assert_allclose(compose(*split(rows)), expected, rtol=1e-5, atol=1e-4)
+
+
+@given(placements, quaternions)
+def test_compose_quaternions_matches_euler_angles(rows, rotations):
+    rows = (rows * len(rotations))[: len(rotations)]
+    positions, _, scales = split(rows)
+    units = array(rotations, dtype=float64)
+    units /= ((units * units).sum(-1) ** 0.5)[:, None]
+    expected = array(
+        [
+            model_matrix(position, rotation, scale)
+            for position, rotation, scale in zip(
+                positions, euler_angles(units), scales
+            )
+        ]
+    )
+    assert_allclose(
+        compose_quaternions(positions, units, scales),
+        expected,
+        rtol=1e-5,
+        atol=1e-4,
+    )
@@ -0,0 +1,103 @@
+"""
+Check the clipping of portals against the view frustum, and the frustums
+seen through them, from a camera at the origin looking down -z with a
+90 degree field of view, so that the side planes are |x| = -z and |y| = -z.
+"""
+
+from types import SimpleNamespace
+from numpy import array, float32, zeros
+from numpy.testing import assert_allclose
+from numpy.typing import NDArray
+from app.utils import Location, Portal
+from app.visibility import Frustum, ZoneVisibility
+
+NEAR, FAR = 0.1, 100.0
+CLIP = array(
+    [
+        [1.0, 0.0, 0.0, 0.0],
+        [0.0, 1.0, 0.0, 0.0],
+        [0.0, 0.0, (FAR + NEAR) / (NEAR - FAR), 2 * FAR * NEAR / (NEAR - FAR)],
+        [0.0, 0.0, -1.0, 0.0],
+    ],
+    dtype=float32,
+)
+EYE = zeros(3, dtype=float32)
+
+INSIDE = [
+    (-0.5, -0.5, -5.0),
+    (0.5, -0.5, -5.0),
+    (0.5, 0.5, -5.0),
+    (-0.5, 0.5, -5.0),
+]
+# A triangle with one corner past the right plane, x = 5 at this depth
+STRADDLING = [(4.0, -0.5, -5.0), (6.0, -0.5, -5.0), (4.0, 0.5, -5.0)]
+OUTSIDE = [
+    (8.0, -0.5, -5.0),
+    (9.0, -0.5, -5.0),
+    (9.0, 0.5, -5.0),
+    (8.0, 0.5, -5.0),
+]
+
+
+def box(x: float, y: float, z: float, half: float) -> NDArray[float32]:
+    """The bounds of a cube centered at (x, y, z)."""
+    center = array([x, y, z], dtype=float32)
+    return array([center - half, center + half], dtype=float32)
+
+
+def placed(bounds: NDArray[float32], location: Location) -> SimpleNamespace:
+    """A stand-in for an object, holding only its bounds and zone."""
+    return SimpleNamespace(world_bounds=bounds, location=location)
+
+
+def test_portal_inside_frustum_is_kept_whole():
+    portal = array(INSIDE, dtype=float32)
+    opening = Frustum.from_matrix(CLIP).clip_polygon(portal)
+    assert_allclose(opening, portal, atol=1e-5)
+
+    through = Frustum.through_portal(EYE, opening)
+    # One plane per edge, and the portal's own
+    assert len(through.planes) == 5
+    # Beyond the opening, within the cone it spans
+    assert through.intersects_box(box(0.0, 0.0, -10.0, 0.5))
+    # Within the cone, but on the camera's side of the portal
+    assert not through.intersects_box(box(0.0, 0.0, -2.0, 0.5))
+    # Beyond the portal's plane, but off to the side
+    assert not through.intersects_box(box(4.0, 0.0, -10.0, 0.5))
+
+
+def test_portal_straddling_a_plane_is_clipped():
+    portal = array(STRADDLING, dtype=float32)
+    opening = Frustum.from_matrix(CLIP).clip_polygon(portal)
+    # The corner past the plane is swapped for the two edges' crossings
+    expected = [
+        (4.0, -0.5, -5.0),
+        (5.0, -0.5, -5.0),
+        (5.0, 0.0, -5.0),
+        (4.0, 0.5, -5.0),
+    ]
+    assert opening.shape == (4, 3)
+    assert_allclose(opening, expected, atol=1e-4)
+
+    through = Frustum.through_portal(EYE, opening)
+    assert through.intersects_box(box(8.5, 0.0, -10.0, 0.2))
+    # Behind the part of the portal left outside the view
+    assert not through.intersects_box(box(11.0, -0.5, -10.0, 0.2))
+
+
+def test_portal_outside_frustum_culls_zone():
+    portal = array(OUTSIDE, dtype=float32)
+    assert len(Frustum.from_matrix(CLIP).clip_polygon(portal)) < 3
+
+    # The camera is inside, facing an outside object in plain view
+    objects = [
+        placed(box(0.0, 0.0, 0.0, 1.0), Location.internal),
+        placed(box(0.0, 0.0, -10.0, 0.5), Location.external),
+    ]
+    in_view = ZoneVisibility(objects, [Portal("door", INSIDE)])
+    assert in_view.visible(objects, EYE, CLIP) == objects
+    assert in_view.culled == 0
+
+    out_of_view = ZoneVisibility(objects, [Portal("door", OUTSIDE)])
+    assert out_of_view.visible(objects, EYE, CLIP) == objects[:1]
+    assert out_of_view.culled == 1